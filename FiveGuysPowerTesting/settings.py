@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from FiveGuysPowerTesting.secret_settings import *
 from rest_framework.permissions import DjangoModelPermissions
@@ -90,6 +91,23 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Counts behind paginated list endpoints are cached for this many seconds, and above the threshold (if not None) the
+# Postgres planner's estimate is used instead of an exact count
+PAGINATION_COUNT_CACHE_TIMEOUT = 30
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = None
+
+# Seconds between checks of whether another worker changed models since the vendor/model number picker index was built
+PICKER_INDEX_RECHECK_INTERVAL = 1
+
+# Runs the test suite without the benchmarks; run them with manage.py test --tag benchmark
+TEST_RUNNER = 'database.tests.runner.TestRunner'
+
+# SSH sessions each worker keeps open to the Klufe K5700 calibrator, seconds between keepalives sent on an idle one,
+# and seconds a command waits for the calibrator's reply
+KLUFE_SSH_POOL_SIZE = 2
+KLUFE_SSH_KEEPALIVE_INTERVAL = 30
+KLUFE_REPLY_TIMEOUT = 5
+
 ACCOUNT_EMAIL_VERIFICATION = 'none'
 
 DJOSER = {
@@ -158,3 +176,32 @@ STATIC_ROOT = BASE_DIR / 'static/'
 
 MEDIA_ROOT = BASE_DIR / 'media/'
 MEDIA_URL = '/media/'
+
+# Snapshots of CSV exports, reused until the exported data changes
+EXPORT_CACHE_DIR = BASE_DIR / 'export_cache/'
+EXPORT_CACHE_MAX_AGE = 60 * 60 * 24
+
+# Files written by background export jobs, deleted along with their job after EXPORT_JOB_TTL seconds
+EXPORT_JOB_DIR = BASE_DIR / 'export_jobs/'
+EXPORT_JOB_TTL = 60 * 60 * 24
+# A running job records a heartbeat at most every EXPORT_JOB_HEARTBEAT_INTERVAL seconds while it writes; one pending or
+# running without a heartbeat for EXPORT_JOB_ORPHAN_TIMEOUT seconds lost its thread and is marked FAILED when polled
+EXPORT_JOB_HEARTBEAT_INTERVAL = 10
+EXPORT_JOB_ORPHAN_TIMEOUT = 60 * 5
+
+# Cache behind read responses and pagination counts. RESPONSE_CACHE_BACKEND is locmem (the default, per process), file
+# (shared by the processes on one host) or the dotted path of any Django cache backend, such as
+# django_redis.cache.RedisCache with RESPONSE_CACHE_LOCATION=redis://127.0.0.1:6379/1
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'locmem')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS.get(RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_BACKEND),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION',
+                                   str(BASE_DIR / 'response_cache') if RESPONSE_CACHE_BACKEND == 'file' else ''),
+    }
+}
+RESPONSE_CACHE_TIMEOUT = 60 * 5
@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class DatabaseConfig(AppConfig):
     name = 'database'
+
+    def ready(self):
+        from database import signals  # noqa: F401
+        post_migrate.connect(prepare_search_index, sender=self)
+
+
+def prepare_search_index(using, **kwargs):
+    from database.models.search_document import SearchDocument, create_search_index
+    create_search_index(using)
+    SearchDocument.objects.db_manager(using).index_missing()
@@ -5,6 +5,7 @@ DESCRIPTION_LENGTH = 100
 COMMENT_LENGTH = 2000
 CALIBRATION_FREQUENCY_LENGTH = 10  # needs to be validated in manager, length not valid for integer field
 CATEGORY_LENGTH = 40
+CALIBRATION_EXPIRING_DAYS = 30  # calibrations expiring within this many days are reported as expiring
 INSTRUMENT_TEMPLATE = '(Model:{0.model}, Asset Tag Number:{0.asset_tag_number}, Serial Number:{0.serial_number}, ' \
                       'Comment:{0.comment})'
 CALIBRATION_EVENT_TEMPLATE = '(Instrument:{0.instrument}, Date:{0.date}, User:{0.user}, Comment:{0.comment})'
@@ -0,0 +1,35 @@
+from django.db.models import CharField, Count, Value
+
+from database.enums import CalibrationStatusEnum
+from database.facets import grouped_counts, union_counts
+from database.models.instrument import CalibrationEvent, Instrument, calibration_status, with_calibration_dates
+
+# statuses change with the date as well as with writes
+DASHBOARD_CACHE_TIMEOUT = 60
+
+PENDING_APPROVAL = 'pending_approval'
+
+
+def dashboard_counts():
+    """
+    Instrument totals by calibration status and by model category, and the number of calibration events pending
+    approval, from one UNION ALL query.
+    """
+    grouped = grouped_counts(with_calibration_dates(Instrument.objects.all()), {
+        'calibration_status': calibration_status,
+        'model_categories': 'model__model_categories__name',
+    })
+    grouped.append(CalibrationEvent.objects.pending_approval().order_by().values(
+        facet=Value(PENDING_APPROVAL, output_field=CharField()),
+        value=Value(PENDING_APPROVAL, output_field=CharField())).annotate(count=Count('pk')))
+    counts = union_counts(grouped, {
+        'calibration_status': [e.value for e in CalibrationStatusEnum],
+        'model_categories': [],
+        PENDING_APPROVAL: [PENDING_APPROVAL],
+    })
+    return {
+        'instruments': sum(item['count'] for item in counts['calibration_status']),
+        'calibration_status': counts['calibration_status'],
+        'model_categories': counts['model_categories'],
+        PENDING_APPROVAL: counts[PENDING_APPROVAL][0]['count'],
+    }
@@ -72,3 +72,28 @@ class CalibrationEventEnum(AutoName):
     CUSTOM_DATA = auto()
     APPROVAL_DATA = auto()
     CALIBRATED_WITH = auto()
+
+
+class CalibrationStatusEnum(AutoName):
+    VALID = auto()
+    EXPIRING = auto()
+    EXPIRED = auto()
+    NOT_CALIBRATABLE = auto()
+    UNCALIBRATED = auto()
+
+
+class DataScopeEnum(AutoName):
+    MODELS = auto()
+    INSTRUMENTS = auto()
+    CALIBRATION_EVENTS = auto()
+    CATEGORIES = auto()
+
+
+class ExportJobEnum(AutoName):
+    PK = auto()
+    EXPORT_TYPE = auto()
+    EXPORT_FORMAT = auto()
+    STATUS = auto()
+    ERROR = auto()
+    CREATED_AT = auto()
+    FINISHED_AT = auto()
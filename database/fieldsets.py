@@ -0,0 +1,106 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+NESTED_QUERY_PARAM = 'nested'
+
+
+def split_param(value):
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def sparse_serializer(serializer_class, fields=None, expand=None):
+    """
+    Returns a subclass of serializer_class (or of its representation_class, for serializers that delegate their
+    output) that renders only the given fields, or all of them if fields is None. Nested serializers not named in
+    expand are rendered as primary keys.
+    """
+    serializer_class = getattr(serializer_class, 'representation_class', serializer_class)
+    declared = serializer_class().fields
+    expand = expand or []
+    unknown = [name for name in (fields or []) + expand if name not in declared]
+    if unknown:
+        raise ValidationError({FIELDS_QUERY_PARAM: f'Unknown fields: {", ".join(unknown)}'})
+
+    names = [name for name in declared if fields is None or name in fields]
+    attrs = {name: None for name in serializer_class._declared_fields if name not in names}
+    for name in names:
+        field = declared[name]
+        if isinstance(field, serializers.BaseSerializer) and name not in expand:
+            kwargs = {'source': field.source} if field.source != name else {}
+            attrs[name] = serializers.PrimaryKeyRelatedField(
+                read_only=True, many=isinstance(field, serializers.ListSerializer), **kwargs)
+    attrs['Meta'] = type('Meta', (serializer_class.Meta,), {'fields': names})
+    return type(f'Sparse{serializer_class.__name__}', (serializer_class,), attrs)
+
+
+def serializer_without(serializer_class, excluded):
+    """ Returns a subclass of serializer_class without the excluded fields, rendering the others as before """
+    declared = getattr(serializer_class, 'representation_class', serializer_class)().fields
+    names = [name for name in declared if name not in excluded]
+    return sparse_serializer(serializer_class, names, names)
+
+
+def restrict_queryset(queryset, serializer, required=()):
+    """
+    Loads only the columns serializer renders, joins the single relations it nests and prefetches the many relations
+    it renders, restricted the same way. Columns are not restricted if any field reads something other than a model
+    field or an annotation.
+    """
+    only, select, prefetch, complete = plan_serializer(serializer, queryset.model)
+    if select:
+        # select_related() with no arguments would follow every foreign key
+        queryset = queryset.select_related(*select)
+    queryset = queryset.prefetch_related(*prefetch)
+    return queryset.only(*only, *required) if complete else queryset
+
+
+def plan_serializer(serializer, model, prefix=''):
+    """ Returns the only(), select_related() and prefetch_related() lookups for serializer, and if only() is safe """
+    only, select, prefetch, complete = [prefix + model._meta.pk.name], [], [], True
+    for field in serializer.fields.values():
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        source = model._meta.pk.name if field.source == 'pk' else field.source
+        if source == '*' or '.' in source:
+            complete = False
+            continue
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            # annotations need no columns, but properties and methods may read any of them
+            complete = complete and not hasattr(model, source)
+            continue
+
+        path = prefix + source
+        if not model_field.is_relation:
+            only.append(path)
+        elif model_field.many_to_many or model_field.one_to_many:
+            related = model_field.related_model._default_manager.all()
+            required = [model_field.field.name] if model_field.one_to_many else []
+            if isinstance(nested, serializers.BaseSerializer):
+                prefetch.append(Prefetch(path, queryset=restrict_queryset(related, nested, required)))
+            elif isinstance(getattr(field, 'child_relation', None), serializers.PrimaryKeyRelatedField):
+                prefetch.append(Prefetch(path, queryset=related.only(model_field.related_model._meta.pk.name,
+                                                                     *required)))
+            else:
+                prefetch.append(path)
+        elif isinstance(nested, serializers.BaseSerializer):
+            select.append(path)
+            if model_field.concrete:
+                only.append(path)
+            nested_only, nested_select, nested_prefetch, nested_complete = plan_serializer(
+                nested, model_field.related_model, path + '__')
+            only += nested_only
+            select += nested_select
+            prefetch += nested_prefetch
+            complete = complete and nested_complete
+        elif model_field.concrete and isinstance(field, serializers.PrimaryKeyRelatedField):
+            only.append(path)
+        else:
+            complete = False
+    return only, select, prefetch, complete
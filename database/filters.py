@@ -1,12 +1,14 @@
 """
 Base code from https://www.django-rest-framework.org/api-guide/filtering/
 """
+from django.db.models import Count
 from django_filters import rest_framework as rf
 from rest_framework import filters
 
 from database.enums import InstrumentEnum, ModelEnum
-from database.models.instrument import Instrument
+from database.models.instrument import CalibrationEvent, Instrument
 from database.models.model import Model
+from database.models.search_document import INDEXED_FIELDS, SearchDocument
 
 
 class CustomSearchFilter(filters.SearchFilter):
@@ -23,6 +25,19 @@ class CustomSearchFilter(filters.SearchFilter):
                 return [field]
         return search_fields
 
+    def filter_queryset(self, request, queryset, view):
+        """
+        Searches through the indexed search documents when every indexed field of the model is searched, instead of
+        joining every related table. Each term must still appear in one of the fields, ignoring case.
+        """
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_terms or set(search_fields or []) != set(INDEXED_FIELDS.get(queryset.model, [])):
+            return super(CustomSearchFilter, self).filter_queryset(request, queryset, view)
+        for term in search_terms:
+            queryset = queryset.filter(pk__in=SearchDocument.objects.matching(queryset.model, term))
+        return queryset
+
 
 class CategoryFilter(rf.Filter):
     """
@@ -34,13 +49,35 @@ class CategoryFilter(rf.Filter):
     In short, parameter can have a single key with multiple comma separated values.
 
     Usage of self.lookup_expr adapted from code from django_filters/filters.py. Discussed with Diego Chamorro.
+
+    Exact matches on a unique field of the categories of a many-to-many field are found in one subquery on its link
+    table, keeping the owners with as many links to the selected categories as there are categories, instead of adding
+    one join per category.
     """
 
     def filter(self, qs, value):
-        if value:
-            for v in value.split(','):
+        if not value:
+            return qs
+        names = set(value.split(','))
+        *owner_path, field_name, category_field = self.field_name.split('__')
+        field = self.owner_model(qs.model, owner_path)._meta.get_field(field_name)
+        if self.lookup_expr != 'exact' or not field.many_to_many or field.auto_created \
+                or not field.related_model._meta.get_field(category_field).unique:
+            for v in names:
                 qs = qs.filter(**{self.field_name + '__' + self.lookup_expr: v})
-        return qs
+            return qs
+        owner, category = field.m2m_field_name(), field.m2m_reverse_field_name()
+        categories = field.related_model._default_manager.filter(**{category_field + '__in': names}).values('pk')
+        # links are unique, so each owner has one per selected category it belongs to
+        owners = field.remote_field.through.objects.filter(**{category + '__in': categories}).values(owner) \
+            .annotate(links=Count('pk')).filter(links=len(names)).values(owner)
+        return qs.filter(**{'__'.join(owner_path or ['pk']) + '__in': owners})
+
+    @staticmethod
+    def owner_model(model, path):
+        for name in path:
+            model = model._meta.get_field(name).related_model
+        return model
 
 
 class ModelFilter(rf.FilterSet):
@@ -88,3 +125,28 @@ class InstrumentFilter(rf.FilterSet):
             'instrument_categories__name',
             InstrumentEnum.ASSET_TAG_NUMBER.value,
         ]
+
+
+class CalibrationEventFilter(rf.FilterSet):
+    """
+    Filters calibration events to those performed within an inclusive range of dates, given as YYYY-MM-DD, and by
+    approval state: approved, rejected, or pending (no approval data yet).
+    """
+    APPROVAL_STATES = [
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+        ('pending', 'Pending approval'),
+    ]
+
+    start_date = rf.DateFilter(field_name='date', lookup_expr='date__gte')
+    end_date = rf.DateFilter(field_name='date', lookup_expr='date__lte')
+    approval_state = rf.ChoiceFilter(choices=APPROVAL_STATES, method='filter_approval_state')
+
+    class Meta:
+        model = CalibrationEvent
+        fields = ['start_date', 'end_date', 'approval_state']
+
+    def filter_approval_state(self, qs, name, value):
+        if value == 'pending':
+            return qs.filter(approval_data=None)
+        return qs.filter(approval_data__approved=value == 'approved')
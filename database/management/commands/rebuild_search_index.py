@@ -0,0 +1,22 @@
+"""
+Rebuilds the search documents behind ?search= on models and instruments, creating the index first if it is missing.
+Run it after writes that bypass model signals, such as raw SQL or queryset.update() on searchable fields.
+"""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from database.models.search_document import SearchDocument, create_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the search index of models and instruments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database to rebuild the index of')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        create_search_index(using)
+        with transaction.atomic(using=using):
+            count = SearchDocument.objects.db_manager(using).rebuild()
+        self.stdout.write(f'Indexed {count} search documents.')
@@ -0,0 +1,42 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class DataVersionManager(models.Manager):
+
+    def bump(self, *scopes):
+        """ Increments the version counter of every given scope, creating counters the first time they are used. """
+        now = timezone.now()
+        for scope in scopes:
+            if self.filter(scope=scope).update(version=F('version') + 1, updated_at=now):
+                continue
+            try:
+                with transaction.atomic(using=self.db):
+                    self.create(scope=scope, version=1, updated_at=now)
+            except IntegrityError:
+                self.filter(scope=scope).update(version=F('version') + 1, updated_at=now)
+
+    def current(self, *scopes):
+        """ Returns a token identifying the current version of the given scopes and when any of them last changed. """
+        rows = self.filter(scope__in=scopes).values_list('scope', 'version', 'updated_at')
+        versions = {scope: (version, updated_at) for scope, version, updated_at in rows}
+        token = ':'.join(f'{scope}={versions[scope][0]}@{versions[scope][1].isoformat()}' if scope in versions
+                         else f'{scope}=0' for scope in sorted(scopes))
+        last_modified = max((updated_at for version, updated_at in versions.values()), default=None)
+        return token, last_modified
+
+
+class DataVersion(models.Model):
+    """
+    Counter that is incremented on every write to the tables covered by its scope. Cached data derived from those
+    tables stays valid for as long as the counter does not change.
+    """
+    scope = models.CharField(max_length=40, unique=True)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = DataVersionManager()
+
+    def __str__(self):
+        return f'{self.scope}={self.version}'
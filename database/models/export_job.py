@@ -0,0 +1,79 @@
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from user_portal.models import User
+
+
+def orphaned_before():
+    return timezone.now() - timedelta(seconds=settings.EXPORT_JOB_ORPHAN_TIMEOUT)
+
+
+class ExportJobManager(models.Manager):
+
+    def expired(self):
+        return self.filter(created_at__lt=timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TTL))
+
+    def purge_expired(self):
+        """ Deletes expired jobs along with their files on disk. """
+        for job in self.expired():
+            job.delete_file()
+            job.delete()
+
+    def orphaned(self):
+        """ Jobs still pending or running whose thread has stopped sending heartbeats, as after a worker restart """
+        return self.filter(status__in=ExportJob.ACTIVE_STATUSES, heartbeat_at__lt=orphaned_before())
+
+
+class ExportJob(models.Model):
+    STATUS_CHOICES = [
+        ('PENDING', 'Waiting to start'),
+        ('RUNNING', 'Writing export file'),
+        ('DONE', 'Export file ready for download'),
+        ('FAILED', 'Export failed'),
+    ]
+    ACTIVE_STATUSES = ['PENDING', 'RUNNING']
+    TYPE_CHOICES = [
+        ('MODELS', 'Models'),
+        ('INSTRUMENTS', 'Instruments'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, related_name='export_jobs', on_delete=models.CASCADE)
+    export_type = models.CharField(max_length=16, choices=TYPE_CHOICES)
+    export_format = models.CharField(max_length=16, default='csv')
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='PENDING')
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(default=timezone.now)
+
+    objects = ExportJobManager()
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'(Export Job:{self.pk}, Type:{self.export_type}, Status:{self.status})'
+
+    @property
+    def path(self):
+        return os.path.join(settings.EXPORT_JOB_DIR, f'{self.pk}.{self.export_format}')
+
+    def fail_if_orphaned(self):
+        """ Marks the job FAILED if its thread stopped before finishing it, writing only when it did """
+        if self.status not in self.ACTIVE_STATUSES or self.heartbeat_at >= orphaned_before():
+            return
+        if ExportJob.objects.orphaned().filter(pk=self.pk).update(status='FAILED', error='Export was interrupted',
+                                                                  finished_at=timezone.now()):
+            self.refresh_from_db()
+
+    def delete_file(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
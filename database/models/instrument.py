@@ -1,18 +1,49 @@
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.validators import FileExtensionValidator, MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import DateField, ExpressionWrapper, F, OuterRef, Subquery, UniqueConstraint
+from django.db.models import Case, CharField, DateField, DateTimeField, ExpressionWrapper, F, OuterRef, Subquery, \
+    UniqueConstraint, Value, When
+from django.utils import timezone
 
-from database.constants import CALIBRATION_EVENT_TEMPLATE, COMMENT_LENGTH, INSTRUMENT_TEMPLATE, SERIAL_NUMBER_LENGTH
+from database.constants import CALIBRATION_EVENT_TEMPLATE, CALIBRATION_EXPIRING_DAYS, COMMENT_LENGTH, \
+    INSTRUMENT_TEMPLATE, SERIAL_NUMBER_LENGTH
+from database.enums import CalibrationStatusEnum
 from database.models.instrument_category import InstrumentCategory
 from database.models.model import Model
+from database.models.versioned import VersionedModel
 from database.validators import validate_max_date
 from user_portal.models import User as User
 
 
+def with_calibration_dates(queryset):
+    """ Annotates instruments with the date of their latest approved calibration and the date it expires """
+    sq = CalibrationEvent.objects.filter(instrument=OuterRef('pk')).filter(approval_data__approved=True).order_by('-date')
+    expression = F('most_recent_calibration_date') + F('model__calibration_frequency')
+    expiration = ExpressionWrapper(expression, output_field=DateTimeField())
+    queryset = queryset.annotate(most_recent_calibration_date=Subquery(sq.values('date')[:1]))
+    return queryset.annotate(calibration_expiration_date=expiration)
+
+
+def calibration_status(now=None):
+    """
+    CalibrationStatusEnum value of each instrument of a queryset annotated by with_calibration_dates, at now (the
+    current time by default).
+    """
+    now = timezone.now() if now is None else now
+    return Case(
+        When(model__calibration_mode='NOT_CALIBRATABLE', then=Value(CalibrationStatusEnum.NOT_CALIBRATABLE.value)),
+        When(calibration_expiration_date=None, then=Value(CalibrationStatusEnum.UNCALIBRATED.value)),
+        When(calibration_expiration_date__lt=now, then=Value(CalibrationStatusEnum.EXPIRED.value)),
+        When(calibration_expiration_date__lt=now + timedelta(days=CALIBRATION_EXPIRING_DAYS),
+             then=Value(CalibrationStatusEnum.EXPIRING.value)),
+        default=Value(CalibrationStatusEnum.VALID.value),
+        output_field=CharField(),
+    )
+
+
 class InstrumentManager(models.Manager):
 
     def create(
@@ -120,7 +151,7 @@ class InstrumentManager(models.Manager):
         return qs.filter(pk__in=calibrators)
 
 
-class Instrument(models.Model):
+class Instrument(VersionedModel):
     model = models.ForeignKey(Model, related_name='instruments', on_delete=models.PROTECT)
     serial_number = models.CharField(blank=True, null=True, max_length=SERIAL_NUMBER_LENGTH)
     comment = models.CharField(max_length=COMMENT_LENGTH, blank=True, default='')
@@ -249,6 +280,32 @@ class CalibrationEventManager(models.Manager):
         return self.filter(instrument__pk=pk).filter(approval_data__approved=True).filter(date__lte=date)\
                    .annotate(expiration=expression).filter(expiration__gte=date).order_by('-date').first()
 
+    def find_calibration_events(self, pairs):
+        """
+        Given (instrument pk, date) pairs, returns {pair: (event pk, event date, calibrator pks)} for the most recent
+        calibration event valid at each date, as find_calibration_event does for one pair, in one query
+        """
+        pairs = set(pairs)
+        if not pairs:
+            return {}
+        expression = ExpressionWrapper(F('date') + F('instrument__model__calibration_frequency'),
+                                       output_field=DateTimeField())
+        rows = self.filter(instrument__in={pk for pk, date in pairs}, approval_data__approved=True,
+                           date__lte=max(date for pk, date in pairs)).annotate(expiration=expression)\
+            .order_by('-date', '-pk').values_list('pk', 'instrument', 'date', 'expiration', 'calibrated_with')
+        events = {}
+        for pk, instrument, date, expiration, calibrator in rows:
+            event = events.setdefault(instrument, {}).setdefault(pk, (date, expiration, set()))
+            if calibrator is not None:
+                event[2].add(calibrator)
+        found = {}
+        for instrument, date in pairs:
+            for pk, (event_date, expiration, calibrators) in events.get(instrument, {}).items():
+                if event_date <= date <= expiration:
+                    found[instrument, date] = (pk, event_date, calibrators)
+                    break
+        return found
+
     def find_valid_calibration_event(self, pk):
         return self.filter(instrument__pk=pk).filter(approval_data__approved=True).order_by('-date').first()
 
@@ -258,7 +315,7 @@ def instrument_evidence_directory_path(instance, filename):
     return f'instrument_{instance.instrument.pk}/{instance.date}/{filename}'
 
 
-class CalibrationEvent(models.Model):
+class CalibrationEvent(VersionedModel):
     """
     Upload a file: The user may attach a single file of type JPG, PNG, GIF, PDF, or XLSX. Files larger than 32 MB must
     be rejected. Allowed for all models.
@@ -289,7 +346,7 @@ class CalibrationEvent(models.Model):
             raise ValidationError("Cannot add Calibration Event to Instrument whose Model cannot be calibrated")
 
 
-class ApprovalData(models.Model):
+class ApprovalData(VersionedModel):
     calibration_event = models.OneToOneField(CalibrationEvent, related_name="approval_data", on_delete=models.CASCADE)
     approved = models.BooleanField(default=False)
     approver = models.ForeignKey(User, on_delete=models.PROTECT)
@@ -6,6 +6,7 @@ from django.db import models
 
 from database.constants import COMMENT_LENGTH, DESCRIPTION_LENGTH, MODEL_NUMBER_LENGTH, MODEL_TEMPLATE, VENDOR_LENGTH
 from database.models.model_category import ModelCategory
+from database.models.versioned import VersionedModel
 
 
 class ModelManager(models.Manager):
@@ -75,7 +76,7 @@ class ModelManager(models.Manager):
         return
 
 
-class Model(models.Model):
+class Model(VersionedModel):
     CALIBRATION_CHOICES = [
         ('NOT_CALIBRATABLE', 'Cannot calibrate this instrument'),
         ('DEFAULT', 'Simple Event or File Input'),
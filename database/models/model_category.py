@@ -3,9 +3,10 @@ from django.db import models
 from django.core.validators import RegexValidator
 
 from database.constants import CATEGORY_LENGTH
+from database.models.versioned import VersionedModel
 
 
-class ModelCategory(models.Model):
+class ModelCategory(VersionedModel):
     name = models.CharField(blank=False, unique=True, max_length=CATEGORY_LENGTH,
                             validators=[RegexValidator("^[\S]*$",
                                                        message="Name of a category can only contain alphanumeric "
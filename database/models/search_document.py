@@ -0,0 +1,212 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+
+from database.enums import DataScopeEnum, InstrumentEnum, ModelEnum
+from database.models.instrument import Instrument
+from database.models.model import Model
+
+INDEX_CHUNK_SIZE = 1000
+
+# the search fields whose values make up the search document of each indexed model
+INDEXED_FIELDS = {
+    Model: [
+        ModelEnum.VENDOR.value,
+        ModelEnum.MODEL_NUMBER.value,
+        ModelEnum.DESCRIPTION.value,
+        'model_categories__name',
+    ],
+    Instrument: [
+        'model__' + ModelEnum.VENDOR.value,
+        'model__' + ModelEnum.MODEL_NUMBER.value,
+        'model__' + ModelEnum.DESCRIPTION.value,
+        'model__model_categories__name',
+        InstrumentEnum.SERIAL_NUMBER.value,
+        'instrument_categories__name',
+        InstrumentEnum.ASSET_TAG_NUMBER.value,
+    ],
+}
+
+SCOPES = {
+    Model: DataScopeEnum.MODELS.value,
+    Instrument: DataScopeEnum.INSTRUMENTS.value,
+}
+
+# search terms never contain whitespace, so no term can match across two values
+SEPARATOR = '\n'
+
+_deferred = threading.local()
+
+
+class SearchDocumentManager(models.Manager):
+
+    def matching(self, model, term):
+        """ Returns the primary keys of the rows of model with a search field containing term, ignoring case. """
+        documents = self.filter(scope=SCOPES[model])
+        if connections[self.db].vendor == 'sqlite' and sqlite_has_trigram() and len(term) >= 3:
+            # the trigram tokenizer matches a quoted phrase anywhere in the text, ignoring case
+            phrase = '"' + term.replace('"', '""') + '"'
+            documents = documents.filter(
+                pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [phrase]))
+        else:
+            documents = documents.filter(document__icontains=term)
+        return documents.values('object_id')
+
+    def index(self, model, pks):
+        """ Creates or updates the search documents of the given rows of model, removing those of deleted rows. """
+        scope = SCOPES[model]
+        pks = set(pks)
+        texts = documents(model._default_manager.using(self.db), pks)
+        existing = dict(self.filter(scope=scope, object_id__in=pks).values_list('object_id', 'pk'))
+        self.filter(scope=scope, object_id__in=pks - texts.keys()).delete()
+        self.bulk_update([SearchDocument(pk=existing[pk], scope=scope, object_id=pk, document=text)
+                          for pk, text in texts.items() if pk in existing], ['document'])
+        self.bulk_create([SearchDocument(scope=scope, object_id=pk, document=text)
+                          for pk, text in texts.items() if pk not in existing])
+
+    def index_later(self, model, pks):
+        """ Indexes the given rows of model now, or when the enclosing deferred_indexing() block exits. """
+        pending = getattr(_deferred, 'pending', None)
+        if pending is None:
+            self.index(model, pks)
+        else:
+            pending.setdefault(model, set()).update(pks)
+
+    def remove(self, model, pks):
+        self.filter(scope=SCOPES[model], object_id__in=pks).delete()
+
+    def index_missing(self):
+        """ Indexes every row that has no search document yet, returning how many there were. """
+        indexed = 0
+        for model, scope in SCOPES.items():
+            missing = model._default_manager.using(self.db) \
+                .exclude(pk__in=self.filter(scope=scope).values('object_id')).values_list('pk', flat=True)
+            indexed += self.index_in_chunks(model, missing)
+        return indexed
+
+    def rebuild(self):
+        """ Replaces every search document, returning how many were written. """
+        self.all().delete()
+        return sum(self.index_in_chunks(model, model._default_manager.using(self.db).values_list('pk', flat=True))
+                   for model in SCOPES)
+
+    def index_in_chunks(self, model, pks):
+        pks = list(pks)
+        for start in range(0, len(pks), INDEX_CHUNK_SIZE):
+            self.index(model, pks[start:start + INDEX_CHUNK_SIZE])
+        return len(pks)
+
+
+class SearchDocument(models.Model):
+    """
+    Values of the search fields of a model or instrument, joined into one text column that can be searched through an
+    index: a pg_trgm GIN index on Postgres and an FTS5 trigram table on SQLite. database.signals keeps the documents
+    in step with writes; rebuild them with manage.py rebuild_search_index.
+    """
+    scope = models.CharField(max_length=40)
+    object_id = models.PositiveIntegerField()
+    document = models.TextField()
+
+    objects = SearchDocumentManager()
+
+    class Meta:
+        unique_together = ['scope', 'object_id']
+
+    def __str__(self):
+        return f'{self.scope}:{self.object_id}'
+
+
+@contextmanager
+def deferred_indexing():
+    """
+    Collects the rows that writes inside the block would index and indexes each of them once when the outermost block
+    exits, for writes that touch the same rows many times.
+    """
+    if getattr(_deferred, 'pending', None) is not None:
+        yield
+        return
+    _deferred.pending = {}
+    try:
+        yield
+    finally:
+        pending, _deferred.pending = _deferred.pending, None
+        for model, pks in pending.items():
+            SearchDocument.objects.index_in_chunks(model, pks)
+
+
+FTS_TABLE = SearchDocument._meta.db_table + '_fts'
+TRIGRAM_INDEX = SearchDocument._meta.db_table + '_trgm'
+
+
+def documents(queryset, pks):
+    """ Returns {pk: search document} for the rows of queryset with the given primary keys. """
+    fields = INDEXED_FIELDS[queryset.model]
+    single = [field for field in fields if not is_many(queryset.model, field)]
+    rows = queryset.filter(pk__in=pks)
+    values = {pk: list(row) for pk, *row in rows.values_list('pk', *single)}
+    for field in fields:
+        if field not in single:
+            for pk, value in rows.values_list('pk', field):
+                if pk in values:
+                    values[pk].append(value)
+    return {pk: SEPARATOR.join(str(value) for value in row if value not in (None, '')) for pk, row in values.items()}
+
+
+def is_many(model, path):
+    """ True if the lookup path crosses a relation with many rows per row of model. """
+    for name in path.split('__'):
+        field = model._meta.get_field(name)
+        if field.many_to_many or field.one_to_many:
+            return True
+        if not field.is_relation:
+            return False
+        model = field.related_model
+    return False
+
+
+@lru_cache()
+def sqlite_has_trigram():
+    """ True if this SQLite was built with FTS5 and is recent enough (3.34) for its trigram tokenizer. """
+    connection = sqlite3.connect(':memory:')
+    try:
+        connection.execute("CREATE VIRTUAL TABLE t USING fts5(x, tokenize='trigram')")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+
+
+def create_search_index(using='default'):
+    """
+    Creates the index behind search documents. On Postgres the role needs permission to create the pg_trgm extension
+    unless it is already installed. SQLite builds without the trigram tokenizer fall back to scanning the documents.
+    """
+    connection = connections[using]
+    table = SearchDocument._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            # icontains compares UPPER(document::text), and the index has to match that expression
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON {table} '
+                           f'USING gin ((UPPER(document::text)) gin_trgm_ops)')
+        elif connection.vendor == 'sqlite' and sqlite_has_trigram():
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            exists = cursor.fetchone() is not None
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                           f"USING fts5(document, content='{table}', content_rowid='id', tokenize='trigram')")
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {table} BEGIN '
+                           f'INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.id, new.document); END')
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {table} BEGIN '
+                           f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) "
+                           f"VALUES ('delete', old.id, old.document); END")
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE ON {table} BEGIN '
+                           f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) "
+                           f"VALUES ('delete', old.id, old.document); "
+                           f'INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.id, new.document); END')
+            if not exists:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
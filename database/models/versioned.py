@@ -0,0 +1,28 @@
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+
+
+def touch(queryset):
+    """ Marks every row of queryset as changed, for changes that do not go through save() """
+    return queryset.update(version=F('version') + 1, updated_at=timezone.now())
+
+
+class VersionedModel(models.Model):
+    """
+    Abstract base for rows that carry a version, incremented on every save, and the time they last changed, so the API
+    can answer conditional requests. database.signals touches the rows whose representation embeds a changed row.
+    """
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+        self.updated_at = timezone.now()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'version', 'updated_at'}
+        super().save(*args, **kwargs)
@@ -0,0 +1,231 @@
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from database.response_cache import data_version, normalized_params
+
+# query parameters that select a page or shape its rows rather than filter the results
+PAGE_PARAMS = {'page', 'page_size', 'ordering', 'cursor', 'format', 'fields', 'expand'}
+
+
+class SmallResultsSetPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class CountingPaginator(Paginator):
+    """ Paginator whose count is computed by the given function instead of queryset.count(). """
+
+    def __init__(self, object_list, per_page, count_function=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_function = count_function
+
+    @cached_property
+    def count(self):
+        return self.count_function(self.object_list)
+
+
+class CachedCountPagination(SmallResultsSetPagination):
+    """
+    Page number pagination that counts a stripped copy of the queryset (primary keys only, without annotations or
+    ordering) and caches the count for PAGINATION_COUNT_CACHE_TIMEOUT seconds, keyed by the filter parameters and the
+    data version of the view's data_scopes. Above PAGINATION_COUNT_ESTIMATE_THRESHOLD rows (if set, Postgres only)
+    the planner's row estimate is returned instead of an exact count.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_is_estimate = False
+        cache_key = count_cache_key(request, view)
+        self.django_paginator_class = lambda object_list, per_page: CountingPaginator(
+            object_list, per_page, count_function=lambda qs: self.cached_count(qs, cache_key))
+        return super().paginate_queryset(queryset, request, view)
+
+    def cached_count(self, queryset, cache_key):
+        cached = cache.get(cache_key)
+        if cached is None:
+            cached = self.count(queryset)
+            cache.set(cache_key, cached, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        count, self.count_is_estimate = cached
+        return count
+
+    def count(self, queryset):
+        queryset = counting_queryset(queryset)
+        threshold = settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD
+        if threshold is not None and connections[queryset.db].vendor == 'postgresql':
+            estimate = estimated_count(queryset)
+            if estimate > threshold:
+                return estimate, True
+        return queryset.count(), False
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_is_estimate'] = self.count_is_estimate
+        return response
+
+
+def counting_queryset(queryset):
+    """ Rows of queryset as a queryset of primary keys, without annotations or ordering to evaluate. """
+    return queryset.model._default_manager.order_by().filter(pk__in=queryset.order_by().values('pk'))
+
+
+def estimated_count(queryset):
+    """ Number of rows the Postgres planner expects queryset to return. """
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_cache_key(request, view):
+    token, updated_at = data_version(view)
+    data = json.dumps([request.path, normalized_params(request, PAGE_PARAMS), token])
+    return 'pagination-count:' + hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks past the last row of the previous page instead of using OFFSET, so every page costs
+    the same no matter how deep it is.
+
+    Works with any ordering the view's OrderingFilter accepts. The primary key is appended as a tie-breaker so the
+    order is total, and nulls sort last in both directions. The cursor encodes the ordering values of the last row
+    returned. Start with ?cursor= and follow the next links.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*[F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_last=True)
+                                       for field, descending in self.ordering])
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(request.query_params[self.page_size_query_param], strict=True,
+                                 cutoff=self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """ Returns (field, descending) pairs for the requested ordering, always ending with the primary key. """
+        ordering_filter = next((backend() for backend in getattr(view, 'filter_backends', [])
+                                if issubclass(backend, OrderingFilter)), OrderingFilter())
+        terms = ordering_filter.get_ordering(request, queryset, view) or queryset.query.order_by \
+            or queryset.model._meta.ordering
+        ordering = [(term.lstrip('-'), term.startswith('-')) for term in terms if isinstance(term, str)]
+        if not any(field in {'pk', queryset.model._meta.pk.name} for field, descending in ordering):
+            ordering.append(('pk', False))
+        return ordering
+
+    def after(self, position):
+        """ Q matching the rows that come after position in the (nulls last) ordering. """
+        q = Q(pk__in=[])
+        equal = Q()
+        for (field, descending), value in zip(self.ordering, position):
+            if value is None:
+                equal &= Q(**{f'{field}__isnull': True})
+                continue
+            beyond = Q(**{f'{field}__{"lt" if descending else "gt"}': value}) | Q(**{f'{field}__isnull': True})
+            q |= equal & beyond
+            equal &= Q(**{field: value})
+        return q
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [resolve(last, field) for field, descending in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_position(position))
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = decode_position(cursor)
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+
+def resolve(obj, field):
+    for name in field.split('__'):
+        if obj is None:
+            return None
+        obj = getattr(obj, name)
+    return obj
+
+
+def encode_value(value):
+    if isinstance(value, datetime):
+        return {'datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'date': value.isoformat()}
+    if isinstance(value, timedelta):
+        return {'timedelta': [value.days, value.seconds, value.microseconds]}
+    return value
+
+
+def decode_value(value):
+    if isinstance(value, dict):
+        if 'datetime' in value:
+            return parse_datetime(value['datetime'])
+        if 'date' in value:
+            return parse_date(value['date'])
+        return timedelta(*value['timedelta'])
+    return value
+
+
+def encode_position(position):
+    data = json.dumps([encode_value(value) for value in position], separators=(',', ':'))
+    return urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_position(cursor):
+    data = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+    position = json.loads(data)
+    if not isinstance(position, list):
+        raise ValueError(cursor)
+    return [decode_value(value) for value in position]
@@ -0,0 +1,116 @@
+"""
+In-process index of the distinct vendors and model numbers of models, serving the model picker without a database
+query per keystroke. Each worker builds its own copy on first use. Model signals drop the copy of the worker that
+made the write, and every worker compares the models data version at most once every PICKER_INDEX_RECHECK_INTERVAL
+seconds to notice writes made by the others.
+"""
+import heapq
+import threading
+import time
+from functools import reduce
+
+from django.conf import settings
+
+from database.enums import DataScopeEnum
+from database.models.data_version import DataVersion
+from database.models.model import Model
+
+# queries up to this long are looked up directly; longer ones intersect the postings of their n-grams of this length
+NGRAM_LENGTH = 3
+
+EXACT, PREFIX, SUBSTRING = range(3)
+
+
+def ngrams(value, length=NGRAM_LENGTH):
+    return {value[start:start + n] for n in range(1, length + 1) for start in range(len(value) - n + 1)}
+
+
+class NgramIndex:
+    """ Distinct values of one field, each with the sorted values of another field it appears with """
+
+    def __init__(self, pairs):
+        related = {}
+        for value, other in pairs:
+            related.setdefault(value, set()).add(other)
+        self.values = sorted(related)
+        self.related = [sorted(related[value]) for value in self.values]
+        self.folded = [value.casefold() for value in self.values]
+        postings = {}
+        for position, value in enumerate(self.folded):
+            for gram in ngrams(value):
+                postings.setdefault(gram, []).append(position)
+        self.postings = {gram: frozenset(positions) for gram, positions in postings.items()}
+
+    def search(self, query):
+        """ Yields (rank, position) for every value containing query, ignoring case """
+        query = query.casefold()
+        if not query:
+            candidates = range(len(self.values))
+        elif len(query) <= NGRAM_LENGTH:
+            candidates = self.postings.get(query, ())
+        else:
+            postings = sorted((self.postings.get(gram, frozenset()) for gram in ngrams(query, NGRAM_LENGTH)
+                               if len(gram) == NGRAM_LENGTH), key=len)
+            candidates = [position for position in reduce(frozenset.intersection, postings)
+                          if query in self.folded[position]]
+        for position in candidates:
+            value = self.folded[position]
+            yield EXACT if value == query else PREFIX if value.startswith(query) else SUBSTRING, position
+
+    def related_values(self, query, limit=None):
+        """
+        Values of the other field that appear with a value containing query, best match first: exact matches, then
+        prefixes, then other substrings, each in alphabetical order.
+        """
+        related_by_rank = [[], [], []]
+        for rank, position in self.search(query or ''):
+            related_by_rank[rank].append(self.related[position])
+        # merging the sorted lists lazily stops after limit values, however many rows match
+        found, seen = [], set()
+        for related in related_by_rank:
+            for value in heapq.merge(*related):
+                if value not in seen:
+                    seen.add(value)
+                    found.append(value)
+                    if len(found) == limit:
+                        return found
+        return found
+
+
+class PickerIndex:
+
+    def __init__(self, rows):
+        rows = list(rows)
+        self.by_vendor = NgramIndex(rows)
+        self.by_model_number = NgramIndex((model_number, vendor) for vendor, model_number in rows)
+
+    def vendors(self, model_number=None, limit=None):
+        """ Vendors with a model number containing model_number """
+        return self.by_model_number.related_values(model_number, limit)
+
+    def model_numbers(self, vendor=None, limit=None):
+        """ Model numbers of the vendors containing vendor """
+        return self.by_vendor.related_values(vendor, limit)
+
+
+_lock = threading.Lock()
+_state = {'index': None, 'token': None, 'checked_at': None}
+
+
+def picker_index():
+    """ Returns this worker's picker index, rebuilding it if models changed since it was built """
+    with _lock:
+        now = time.monotonic()
+        if _state['index'] is not None and now - _state['checked_at'] < settings.PICKER_INDEX_RECHECK_INTERVAL:
+            return _state['index']
+        token, last_modified = DataVersion.objects.current(DataScopeEnum.MODELS.value)
+        if _state['index'] is None or token != _state['token']:
+            rows = Model.objects.order_by().values_list('vendor', 'model_number').distinct()
+            _state.update(index=PickerIndex(rows), token=token)
+        _state['checked_at'] = now
+        return _state['index']
+
+
+def invalidate_picker_index():
+    with _lock:
+        _state['index'] = None
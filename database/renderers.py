@@ -0,0 +1,43 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+
+class ExportFormatRenderer(JSONRenderer):
+    """
+    Makes an export format selectable through ?format= or the Accept header. Export actions build their own file
+    responses, so these renderers only ever render error responses, which stay JSON.
+    """
+
+
+class CSVExportRenderer(ExportFormatRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class JSONLinesExportRenderer(ExportFormatRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
+
+
+ITEMS_PER_CHUNK = 500
+
+
+def json_array_chunks(items):
+    """
+    Renders items one at a time into the same bytes JSONRenderer would produce for the whole list, yielding a chunk
+    every ITEMS_PER_CHUNK items so nothing but the current chunk is held in memory.
+    """
+    renderer = JSONRenderer()
+    chunk = [b'[']
+    for index, item in enumerate(items):
+        if index:
+            chunk.append(b',')
+        chunk.append(renderer.render(item))
+        if len(chunk) >= 2 * ITEMS_PER_CHUNK:
+            yield b''.join(chunk)
+            chunk = []
+    chunk.append(b']')
+    yield b''.join(chunk)
+
+
+EXPORT_RENDERER_CLASSES = [CSVExportRenderer, JSONLinesExportRenderer] + api_settings.DEFAULT_RENDERER_CLASSES
@@ -0,0 +1,77 @@
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from database.enums import DataScopeEnum
+from database.models.data_version import DataVersion
+
+CACHED_HEADERS = ['ETag', 'Last-Modified']
+
+
+def cache_response(timeout=None):
+    """
+    Caches the data of successful responses of a viewset action. Entries are keyed by path, action, query parameters,
+    accepted media type, the user's permissions and the data version of the view's data_scopes, so the signals that
+    bump data versions on writes invalidate them on every backend. A cached ETag or Last-Modified is still honoured.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            key = response_cache_key(view, request)
+            cached = cache.get(key)
+            if cached is None:
+                response = method(view, request, *args, **kwargs)
+                if isinstance(response, Response) and response.status_code == 200:
+                    headers = {header: response[header] for header in CACHED_HEADERS if header in response}
+                    cache.set(key, (response.data, headers),
+                              settings.RESPONSE_CACHE_TIMEOUT if timeout is None else timeout)
+                return response
+
+            data, headers = cached
+            last_modified = parse_http_date_safe(headers['Last-Modified']) if 'Last-Modified' in headers else None
+            response = get_conditional_response(request, etag=headers.get('ETag'), last_modified=last_modified)
+            if response is None:
+                response = Response(data)
+            for header, value in headers.items():
+                response[header] = value
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def permission_key(user):
+    if user.is_superuser:
+        return ['superuser']
+    return sorted(user.get_all_permissions())
+
+
+def data_version(view):
+    """ The DataVersion token of the view's data_scopes and when they last changed, read once per request """
+    if not hasattr(view, '_data_version'):
+        scopes = getattr(view, 'data_scopes', [e.value for e in DataScopeEnum])
+        version = DataVersion.objects.current(*scopes)
+        if view is None:
+            return version
+        view._data_version = version
+    return view._data_version
+
+
+def normalized_params(request, exclude=()):
+    return sorted((k, v) for k in request.query_params for v in request.query_params.getlist(k)
+                  if v != '' and k not in exclude)
+
+
+def response_cache_key(view, request):
+    token, updated_at = data_version(view)
+    data = json.dumps([request.path, getattr(view, 'action', None), normalized_params(request),
+                       request.accepted_media_type, permission_key(request.user), token])
+    return 'response:' + hashlib.sha256(data.encode('utf-8')).hexdigest()
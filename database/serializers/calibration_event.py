@@ -4,6 +4,7 @@ from datetime import datetime
 from database.enums import ApprovalDataEnum, CalibrationEventEnum, InstrumentEnum, ModelEnum
 from database.models.instrument import ApprovalData, CalibrationEvent, Instrument
 from database.models.model import Model
+from database.validators import validate_max_date
 from user_portal.serializers import UserFieldsForCalibrationEventSerializer, UserForApprovalDataSerializer
 
 
@@ -132,3 +133,25 @@ class CalibrationEventSerializer(serializers.ModelSerializer):
             if 'date' in attrs:
                 attrs['date'] = attrs['date'].astimezone()
         return attrs
+
+
+class CalibrationEventBulkSerializer(serializers.ModelSerializer):
+    """ Fields shared by the calibration events of a bulk calibration, and the asset tags of the instruments """
+    date = serializers.DateTimeField(format="%Y-%m-%d", input_formats=["%Y-%m-%d"], validators=[validate_max_date])
+    calibrated_with = serializers.ListField(child=serializers.IntegerField(), required=False)
+    instruments = serializers.ListField(child=serializers.IntegerField(), min_length=1)
+
+    class Meta:
+        model = CalibrationEvent
+        fields = [
+            CalibrationEventEnum.DATE.value,
+            CalibrationEventEnum.COMMENT.value,
+            CalibrationEventEnum.LOAD_BANK_DATA.value,
+            CalibrationEventEnum.GUIDED_HARDWARE_DATA.value,
+            CalibrationEventEnum.CUSTOM_DATA.value,
+            CalibrationEventEnum.CALIBRATED_WITH.value,
+            'instruments',
+        ]
+
+    def validate_date(self, value):
+        return value.astimezone()
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from database.enums import ExportJobEnum
+from database.models.export_job import ExportJob
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExportJob
+        fields = [e.value for e in ExportJobEnum]
+        read_only_fields = fields
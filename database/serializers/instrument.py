@@ -49,7 +49,7 @@ class InstrumentCategoryRetrieveSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = InstrumentCategory
-        fields = [e.value for e in CategoryEnum] + ['model_list']
+        fields = [e.value for e in CategoryEnum] + ['instrument_list']
 
 
 class InstrumentCategorySerializer(serializers.ModelSerializer):
@@ -147,10 +147,22 @@ class InstrumentBaseSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class InstrumentBulkWriteSerializer(InstrumentBaseSerializer):
+    """ Validates one item of a bulk write without queries; BulkInstruments checks the relations and unique fields """
+    model = serializers.IntegerField(source='model_id')
+    asset_tag_number = serializers.IntegerField(required=False, min_value=100000, max_value=999999)
+    instrument_categories = serializers.ListField(child=serializers.CharField(), required=False)
+
+    class Meta(InstrumentBaseSerializer.Meta):
+        validators = []
+
+
 class InstrumentSerializer(InstrumentBaseSerializer):
+    representation_class = InstrumentListSerializer
+
     def to_representation(self, instance):
         try:
-            return InstrumentListSerializer(instance).data
+            return self.representation_class(instance).data
         except AttributeError as e:
             print(e)
             return InstrumentBaseSerializer(instance).data
@@ -168,9 +168,20 @@ class ModelBaseSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class ModelBulkWriteSerializer(ModelBaseSerializer):
+    """ Validates one item of a bulk write without queries; BulkModels checks the categories and unique fields """
+    model_categories = serializers.ListField(child=serializers.CharField(), required=False)
+    calibrator_categories = serializers.ListField(child=serializers.CharField(), required=False)
+
+    class Meta(ModelBaseSerializer.Meta):
+        validators = []
+
+
 class ModelSerializer(ModelBaseSerializer):
+    representation_class = ModelListSerializer
+
     def to_representation(self, instance):
         try:
-            return ModelListSerializer(instance).data
+            return self.representation_class(instance).data
         except AttributeError:
             return ModelBaseSerializer(instance).data
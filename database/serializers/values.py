@@ -0,0 +1,105 @@
+"""
+Read-only list representations built straight from values() rows, skipping the serializer field machinery on the
+hottest endpoints. Each produces exactly what its serializer would for the same rows.
+"""
+from django.utils.duration import duration_string
+from rest_framework import serializers
+
+from database.models.instrument import Instrument
+from database.models.model import Model
+
+CHUNK_SIZE = 2000
+
+date_representation = serializers.DateTimeField(format="%Y-%m-%d").to_representation
+
+MODEL_LIST_VALUES = [
+    'pk',
+    'vendor',
+    'model_number',
+    'description',
+    'calibration_frequency',
+    'approval_required',
+]
+
+INSTRUMENT_LIST_VALUES = [
+    'pk',
+    'model__pk',
+    'model__vendor',
+    'model__model_number',
+    'model__description',
+    'model__calibration_mode',
+    'model__approval_required',
+    'model__custom_form',
+    'serial_number',
+    'asset_tag_number',
+    'most_recent_calibration_date',
+    'calibration_expiration_date',
+]
+
+
+def categories_by_owner(field, owner_pks):
+    """
+    Returns {owner pk: [{'pk': ..., 'name': ...}, ...]} for a category many-to-many field in one query, with each list
+    in category name order.
+    """
+    through = field.remote_field.through
+    owner, category = field.m2m_field_name(), field.m2m_reverse_field_name()
+    links = through.objects.filter(**{f'{owner}_id__in': owner_pks}).order_by(f'{category}__name') \
+        .values_list(f'{owner}_id', f'{category}_id', f'{category}__name')
+    categories = {}
+    for owner_pk, pk, name in links:
+        categories.setdefault(owner_pk, []).append({'pk': pk, 'name': name})
+    return categories
+
+
+def model_list_data(rows):
+    """ ModelListSerializer output for rows of values(*MODEL_LIST_VALUES) """
+    model_categories = categories_by_owner(Model.model_categories.field, [row['pk'] for row in rows])
+    return [{
+        'pk': row['pk'],
+        'vendor': row['vendor'],
+        'model_number': row['model_number'],
+        'description': row['description'],
+        'calibration_frequency': None if row['calibration_frequency'] is None else duration_string(
+            row['calibration_frequency']),
+        'model_categories': model_categories.get(row['pk'], []),
+        'approval_required': row['approval_required'],
+    } for row in rows]
+
+
+def instrument_list_data(rows):
+    """ InstrumentListSerializer output for rows of values(*INSTRUMENT_LIST_VALUES) """
+    model_pks = {row['model__pk'] for row in rows}
+    model_categories = categories_by_owner(Model.model_categories.field, model_pks)
+    calibrator_categories = categories_by_owner(Model.calibrator_categories.field, model_pks)
+    instrument_categories = categories_by_owner(Instrument.instrument_categories.field, [row['pk'] for row in rows])
+    return [{
+        'pk': row['pk'],
+        'model': {
+            'pk': row['model__pk'],
+            'vendor': row['model__vendor'],
+            'model_number': row['model__model_number'],
+            'description': row['model__description'],
+            'model_categories': model_categories.get(row['model__pk'], []),
+            'calibration_mode': row['model__calibration_mode'],
+            'calibrator_categories': calibrator_categories.get(row['model__pk'], []),
+            'approval_required': row['model__approval_required'],
+            'custom_form': row['model__custom_form'],
+        },
+        'serial_number': row['serial_number'],
+        'asset_tag_number': row['asset_tag_number'],
+        'instrument_categories': instrument_categories.get(row['pk'], []),
+        'most_recent_calibration_date': date_representation(row['most_recent_calibration_date']),
+        'calibration_expiration_date': date_representation(row['calibration_expiration_date']),
+    } for row in rows]
+
+
+def iterate_data_in_chunks(queryset, representation, chunk_size=CHUNK_SIZE):
+    """ Yields the representation of every row of a values() queryset, one chunk of rows at a time """
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield from representation(chunk)
+            chunk = []
+    yield from representation(chunk)
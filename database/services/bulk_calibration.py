@@ -0,0 +1,159 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from database.enums import CalibrationEventEnum, DataScopeEnum, InstrumentEnum
+from database.models.data_version import DataVersion
+from database.models.instrument import ApprovalData, CalibrationEvent, Instrument
+from database.models.model import Model
+from database.models.versioned import touch
+from database.serializers.calibration_event import CalibrationEventBulkSerializer
+from database.services.bulk_write import add_error, failed, invalid
+from database.services.service import Service
+
+
+class BulkCalibration(Service):
+    """
+    Records a calibration event for each of many instruments, sharing the date, comment, data and calibrators given.
+    The instruments and calibrators are resolved together, the calibrators' history is walked once for all of the
+    instruments, and the events, approvals and links are each inserted in one query, all or none.
+    """
+
+    def __init__(self, user, max_size):
+        self.user = user
+        self.max_size = max_size
+
+    def execute(self, data):
+        serializer = CalibrationEventBulkSerializer(data=data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        values = dict(serializer.validated_data)
+        tags = values.pop('instruments')
+        calibrator_tags = list(dict.fromkeys(values.pop(CalibrationEventEnum.CALIBRATED_WITH.value, [])))
+        if len(tags) > self.max_size:
+            return Response({'instruments': [f'At most {self.max_size} instruments can be calibrated at once']},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        found = Instrument.objects.select_related('model').in_bulk(
+            set(tags) | set(calibrator_tags), field_name=InstrumentEnum.ASSET_TAG_NUMBER.value)
+        calibrators = [found[tag] for tag in calibrator_tags if tag in found]
+        valid_events, used = self.calibrator_history([calibrator.pk for calibrator in calibrators], values['date'])
+        calibrator_errors = [f'Instrument with asset tag {tag} does not exist.' for tag in calibrator_tags
+                             if tag not in found]
+        calibrator_errors += [f'Instrument with asset tag {calibrator.asset_tag_number} has no approved calibration '
+                              f'valid at this date.' for calibrator in calibrators if calibrator.pk not in valid_events]
+        if calibrator_errors:
+            return Response({CalibrationEventEnum.CALIBRATED_WITH.value: calibrator_errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        errors = self.validate_instruments(tags, found, values, calibrators, used)
+        if any(errors):
+            return failed(errors)
+        with transaction.atomic():
+            events = self.insert([found[tag] for tag in tags], values, calibrators)
+        return Response({'results': [{'status': status.HTTP_201_CREATED, CalibrationEventEnum.PK.value: event.pk,
+                                      InstrumentEnum.ASSET_TAG_NUMBER.value: tag} for event, tag in zip(events, tags)]})
+
+    @staticmethod
+    def calibrator_history(calibrators, date):
+        """
+        Walks the calibrations of the calibrators once, level by level as Instrument.objects.can_calibrate does for one,
+        returning {calibrator pk: its calibration event valid at date} and the pks of every instrument used to calibrate
+        them, directly or further back.
+        """
+        valid = CalibrationEvent.objects.find_calibration_events((pk, date) for pk in calibrators)
+        used, seen = set(), set()
+        level = valid
+        while level:
+            pairs = set()
+            for event_pk, event_date, event_calibrators in level.values():
+                for calibrator in event_calibrators:
+                    used.add(calibrator)
+                    if (calibrator, event_date) not in seen:
+                        seen.add((calibrator, event_date))
+                        pairs.add((calibrator, event_date))
+            level = CalibrationEvent.objects.find_calibration_events(pairs)
+        return {pk: event for (pk, date), event in valid.items()}, used
+
+    @staticmethod
+    def validate_instruments(tags, found, values, calibrators, used):
+        errors = [None] * len(tags)
+        counts = Counter(tags)
+        instruments = [found.get(tag) for tag in tags]
+        allowed = calibrator_categories([instrument.model_id for instrument in instruments if instrument is not None])
+        calibrator_models = model_categories([calibrator.model_id for calibrator in calibrators])
+        for index, (tag, instrument) in enumerate(zip(tags, instruments)):
+            if instrument is None:
+                errors[index] = invalid({'instruments': ['Not found.']}, status.HTTP_404_NOT_FOUND)
+                continue
+            if counts[tag] > 1:
+                add_error(errors, index, 'instruments', 'Given more than once.')
+            calibration_mode = instrument.model.calibration_mode
+            if calibration_mode == 'NOT_CALIBRATABLE':
+                add_error(errors, index, 'non_field_errors', 'Instrument whose model is not calibratable may not have '
+                                                             'a calibration event associated with it.')
+            if CalibrationEventEnum.LOAD_BANK_DATA.value in values and calibration_mode != 'LOAD_BANK':
+                add_error(errors, index, 'non_field_errors', 'Model needs calibration mode of LOAD_BANK in order to '
+                                                             'have input from the load calibration wizard.')
+            if CalibrationEventEnum.GUIDED_HARDWARE_DATA.value in values and calibration_mode != 'GUIDED_HARDWARE':
+                add_error(errors, index, 'non_field_errors', 'Model needs calibration mode of GUIDED_HARDWARE in order '
+                                                             'to have input from the guided hardware wizard.')
+            if instrument.pk in used or any(calibrator.pk == instrument.pk for calibrator in calibrators):
+                add_error(errors, index, CalibrationEventEnum.CALIBRATED_WITH.value,
+                          'Calibrating this instrument with these instruments would create a cycle.')
+            for calibrator in calibrators:
+                if not allowed.get(instrument.model_id, set()) & calibrator_models.get(calibrator.model_id, set()):
+                    add_error(errors, index, CalibrationEventEnum.CALIBRATED_WITH.value,
+                              f'{calibrator.asset_tag_number} is not in a calibrator category of this model.')
+        return errors
+
+    def insert(self, instruments, values, calibrators):
+        events = [CalibrationEvent(instrument=instrument, user=self.user, **values) for instrument in instruments]
+        CalibrationEvent.objects.bulk_create(events)
+        if any(event.pk is None for event in events):
+            # on backends that do not return primary keys, the events just inserted are the latest of their
+            # instruments with this date and user
+            inserted = CalibrationEvent.objects.filter(instrument__in=instruments, date=values['date'], user=self.user)
+            latest = dict(inserted.order_by().values('instrument').annotate(latest=Max('pk'))
+                          .values_list('instrument', 'latest'))
+            for event in events:
+                event.pk = latest[event.instrument_id]
+
+        now = timezone.now()
+        ApprovalData.objects.bulk_create([
+            ApprovalData(calibration_event=event, approved=True, approver=self.user, date=now, comment='')
+            for event in events if not event.instrument.model.approval_required
+        ])
+        field = CalibrationEvent.calibrated_with.field
+        through = field.remote_field.through
+        through.objects.bulk_create([
+            through(**{field.m2m_column_name(): event.pk, field.m2m_reverse_name(): calibrator.pk})
+            for event in events for calibrator in calibrators
+        ])
+
+        # bulk inserts send no signals; touch the rows the receivers would have
+        DataVersion.objects.bump(DataScopeEnum.CALIBRATION_EVENTS.value)
+        touch(Instrument.objects.filter(pk__in={event.instrument_id for event in events} |
+                                        {calibrator.pk for calibrator in calibrators}))
+        return events
+
+
+def calibrator_categories(model_pks):
+    return categories_by_model(Model.calibrator_categories.field, model_pks)
+
+
+def model_categories(model_pks):
+    return categories_by_model(Model.model_categories.field, model_pks)
+
+
+def categories_by_model(field, model_pks):
+    through = field.remote_field.through
+    links = through.objects.filter(**{field.m2m_column_name() + '__in': set(model_pks)})
+    found = {}
+    for model_pk, category_pk in links.values_list(field.m2m_column_name(), field.m2m_reverse_name()):
+        found.setdefault(model_pk, set()).add(category_pk)
+    return found
@@ -1,23 +1,86 @@
 import abc
 import csv
+import io
+import json
+import zlib
 
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 
 from database.services.service import Service
+from database.services.table_enums import ExportFormats
+
+ROWS_PER_CHUNK = 500
+
+
+def accepts_gzip(request):
+    """ True if the Accept-Encoding header allows gzip (an explicit q=0 refuses it). """
+    for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip().lower() in {'gzip', 'x-gzip'}:
+            return params.replace(' ', '').lower() not in {'q=0', 'q=0.0', 'q=0.00', 'q=0.000'}
+    return False
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
 
 
 class ExportService(Service):
+    # data scopes whose writes change the content of the export
+    scopes = []
 
     def __init__(self, file_name):
         self.file_name = file_name
 
-    def execute(self, queryset):
-        response = HttpResponse(content_type='application/force-download')
-        response['Content-Disposition'] = 'attachment; filename=%s' % self.file_name
-        writer = csv.writer(response)
-        self.write_file(writer, queryset=queryset)
+    def execute(self, queryset, export_format=ExportFormats.CSV, compress=False):
+        response = StreamingHttpResponse(self.chunks(queryset, export_format, compress),
+                                         content_type=export_format.content_type)
+        self.set_headers(response, export_format, compress)
         return response
 
-    @abc.abstractmethod
+    def set_headers(self, response, export_format, compress):
+        response['Content-Disposition'] = 'attachment; filename=%s' % self.export_file_name(export_format)
+        response['Vary'] = 'Accept-Encoding'
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+
+    def export_file_name(self, export_format):
+        return self.file_name.rsplit('.', 1)[0] + '.' + export_format.value
+
+    def chunks(self, queryset, export_format, compress=False):
+        """ Yields the encoded export a few hundred rows at a time, gzipped if compress is set. """
+        chunks = self.encoded_chunks(queryset, export_format)
+        return gzip_chunks(chunks) if compress else chunks
+
+    def encoded_chunks(self, queryset, export_format):
+        rows = self.rows(queryset)
+        header = next(rows)
+        buffer = io.StringIO()
+        if export_format == ExportFormats.JSONL:
+            def write(row):
+                buffer.write(json.dumps(dict(zip(header, row)), default=str))
+                buffer.write('\n')
+        else:
+            writer = csv.writer(buffer)
+            writer.writerow(header)
+            write = writer.writerow
+        for index, row in enumerate(rows, start=1):
+            write(row)
+            if index % ROWS_PER_CHUNK == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+
     def write_file(self, writer, queryset):
+        writer.writerows(self.rows(queryset))
+
+    @abc.abstractmethod
+    def rows(self, queryset):
+        """ Yields the column headers followed by one list of values per exported object. """
         pass
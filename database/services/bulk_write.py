@@ -0,0 +1,367 @@
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import capfirst
+from rest_framework import status
+from rest_framework.response import Response
+
+from database.enums import DataScopeEnum, InstrumentEnum, ModelEnum
+from database.models.data_version import DataVersion
+from database.models.instrument import ApprovalData, CalibrationEvent, Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.models.model_category import ModelCategory
+from database.models.search_document import SearchDocument, deferred_indexing
+from database.models.versioned import touch
+from database.picker_index import invalidate_picker_index
+from database.serializers.instrument import InstrumentBulkWriteSerializer
+from database.serializers.model import ModelBulkWriteSerializer
+from database.services.service import Service
+from database.signals import receivers_suspended
+
+TOUCH_CHUNK_SIZE = 500
+
+
+def invalid(errors, code=status.HTTP_400_BAD_REQUEST):
+    return {'status': code, 'errors': errors}
+
+
+def add_error(errors, index, field, message):
+    if errors[index] is None:
+        errors[index] = invalid({})
+    errors[index]['errors'].setdefault(field, []).append(message)
+
+
+def failed(errors):
+    """ Lists the errors of each item; the items without errors were valid but are not written either """
+    results = [{'status': status.HTTP_424_FAILED_DEPENDENCY} if error is None else error for error in errors]
+    return Response({'results': results}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def is_pk(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class BulkWriteService(Service):
+    """
+    Creates (POST a list of items), updates (PATCH a list of items with their pk) or deletes (DELETE a list of pks)
+    rows of model in one transaction, all or none. Every item is validated first, with the lookups batched across the
+    items, and the rows are written with bulk_create, bulk_update and one delete. Bulk writes send no model signals,
+    so the service keeps data versions, row versions and search documents in step itself.
+    """
+    model = None
+    serializer_class = None
+    # many-to-many fields to categories given by name, and the category model of each
+    category_fields = {}
+    # groups of fields unique together, by attname; rows created without a pk are found again by the first group
+    unique_fields = []
+    # dependents whose search documents include fields of the written rows
+    indexed_dependents = []
+
+    def __init__(self, user, max_size):
+        self.user = user
+        self.max_size = max_size
+        self.category_pks = {}
+
+    def execute(self, method, items):
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Expected a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_size:
+            return Response({'detail': f'At most {self.max_size} items can be written at once'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        write = {'POST': self.create, 'PATCH': self.update, 'DELETE': self.delete}[method]
+        try:
+            with transaction.atomic(), receivers_suspended(), deferred_indexing():
+                return write(items)
+        except IntegrityError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+
+    def create(self, items):
+        serializers = [self.serializer_class(data=item) for item in items]
+        errors = [None if serializer.is_valid() else invalid(serializer.errors) for serializer in serializers]
+        data = [serializer.validated_data if error is None else None for serializer, error in zip(serializers, errors)]
+        rows = [None] * len(items)
+        self.validate_rows(data, rows, errors)
+        if any(errors):
+            return failed(errors)
+
+        rows = self.new_rows([self.row_values(values, None) for values in data])
+        self.model.objects.bulk_create(rows)
+        self.fetch_pks(rows)
+        self.link_categories(rows, data)
+        pks = [row.pk for row in rows]
+        self.written(pks, self.dependent_pks(pks))
+        return self.succeeded(rows, status.HTTP_201_CREATED)
+
+    def update(self, items):
+        errors = [None] * len(items)
+        pks = [item.get(ModelEnum.PK.value) if isinstance(item, dict) else None for item in items]
+        instances = self.model.objects.in_bulk([pk for pk in pks if is_pk(pk)])
+        self.validate_pks(pks, instances, errors)
+        rows = [instances[pk] if error is None else None for pk, error in zip(pks, errors)]
+        data = [None] * len(items)
+        for index, row in enumerate(rows):
+            if row is not None:
+                serializer = self.serializer_class(row, data=items[index], partial=True)
+                if serializer.is_valid():
+                    data[index] = serializer.validated_data
+                else:
+                    errors[index] = invalid(serializer.errors)
+        self.validate_rows(data, rows, errors)
+        if any(errors):
+            return failed(errors)
+
+        dependents = self.dependent_pks(pks)
+        self.updating(rows, data)
+        now = timezone.now()
+        fields = {'version', 'updated_at'}
+        for row, values in zip(rows, data):
+            for attname, value in self.row_values(values, row).items():
+                setattr(row, attname, value)
+                fields.add(attname)
+            row.version += 1
+            row.updated_at = now
+        self.model.objects.bulk_update(rows, fields)
+        self.link_categories(rows, data)
+        for model, dependent_pks in self.dependent_pks(pks).items():
+            dependents.setdefault(model, set()).update(dependent_pks)
+        self.written(pks, dependents)
+        return self.succeeded(rows, status.HTTP_200_OK)
+
+    def delete(self, items):
+        errors = [None] * len(items)
+        pks = items
+        instances = self.model.objects.in_bulk([pk for pk in pks if is_pk(pk)])
+        self.validate_pks(pks, instances, errors)
+        self.validate_delete(pks, errors)
+        if any(errors):
+            return failed(errors)
+
+        dependents = self.dependent_pks(pks, deleting=True)
+        self.model.objects.filter(pk__in=pks).delete()
+        SearchDocument.objects.remove(self.model, pks)
+        self.written(pks, dependents, deleted=True)
+        return self.succeeded([instances[pk] for pk in pks], status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def validate_pks(pks, instances, errors):
+        counts = Counter(pk for pk in pks if is_pk(pk))
+        for index, pk in enumerate(pks):
+            if not is_pk(pk):
+                errors[index] = invalid({ModelEnum.PK.value: ['A valid integer is required.']})
+            elif counts[pk] > 1:
+                errors[index] = invalid({ModelEnum.PK.value: ['Given for more than one item.']})
+            elif pk not in instances:
+                errors[index] = invalid({ModelEnum.PK.value: ['Not found.']}, status.HTTP_404_NOT_FOUND)
+
+    def validate_rows(self, data, rows, errors):
+        """ Adds the errors that need lookups, each batched across the items that are valid so far """
+        for field, category_model in self.category_fields.items():
+            names = {name for values in data if values is not None for name in values.get(field, [])}
+            found = dict(category_model.objects.filter(name__in=names).values_list('name', 'pk'))
+            self.category_pks.setdefault(category_model, {}).update(found)
+            for index, values in enumerate(data):
+                for name in [] if values is None else values.get(field, []):
+                    if name not in found:
+                        add_error(errors, index, field, f'Object with name={name} does not exist.')
+        for fields in self.unique_fields:
+            self.validate_unique(fields, data, rows, errors)
+
+    def validate_unique(self, fields, data, rows, errors):
+        keys = {}
+        for index, values in enumerate(data):
+            if values is not None:
+                key = tuple(values[field] if field in values else getattr(rows[index], field, None) for field in fields)
+                if None not in key:
+                    keys[index] = key
+        if not keys:
+            return
+        written = [rows[index].pk for index in keys if rows[index] is not None]
+        lookups = {f'{field}__in': {key[position] for key in keys.values()} for position, field in enumerate(fields)}
+        existing = set(self.model.objects.filter(**lookups).exclude(pk__in=written).values_list(*fields))
+        counts = Counter(keys.values())
+
+        opts = self.model._meta
+        names = [opts.get_field(field).name for field in fields]
+        error_field = names[0] if len(names) == 1 else 'non_field_errors'
+        labels = ' and '.join(capfirst(opts.get_field(field).verbose_name) for field in fields)
+        exists = f'{capfirst(opts.verbose_name)} with this {labels} already exists.'
+        for index, key in keys.items():
+            if key in existing:
+                add_error(errors, index, error_field, exists)
+            elif counts[key] > 1:
+                add_error(errors, index, error_field, f'{labels} is given for more than one item.')
+
+    def validate_delete(self, pks, errors):
+        pass
+
+    def row_values(self, values, row):
+        """ Field values by attname to write to row (None for a new row), from an item's validated data """
+        return {field: value for field, value in values.items() if field not in self.category_fields}
+
+    def new_rows(self, values):
+        return [self.model(**row_values) for row_values in values]
+
+    def fetch_pks(self, rows):
+        """ Sets the primary keys of created rows on backends that do not return them from bulk_create """
+        if all(row.pk is not None for row in rows):
+            return
+        fields = self.unique_fields[0]
+        lookups = {f'{field}__in': {getattr(row, field) for row in rows} for field in fields}
+        found = {tuple(key): pk for pk, *key in self.model.objects.filter(**lookups).values_list('pk', *fields)}
+        for row in rows:
+            row.pk = found[tuple(getattr(row, field) for field in fields)]
+
+    def link_categories(self, rows, data):
+        for field_name, category_model in self.category_fields.items():
+            field = self.model._meta.get_field(field_name)
+            through = field.remote_field.through
+            changed = [(row, values[field_name]) for row, values in zip(rows, data) if field_name in values]
+            if not changed:
+                continue
+            through.objects.filter(**{field.m2m_column_name() + '__in': [row.pk for row, names in changed]}).delete()
+            through.objects.bulk_create([
+                through(**{field.m2m_column_name(): row.pk,
+                           field.m2m_reverse_name(): self.category_pks[category_model][name]})
+                for row, names in changed for name in dict.fromkeys(names)
+            ])
+
+    def updating(self, rows, data):
+        """ Called with the rows to update, before their new values are set """
+        pass
+
+    def dependents(self, pks, deleting=False):
+        """ Querysets of the rows whose representation embeds one of the rows with pks """
+        return []
+
+    def dependent_pks(self, pks, deleting=False):
+        found = {}
+        for queryset in self.dependents(pks, deleting):
+            found.setdefault(queryset.model, set()).update(queryset.order_by().values_list('pk', flat=True))
+        return found
+
+    def scopes(self, deleted=False):
+        return []
+
+    def written(self, pks, dependents, deleted=False):
+        DataVersion.objects.bump(*self.scopes(deleted))
+        for model, dependent_pks in dependents.items():
+            dependent_pks = sorted(dependent_pks - set(pks) if model is self.model else dependent_pks)
+            for start in range(0, len(dependent_pks), TOUCH_CHUNK_SIZE):
+                touch(model.objects.filter(pk__in=dependent_pks[start:start + TOUCH_CHUNK_SIZE]))
+            if model in self.indexed_dependents:
+                SearchDocument.objects.index_later(model, dependent_pks)
+        if not deleted:
+            SearchDocument.objects.index_later(self.model, pks)
+
+    def result(self, row):
+        return {ModelEnum.PK.value: row.pk}
+
+    def succeeded(self, rows, item_status):
+        return Response({'results': [{'status': item_status, **self.result(row)} for row in rows]},
+                        status=status.HTTP_200_OK)
+
+
+class BulkInstruments(BulkWriteService):
+    model = Instrument
+    serializer_class = InstrumentBulkWriteSerializer
+    category_fields = {InstrumentEnum.INSTRUMENT_CATEGORIES.value: InstrumentCategory}
+    unique_fields = [(InstrumentEnum.ASSET_TAG_NUMBER.value,), ('model_id', InstrumentEnum.SERIAL_NUMBER.value)]
+
+    def validate_rows(self, data, rows, errors):
+        model_pks = {values['model_id'] for values in data if values is not None and 'model_id' in values}
+        found = set(Model.objects.filter(pk__in=model_pks).values_list('pk', flat=True))
+        for index, values in enumerate(data):
+            if values is not None and 'model_id' in values and values['model_id'] not in found:
+                add_error(errors, index, InstrumentEnum.MODEL.value,
+                          f'Invalid pk "{values["model_id"]}" - object does not exist.')
+        super().validate_rows(data, rows, errors)
+
+    def new_rows(self, values):
+        rows = super().new_rows(values)
+        untagged = [row for row in rows if row.asset_tag_number is None]
+        if untagged:
+            used = set(Instrument.objects.asset_tag_numbers()) | {row.asset_tag_number for row in rows}
+            tags = random.sample(sorted(set(range(10 ** 5, 10 ** 6)) - used), len(untagged))
+            for row, tag in zip(untagged, tags):
+                row.asset_tag_number = tag
+        return rows
+
+    def dependents(self, pks, deleting=False):
+        querysets = [
+            Model.objects.filter(instruments__in=pks),
+            InstrumentCategory.objects.filter(instrument_list__in=pks),
+        ]
+        if deleting:
+            # events of other instruments that were calibrated with a deleted one lose the link
+            events = CalibrationEvent.objects.filter(calibrated_with__in=pks).exclude(instrument__in=pks)
+            querysets += [events, Instrument.objects.filter(calibration_history__in=events)]
+        return querysets
+
+    def scopes(self, deleted=False):
+        if deleted:
+            return [DataScopeEnum.INSTRUMENTS.value, DataScopeEnum.CALIBRATION_EVENTS.value]
+        return [DataScopeEnum.INSTRUMENTS.value]
+
+    def result(self, row):
+        return {**super().result(row), InstrumentEnum.ASSET_TAG_NUMBER.value: row.asset_tag_number}
+
+
+class BulkModels(BulkWriteService):
+    model = Model
+    serializer_class = ModelBulkWriteSerializer
+    category_fields = {
+        ModelEnum.MODEL_CATEGORIES.value: ModelCategory,
+        ModelEnum.CALIBRATOR_CATEGORIES.value: ModelCategory,
+    }
+    unique_fields = [(ModelEnum.VENDOR.value, ModelEnum.MODEL_NUMBER.value)]
+    indexed_dependents = [Instrument]
+
+    def validate_delete(self, pks, errors):
+        in_use = set(Instrument.objects.filter(model__in=[pk for pk in pks if is_pk(pk)])
+                     .order_by().values_list('model_id', flat=True).distinct())
+        for index, pk in enumerate(pks):
+            if errors[index] is None and pk in in_use:
+                add_error(errors, index, 'instruments', 'Model has instruments and cannot be deleted.')
+
+    def row_values(self, values, row):
+        values = super().row_values(values, row)
+        frequency = ModelEnum.CALIBRATION_FREQUENCY.value
+        if frequency in values:
+            values[frequency] = timedelta(days=values[frequency])
+        if row is None and values.get(frequency, timedelta(days=0)) == timedelta(days=0):
+            values[ModelEnum.CALIBRATION_MODE.value] = 'NOT_CALIBRATABLE'
+        return values
+
+    def updating(self, rows, data):
+        # as in ModelBaseSerializer.update, the pending calibration events of models that stop requiring approval are
+        # approved by the user making the change
+        pks = [row.pk for row, values in zip(rows, data)
+               if row.approval_required and values.get(ModelEnum.APPROVAL_REQUIRED.value) is False]
+        events = list(CalibrationEvent.objects.filter(instrument__model__in=pks, approval_data__isnull=True)
+                      .values_list('pk', flat=True)) if pks else []
+        if events:
+            now = timezone.now()
+            ApprovalData.objects.bulk_create([
+                ApprovalData(calibration_event_id=pk, approved=True, approver=self.user, date=now, comment='')
+                for pk in events
+            ])
+            touch(CalibrationEvent.objects.filter(pk__in=events))
+            DataVersion.objects.bump(DataScopeEnum.CALIBRATION_EVENTS.value)
+
+    def dependents(self, pks, deleting=False):
+        return [
+            ModelCategory.objects.filter(Q(model_list__in=pks) | Q(calibrator_list__in=pks)),
+            Instrument.objects.filter(model__in=pks),
+        ]
+
+    def scopes(self, deleted=False):
+        return [DataScopeEnum.MODELS.value]
+
+    def written(self, pks, dependents, deleted=False):
+        super().written(pks, dependents, deleted)
+        invalidate_picker_index()
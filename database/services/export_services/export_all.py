@@ -1,20 +1,45 @@
 import csv
+import io
 import os
-import shutil
-import tempfile
-from io import BytesIO
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZipFile
 
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 
-from database.services.export_services.export_utils import write_instrument_file, write_model_file
-# file name of folder inside zip:
+from database.models.instrument import Instrument
+from database.models.model import Model
+from database.services.export_services.export_utils import instrument_rows, model_rows
 from database.services.service import Service
+from database.services.table_enums import ExportFileNames
 
+# file name of folder inside zip:
 zip_subdir = "inventory"
 # file name of outer zip folder:
 zip_filename = "%s.zip" % zip_subdir
 
+ROWS_PER_CHUNK = 500
+
+
+class ZipStream:
+    """
+    Write-only file object handed to ZipFile. Bytes written by the archive are held until the response generator
+    collects them with pop(), so only the current chunk is ever in memory.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
 
 class ExportAll(Service):
 
@@ -22,31 +47,26 @@ class ExportAll(Service):
         super().__init__()
 
     def execute(self):
-        s = BytesIO()
-        # make a temporary directory in which to build csv files pre-zip:
-        tmp_dir = tempfile.mkdtemp()
-        # create zipfile object:
-        zf = ZipFile(s, 'w')
-        self.add_spreadsheet_to_zip(sprdsheet_file_name="models.csv",
-                                    zip_file=zf,
-                                    write_function=write_model_file,
-                                    tmp_dir=tmp_dir)
-        self.add_spreadsheet_to_zip(sprdsheet_file_name="instruments.csv",
-                                    zip_file=zf,
-                                    write_function=write_instrument_file,
-                                    tmp_dir=tmp_dir)
-
-        zf.close()
-        shutil.rmtree(tmp_dir)
-        response = HttpResponse(s.getvalue(), content_type='application/x-zip-compressed')
+        response = StreamingHttpResponse(self.generate(), content_type='application/x-zip-compressed')
         response['Content-Disposition'] = 'attachment; filename=%s' % zip_filename
         return response
 
-    def add_spreadsheet_to_zip(self, sprdsheet_file_name, zip_file, write_function, tmp_dir):
-        file_path = os.path.join(tmp_dir, sprdsheet_file_name)
-        with open(file_path, "w+", newline="", encoding="utf-8") as file:
+    def generate(self):
+        stream = ZipStream()
+        with ZipFile(stream, 'w', compression=ZIP_DEFLATED) as zf:
+            yield from self.add_spreadsheet_to_zip(ExportFileNames.MODELS.value, zf, stream,
+                                                   model_rows(Model.objects.all()))
+            yield from self.add_spreadsheet_to_zip(ExportFileNames.INSTRUMENTS.value, zf, stream,
+                                                   instrument_rows(Instrument.objects.all()))
+        yield stream.pop()
+
+    def add_spreadsheet_to_zip(self, sprdsheet_file_name, zip_file, stream, rows):
+        zip_path = os.path.join(zip_subdir, sprdsheet_file_name)
+        with zip_file.open(zip_path, 'w', force_zip64=True) as entry, io.TextIOWrapper(entry, encoding='utf-8', newline='') as file:
             writer = csv.writer(file)
-            write_function(writer)
-            file.seek(0)
-            zip_path = os.path.join(zip_subdir, sprdsheet_file_name)
-            zip_file.write(file_path, zip_path)
+            for index, row in enumerate(rows, start=1):
+                writer.writerow(row)
+                if index % ROWS_PER_CHUNK == 0:
+                    file.flush()
+                    yield stream.pop()
+        yield stream.pop()
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from database.models.data_version import DataVersion
+from database.services.bulk_data_services.export_service import accepts_gzip
+from database.services.service import Service
+from database.services.table_enums import ExportFormats
+
+
+class ExportCache(Service):
+    """
+    Serves an export from a snapshot on disk. Snapshots are keyed by the export, its format and encoding, its
+    normalized filter parameters and the data version of the tables it reads, so a snapshot is only regenerated after
+    a relevant write. A missing snapshot is streamed to the client while it is being written.
+    """
+
+    def __init__(self, export_service):
+        self.export_service = export_service
+
+    def execute(self, request, queryset):
+        export_format = export_format_for(request)
+        compress = accepts_gzip(request)
+        token, updated_at = DataVersion.objects.current(*self.export_service.scopes)
+        key = self.key(request, token, export_format, compress)
+        etag = '"%s"' % key
+        last_modified = None if updated_at is None else int(updated_at.timestamp())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return response
+
+        path = os.path.join(settings.EXPORT_CACHE_DIR, key)
+        if os.path.exists(path):
+            response = FileResponse(open(path, 'rb'), content_type=export_format.content_type)
+        else:
+            chunks = self.export_service.chunks(queryset, export_format, compress)
+            response = StreamingHttpResponse(self.write_snapshot(path, chunks), content_type=export_format.content_type)
+        self.export_service.set_headers(response, export_format, compress)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def key(self, request, token, export_format, compress):
+        params = sorted((k, v) for k in request.query_params for v in request.query_params.getlist(k)
+                        if v != '' and k != 'format')
+        data = json.dumps([self.export_service.file_name, export_format.value, compress, params, token])
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def write_snapshot(self, path, chunks):
+        """ Passes chunks through to the response while saving them, keeping the snapshot only if it completes. """
+        os.makedirs(settings.EXPORT_CACHE_DIR, exist_ok=True)
+        self.prune()
+        file = tempfile.NamedTemporaryFile('wb', dir=settings.EXPORT_CACHE_DIR, delete=False, suffix='.tmp')
+        try:
+            with file:
+                for chunk in chunks:
+                    file.write(chunk)
+                    yield chunk
+            os.replace(file.name, path)
+        finally:
+            if os.path.exists(file.name):
+                os.remove(file.name)
+
+    def prune(self):
+        """ Removes snapshots that have not been regenerated within EXPORT_CACHE_MAX_AGE seconds. """
+        cutoff = time.time() - settings.EXPORT_CACHE_MAX_AGE
+        for entry in os.scandir(settings.EXPORT_CACHE_DIR):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def export_format_for(request):
+    """ Export format chosen through ?format= or the Accept header, defaulting to CSV. """
+    accepted_renderer = getattr(request, 'accepted_renderer', None)
+    formats = [e.value for e in ExportFormats]
+    if accepted_renderer is not None and accepted_renderer.format in formats:
+        return ExportFormats(accepted_renderer.format)
+    return ExportFormats.CSV
@@ -0,0 +1,14 @@
+from database.enums import DataScopeEnum
+from database.services.bulk_data_services.export_service import ExportService
+from database.services.export_services.export_utils import calibration_event_rows
+from database.services.table_enums import ExportFileNames
+
+
+class ExportCalibrationEventsService(ExportService):
+    scopes = [DataScopeEnum.MODELS.value, DataScopeEnum.INSTRUMENTS.value, DataScopeEnum.CALIBRATION_EVENTS.value]
+
+    def __init__(self):
+        super().__init__(ExportFileNames.CALIBRATION_EVENTS.value)
+
+    def rows(self, queryset):
+        return calibration_event_rows(queryset)
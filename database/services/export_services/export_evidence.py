@@ -0,0 +1,69 @@
+import csv
+import io
+import os
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from django.http import StreamingHttpResponse
+
+from database.services.export_services.export_all import ZipStream
+from database.services.service import Service
+from database.services.table_enums import EvidenceManifestColumnNames, ExportFileNames
+
+# formats that are compressed already and gain nothing from deflating them again
+COMPRESSED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.pdf', '.xlsx'}
+CHUNK_SIZE = 256 * 1024
+
+
+class ExportEvidenceService(Service):
+    """
+    Streams a ZIP of the evidence files attached to the given calibration events, with a manifest CSV that maps every
+    file to its instrument and calibration event.
+    """
+
+    def execute(self, queryset):
+        events = queryset.exclude(additional_evidence='').exclude(additional_evidence=None) \
+            .select_related('instrument__model').order_by('instrument__asset_tag_number', 'date', 'pk')
+        response = StreamingHttpResponse(self.generate(events), content_type='application/x-zip-compressed')
+        response['Content-Disposition'] = 'attachment; filename=%s' % ExportFileNames.EVIDENCE.value
+        return response
+
+    def generate(self, events):
+        stream = ZipStream()
+        manifest = [[e.value for e in EvidenceManifestColumnNames]]
+        with ZipFile(stream, 'w') as zf:
+            for event in events.iterator():
+                instrument = event.instrument
+                file_name = os.path.basename(event.additional_evidence.name)
+                arcname = f'evidence/{instrument.asset_tag_number}/{event.pk}_{file_name}'
+                try:
+                    yield from self.add_file_to_zip(zf, stream, arcname, event.date, event.additional_evidence)
+                    result = 'included'
+                except OSError:
+                    arcname, result = '', 'missing'
+                manifest.append([instrument.asset_tag_number,
+                                 instrument.model.vendor,
+                                 instrument.model.model_number,
+                                 instrument.serial_number,
+                                 event.pk,
+                                 event.date.strftime('%Y-%m-%d'),
+                                 arcname,
+                                 result])
+
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(manifest)
+            zf.writestr(ExportFileNames.EVIDENCE_MANIFEST.value, buffer.getvalue(), compress_type=ZIP_DEFLATED)
+        yield stream.pop()
+
+    def add_file_to_zip(self, zip_file, stream, arcname, date, field_file):
+        extension = os.path.splitext(arcname)[1].lower()
+        info = ZipInfo(arcname, date_time=date.timetuple()[:6])
+        info.compress_type = ZIP_STORED if extension in COMPRESSED_EXTENSIONS else ZIP_DEFLATED
+        field_file.open('rb')
+        try:
+            with zip_file.open(info, 'w') as entry:
+                for chunk in field_file.chunks(CHUNK_SIZE):
+                    entry.write(chunk)
+                    yield stream.pop()
+        finally:
+            field_file.close()
+        yield stream.pop()
@@ -1,12 +1,14 @@
+from database.enums import DataScopeEnum
 from database.services.bulk_data_services.export_service import ExportService
-from database.services.export_services.export_utils import write_instrument_file
+from database.services.export_services.export_utils import instrument_rows
 from database.services.table_enums import ExportFileNames
 
 
 class ExportInstrumentsService(ExportService):
+    scopes = [e.value for e in DataScopeEnum]
 
     def __init__(self):
         super().__init__(ExportFileNames.INSTRUMENTS.value)
 
-    def write_file(self, writer, queryset):
-        write_instrument_file(writer, queryset)
+    def rows(self, queryset):
+        return instrument_rows(queryset)
@@ -0,0 +1,105 @@
+import os
+import re
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from database.models.export_job import ExportJob
+from database.services.service import Service
+from database.services.table_enums import ExportFormats
+
+SUPPORTED_FORMATS = [e.value for e in ExportFormats]
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+class ExportJobService(Service):
+    """
+    Writes an export to disk on a background thread so that large exports are not bound by the request timeout.
+    """
+
+    def __init__(self, export_service):
+        self.export_service = export_service
+
+    def execute(self, job, queryset):
+        ExportJob.objects.purge_expired()
+        thread = threading.Thread(target=self.run, args=(job, queryset), daemon=True)
+        thread.start()
+        return job
+
+    def run(self, job, queryset):
+        # each update is conditional, so a job marked FAILED as orphaned while this thread was stalled stays failed
+        jobs = ExportJob.objects.filter(pk=job.pk)
+        try:
+            if not jobs.filter(status='PENDING').update(status='RUNNING', heartbeat_at=timezone.now()):
+                return
+            beat = time.monotonic()
+            os.makedirs(settings.EXPORT_JOB_DIR, exist_ok=True)
+            file = tempfile.NamedTemporaryFile('wb', dir=settings.EXPORT_JOB_DIR, delete=False, suffix='.tmp')
+            try:
+                with file:
+                    for chunk in self.export_service.chunks(queryset, ExportFormats(job.export_format)):
+                        file.write(chunk)
+                        if time.monotonic() - beat >= settings.EXPORT_JOB_HEARTBEAT_INTERVAL:
+                            jobs.filter(status='RUNNING').update(heartbeat_at=timezone.now())
+                            beat = time.monotonic()
+                os.replace(file.name, job.path)
+            finally:
+                if os.path.exists(file.name):
+                    os.remove(file.name)
+            if not jobs.filter(status='RUNNING').update(status='DONE', finished_at=timezone.now()):
+                job.delete_file()
+        except Exception as e:
+            jobs.filter(status__in=ExportJob.ACTIVE_STATUSES).update(status='FAILED', error=str(e),
+                                                                     finished_at=timezone.now())
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+
+
+def ranged_file_response(request, path, file_name, content_type, etag):
+    """
+    Returns the file at path, or the single byte range asked for in the Range header so that interrupted downloads
+    can be resumed. If-Range is honoured against the given ETag.
+    """
+    size = os.path.getsize(path)
+    match = RANGE_RE.match(request.META.get('HTTP_RANGE', '').strip())
+    if_range = request.META.get('HTTP_IF_RANGE')
+
+    if match is None or (if_range is not None and if_range != etag) or match.groups() == ('', ''):
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        first, last = match.groups()
+        if first == '':
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start, end = int(first), size - 1 if last == '' else min(int(last), size - 1)
+        if start >= size or start > end:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        response = StreamingHttpResponse(read_range(path, start, end), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+
+    response['Content-Disposition'] = 'attachment; filename=%s' % file_name
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    return response
+
+
+def read_range(path, start, end):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = file.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
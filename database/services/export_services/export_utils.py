@@ -1,12 +1,17 @@
 from datetime import timedelta
 
-from database.models.instrument import CalibrationEvent
-from database.services.table_enums import MaxInstrumentTableColumnNames, ModelTableColumnNames
+from django.db.models import OuterRef, Prefetch, Subquery, prefetch_related_objects
 
+from database.models.instrument import CalibrationEvent, Instrument
+from database.services.table_enums import CalibrationEventTableColumnNames, MaxInstrumentTableColumnNames, \
+    ModelTableColumnNames
 
-def special_file(calibration_mode, calibration_event):
+CHUNK_SIZE = 2000
+
+
+def special_file(calibration_mode, calibration_evidence):
     if calibration_mode == 'DEFAULT':
-        return calibration_event.additional_evidence
+        return calibration_evidence
     elif calibration_mode == 'LOAD_BANK':
         return 'Load Bank Calibration'
     elif calibration_mode == 'GUIDED_HARDWARE':
@@ -16,39 +21,84 @@ def special_file(calibration_mode, calibration_event):
     return None
 
 
-def write_instrument_file(writer, queryset):
-    instruments = queryset
-    writer.writerow([e.value for e in MaxInstrumentTableColumnNames])
-    for instrument in instruments:
-        latest_calibration_event = CalibrationEvent.objects.find_valid_calibration_event(instrument.pk)
-        writer.writerow([instrument.model.vendor,
-                         instrument.model.model_number,
-                         instrument.serial_number,
-                         instrument.asset_tag_number,
-                         instrument.comment,
-                         None if latest_calibration_event is None else "{}/{}/{}"
-                        .format(latest_calibration_event.date.month,
-                                latest_calibration_event.date.day,
-                                latest_calibration_event.date.year),
-                         None if latest_calibration_event is None else latest_calibration_event.comment,
-                         ' '.join([mc.__str__() for mc in instrument.instrument_categories.all()]),
-                         special_file(instrument.model.calibration_mode, latest_calibration_event)])
-
-
-def write_model_file(writer, queryset):
-    models = queryset
-    writer.writerow([e.value for e in ModelTableColumnNames])
-    for model in models:
-        writer.writerow(
-            [
-                model.vendor,
-                model.model_number,
-                model.description,
-                model.comment,
-                ' '.join([mc.__str__() for mc in model.model_categories.all()]),
-                "Y" if model.calibration_mode == "LOAD_BANK" else "Klufe" if model.calibration_mode == 'GUIDED_HARDWARE' else "",
-                "N/A" if model.calibration_frequency == timedelta(days=0) else model.calibration_frequency.days,
-                ' '.join([mc.__str__() for mc in model.calibrator_categories.all()]),
-                "Y" if model.custom_form != "" else ""
-            ]
-        )
+def iterate_in_chunks(queryset, *lookups, chunk_size=None):
+    """
+    Iterates over a queryset without caching all of its results, running the given prefetch lookups once per chunk.
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    chunk = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) == chunk_size:
+            prefetch_related_objects(chunk, *lookups)
+            yield from chunk
+            chunk = []
+    prefetch_related_objects(chunk, *lookups)
+    yield from chunk
+
+
+def annotate_latest_calibration(queryset):
+    """
+    Annotates each instrument with the date, comment and evidence of its most recent approved calibration event and
+    joins its model, so that with the instrument categories prefetched per chunk exporting costs a fixed number of
+    queries per chunk.
+    """
+    sq = CalibrationEvent.objects.filter(instrument=OuterRef('pk')).filter(approval_data__approved=True) \
+        .order_by('-date', '-pk')
+    return queryset.select_related('model').annotate(
+        latest_calibration_date=Subquery(sq.values('date')[:1]),
+        latest_calibration_comment=Subquery(sq.values('comment')[:1]),
+        latest_calibration_evidence=Subquery(sq.values('additional_evidence')[:1]),
+    )
+
+
+def instrument_rows(queryset):
+    yield [e.value for e in MaxInstrumentTableColumnNames]
+    for instrument in iterate_in_chunks(annotate_latest_calibration(queryset), 'instrument_categories'):
+        date = instrument.latest_calibration_date
+        yield [instrument.model.vendor,
+               instrument.model.model_number,
+               instrument.serial_number,
+               instrument.asset_tag_number,
+               instrument.comment,
+               None if date is None else "{}/{}/{}".format(date.month, date.day, date.year),
+               None if date is None else instrument.latest_calibration_comment,
+               ' '.join([mc.__str__() for mc in instrument.instrument_categories.all()]),
+               special_file(instrument.model.calibration_mode, instrument.latest_calibration_evidence)]
+
+
+def model_rows(queryset):
+    yield [e.value for e in ModelTableColumnNames]
+    for model in iterate_in_chunks(queryset, 'model_categories', 'calibrator_categories'):
+        yield [
+            model.vendor,
+            model.model_number,
+            model.description,
+            model.comment,
+            ' '.join([mc.__str__() for mc in model.model_categories.all()]),
+            "Y" if model.calibration_mode == "LOAD_BANK" else "Klufe" if model.calibration_mode == 'GUIDED_HARDWARE' else "",
+            "N/A" if model.calibration_frequency == timedelta(days=0) else model.calibration_frequency.days,
+            ' '.join([mc.__str__() for mc in model.calibrator_categories.all()]),
+            "Y" if model.custom_form != "" else ""
+        ]
+
+
+def calibration_event_rows(queryset):
+    yield [e.value for e in CalibrationEventTableColumnNames]
+    events = queryset.select_related('instrument__model', 'user', 'approval_data__approver')
+    calibrators = Prefetch('calibrated_with', queryset=Instrument.objects.order_by('asset_tag_number').only(
+        'asset_tag_number'))
+    for event in iterate_in_chunks(events, calibrators):
+        approval = getattr(event, 'approval_data', None)
+        yield [event.instrument.asset_tag_number,
+               event.instrument.model.vendor,
+               event.instrument.model.model_number,
+               event.instrument.serial_number,
+               event.date.strftime('%Y-%m-%d'),
+               event.user.username,
+               event.comment,
+               ' '.join([str(i.asset_tag_number) for i in event.calibrated_with.all()]),
+               'pending' if approval is None else 'approved' if approval.approved else 'rejected',
+               None if approval is None else approval.approver.username,
+               None if approval is None else approval.date.strftime('%Y-%m-%d'),
+               None if approval is None else approval.comment]
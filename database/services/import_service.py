@@ -8,6 +8,7 @@ from rest_framework.response import Response
 from database.exceptions import DuplicateObjectError, IllegalColumnHeadersError, IllegalNewlineCharacterError, \
     ModelDoesNotExistError, \
     SpecificValidationError
+from database.models.search_document import deferred_indexing
 from database.services.table_enums import ModelTableColumnNames as MTCN
 
 
@@ -23,6 +24,10 @@ class ImportService(ABC):
         self.serializer = serializer
 
     def bulk_import(self):
+        with deferred_indexing():
+            return self.import_rows()
+
+    def import_rows(self):
         successful_imports = []
         try:
             if not (set(self.reader.fieldnames).issubset(set([e.value for e in self.max_column_enum]))
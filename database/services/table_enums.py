@@ -9,6 +9,18 @@ class AutoName(str, Enum):
 class ExportFileNames(Enum):
     INSTRUMENTS = "instruments.csv"
     MODELS = "models.csv"
+    CALIBRATION_EVENTS = "calibration_events.csv"
+    EVIDENCE = "evidence.zip"
+    EVIDENCE_MANIFEST = "manifest.csv"
+
+
+class ExportFormats(Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+
+    @property
+    def content_type(self):
+        return 'application/x-ndjson' if self == ExportFormats.JSONL else 'application/force-download'
 
 
 class ModelTableColumnNames(AutoName):
@@ -57,3 +69,29 @@ class MinInstrumentTableColumnNames(AutoName):
     CALIBRATION_DATE = auto()
     CALIBRATION_COMMENT = auto()
     INSTRUMENT_CATEGORIES = auto()
+
+
+class EvidenceManifestColumnNames(AutoName):
+    ASSET_TAG_NUMBER = auto()
+    VENDOR = auto()
+    MODEL_NUMBER = auto()
+    SERIAL_NUMBER = auto()
+    CALIBRATION_EVENT = auto()
+    CALIBRATION_DATE = auto()
+    FILE = auto()
+    STATUS = auto()
+
+
+class CalibrationEventTableColumnNames(AutoName):
+    ASSET_TAG_NUMBER = auto()
+    VENDOR = auto()
+    MODEL_NUMBER = auto()
+    SERIAL_NUMBER = auto()
+    CALIBRATION_DATE = auto()
+    CALIBRATION_USER = auto()
+    CALIBRATION_COMMENT = auto()
+    CALIBRATOR_ASSET_TAG_NUMBERS = auto()
+    APPROVAL_STATE = auto()
+    APPROVER = auto()
+    APPROVAL_DATE = auto()
+    APPROVAL_COMMENT = auto()
@@ -0,0 +1,224 @@
+"""
+Model signal receivers that keep derived data (caches, snapshots, row versions, search documents) in step with writes
+to the database.
+"""
+import functools
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from database.enums import DataScopeEnum
+from database.models.data_version import DataVersion
+from database.models.instrument import ApprovalData, CalibrationEvent, Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.models.model_category import ModelCategory
+from database.models.search_document import INDEXED_FIELDS, SearchDocument
+from database.models.versioned import touch
+from database.picker_index import invalidate_picker_index
+
+_suspended = threading.local()
+
+
+@contextmanager
+def receivers_suspended():
+    """
+    Skips the receivers below for writes inside the block, for bulk writes that keep the derived data in step with a
+    few set-based queries instead of several queries per row.
+    """
+    _suspended.depth = getattr(_suspended, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _suspended.depth -= 1
+
+
+def unless_suspended(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not getattr(_suspended, 'depth', 0):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+SCOPES = {
+    Model: DataScopeEnum.MODELS.value,
+    Instrument: DataScopeEnum.INSTRUMENTS.value,
+    CalibrationEvent: DataScopeEnum.CALIBRATION_EVENTS.value,
+    ApprovalData: DataScopeEnum.CALIBRATION_EVENTS.value,
+    ModelCategory: DataScopeEnum.CATEGORIES.value,
+    InstrumentCategory: DataScopeEnum.CATEGORIES.value,
+    Model.model_categories.through: DataScopeEnum.MODELS.value,
+    Model.calibrator_categories.through: DataScopeEnum.MODELS.value,
+    Instrument.instrument_categories.through: DataScopeEnum.INSTRUMENTS.value,
+    CalibrationEvent.calibrated_with.through: DataScopeEnum.CALIBRATION_EVENTS.value,
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@unless_suspended
+def bump_data_version(sender, **kwargs):
+    if sender in SCOPES:
+        DataVersion.objects.bump(SCOPES[sender])
+
+
+@receiver(post_save, sender=Model)
+@receiver(post_delete, sender=Model)
+@unless_suspended
+def drop_picker_index(sender, **kwargs):
+    invalidate_picker_index()
+
+
+@receiver(m2m_changed)
+@unless_suspended
+def bump_data_version_for_relation(sender, action, **kwargs):
+    if sender in SCOPES and action in {'post_add', 'post_remove', 'post_clear'}:
+        DataVersion.objects.bump(SCOPES[sender])
+
+
+# rows whose representation embeds a row, found through the row's own foreign keys
+PARENTS = {
+    Instrument: lambda instrument: [Model.objects.filter(pk=instrument.model_id)],
+    CalibrationEvent: lambda event: [Instrument.objects.filter(pk=event.instrument_id)],
+    ApprovalData: lambda approval: [CalibrationEvent.objects.filter(pk=approval.calibration_event_id),
+                                    Instrument.objects.filter(calibration_history=approval.calibration_event_id)],
+}
+
+# rows whose representation embeds a row that already existed, found through their foreign keys or links to it
+CHILDREN = {
+    Model: lambda model: [
+        Instrument.objects.filter(model=model.pk),
+        ModelCategory.objects.filter(Q(model_list=model.pk) | Q(calibrator_list=model.pk)),
+    ],
+    Instrument: lambda instrument: [InstrumentCategory.objects.filter(instrument_list=instrument.pk)],
+    ModelCategory: lambda category: [
+        Model.objects.filter(Q(model_categories=category.pk) | Q(calibrator_categories=category.pk)),
+        Instrument.objects.filter(Q(model__model_categories=category.pk) | Q(model__calibrator_categories=category.pk)),
+    ],
+    InstrumentCategory: lambda category: [Instrument.objects.filter(instrument_categories=category.pk)],
+}
+
+# many-to-many fields by through model; a changed link touches both ends and the rows embedding its owner
+RELATIONS = {field.remote_field.through: field for field in [
+    Model.model_categories.field,
+    Model.calibrator_categories.field,
+    Instrument.instrument_categories.field,
+    CalibrationEvent.calibrated_with.field,
+]}
+
+OWNER_DEPENDENTS = {
+    Model: lambda pks: [Instrument.objects.filter(model__in=pks)],
+    Instrument: lambda pks: [],
+    CalibrationEvent: lambda pks: [Instrument.objects.filter(calibration_history__in=pks)],
+}
+
+
+@receiver(post_save)
+@receiver(pre_delete)
+@unless_suspended
+def touch_dependents(sender, instance, created=False, **kwargs):
+    # on delete the dependents are found before the row and its links are gone
+    querysets = PARENTS[sender](instance) if sender in PARENTS else []
+    if sender in CHILDREN and not created:
+        querysets += CHILDREN[sender](instance)
+    for queryset in querysets:
+        touch(queryset)
+
+
+@receiver(m2m_changed)
+@unless_suspended
+def touch_changed_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if sender not in RELATIONS or action not in {'post_add', 'post_remove', 'pre_clear'}:
+        return
+    field = RELATIONS[sender]
+    if action == 'pre_clear':
+        # clear() does not say which links it removes
+        instance_column, other_column = (field.m2m_reverse_name(), field.m2m_column_name()) if reverse \
+            else (field.m2m_column_name(), field.m2m_reverse_name())
+        pk_set = set(sender.objects.filter(**{instance_column: instance.pk}).values_list(other_column, flat=True))
+    if pk_set:
+        owner_pks, target_pks = (list(pk_set), [instance.pk]) if reverse else ([instance.pk], list(pk_set))
+        touch(field.model.objects.filter(pk__in=owner_pks))
+        touch(field.related_model.objects.filter(pk__in=target_pks))
+        for queryset in OWNER_DEPENDENTS[field.model](owner_pks):
+            touch(queryset)
+
+
+# rows whose search document includes the fields of a row that already existed
+SEARCH_DEPENDENTS = {
+    Model: lambda model: [Instrument.objects.filter(model=model.pk)],
+    ModelCategory: lambda category: [
+        Model.objects.filter(model_categories=category.pk),
+        Instrument.objects.filter(model__model_categories=category.pk),
+    ],
+    InstrumentCategory: lambda category: [Instrument.objects.filter(instrument_categories=category.pk)],
+}
+
+SEARCH_RELATIONS = {field.remote_field.through: field for field in [
+    Model.model_categories.field,
+    Instrument.instrument_categories.field,
+]}
+
+SEARCH_OWNER_DEPENDENTS = {
+    Model: lambda pks: [Instrument.objects.filter(model__in=pks)],
+    Instrument: lambda pks: [],
+}
+
+
+def index_search_documents(querysets):
+    for queryset in querysets:
+        SearchDocument.objects.index_later(queryset.model, queryset.values_list('pk', flat=True))
+
+
+@receiver(post_save)
+@unless_suspended
+def index_saved_row(sender, instance, created=False, **kwargs):
+    if sender in INDEXED_FIELDS:
+        SearchDocument.objects.index_later(sender, [instance.pk])
+    if sender in SEARCH_DEPENDENTS and not created:
+        index_search_documents(SEARCH_DEPENDENTS[sender](instance))
+
+
+@receiver(pre_delete)
+@unless_suspended
+def find_search_dependents(sender, instance, **kwargs):
+    # the links to a deleted category are gone by the time post_delete is sent
+    if sender in SEARCH_DEPENDENTS:
+        instance._search_dependents = [(queryset.model, list(queryset.values_list('pk', flat=True)))
+                                       for queryset in SEARCH_DEPENDENTS[sender](instance)]
+
+
+@receiver(post_delete)
+@unless_suspended
+def remove_deleted_row(sender, instance, **kwargs):
+    if sender in INDEXED_FIELDS:
+        SearchDocument.objects.remove(sender, [instance.pk])
+    for model, pks in getattr(instance, '_search_dependents', []):
+        SearchDocument.objects.index_later(model, pks)
+
+
+@receiver(m2m_changed)
+@unless_suspended
+def index_changed_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if sender not in SEARCH_RELATIONS:
+        return
+    field = SEARCH_RELATIONS[sender]
+    if action == 'pre_clear' and reverse:
+        # clear() does not say which owners lose the link
+        instance._search_cleared = list(sender.objects.filter(**{field.m2m_reverse_name(): instance.pk})
+                                        .values_list(field.m2m_column_name(), flat=True))
+        return
+    if action not in {'post_add', 'post_remove', 'post_clear'} or (action != 'post_clear' and not pk_set):
+        return
+    if not reverse:
+        owner_pks = [instance.pk]
+    elif action == 'post_clear':
+        owner_pks = instance.__dict__.pop('_search_cleared', [])
+    else:
+        owner_pks = list(pk_set)
+    SearchDocument.objects.index_later(field.model, owner_pks)
+    index_search_documents(SEARCH_OWNER_DEPENDENTS[field.model](owner_pks))
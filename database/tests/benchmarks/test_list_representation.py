@@ -0,0 +1,56 @@
+import time
+
+from django.test import TestCase, tag
+from rest_framework.renderers import JSONRenderer
+
+from database.models.instrument import Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.models.model_category import ModelCategory
+from database.serializers.instrument import InstrumentSerializer
+from database.serializers.values import INSTRUMENT_LIST_VALUES, instrument_list_data
+from database.views import InstrumentViewSet
+
+INSTRUMENTS = 1000
+ROUNDS = 3
+
+
+@tag('benchmark')
+class ListRepresentationBenchmark(TestCase):
+    """ Compares the values() list representation against InstrumentSerializer on the same rows """
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = [ModelCategory.objects.create(name=f'model_category{i}') for i in range(3)]
+        instrument_categories = [InstrumentCategory.objects.create(name=f'instrument_category{i}') for i in range(3)]
+        models = []
+        for i in range(20):
+            model = Model.objects.create(vendor=f'vendor{i}', model_number=f'model{i}', description='description')
+            model.model_categories.set(categories[:i % 4])
+            model.calibrator_categories.set(categories[i % 2:])
+            models.append(model)
+        Instrument.objects.bulk_create([Instrument(model=models[i % 20], serial_number=f'sn{i}',
+                                                   asset_tag_number=100000 + i) for i in range(INSTRUMENTS)])
+        links = Instrument.instrument_categories.through
+        links.objects.bulk_create([links(instrument_id=pk, instrumentcategory_id=instrument_categories[pk % 3].pk)
+                                   for pk in Instrument.objects.values_list('pk', flat=True)])
+
+    def best_time(self, function):
+        best = None
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            content = function()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, content
+
+    def test_values_representation(self):
+        queryset = InstrumentViewSet(request=None, format_kwarg=None).get_queryset()
+        serializer_time, expected = self.best_time(lambda: JSONRenderer().render(InstrumentSerializer(
+            queryset.select_related('model').prefetch_related('instrument_categories', 'model__model_categories',
+                                                              'model__calibrator_categories'), many=True).data))
+        values_time, content = self.best_time(lambda: JSONRenderer().render(instrument_list_data(
+            list(queryset.values(*INSTRUMENT_LIST_VALUES)))))
+        self.assertEqual(content, expected)
+        self.assertLess(values_time, serializer_time, f'{INSTRUMENTS} instruments: serializer '
+                        f'{serializer_time * 1000:.1f}ms, values {values_time * 1000:.1f}ms')
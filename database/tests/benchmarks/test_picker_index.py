@@ -0,0 +1,37 @@
+import time
+
+from django.test import TestCase, tag
+
+from database.models.model import Model
+from database.picker_index import PickerIndex
+
+MODELS = 20000
+QUERIES = ['v', 'ven', 'vendor1', 'vendor123', 'model77', 'zzz']
+
+
+@tag('benchmark')
+class PickerIndexBenchmark(TestCase):
+    """ Compares picker lookups in the in-process index against the contains + DISTINCT queries they replace """
+
+    @classmethod
+    def setUpTestData(cls):
+        Model.objects.bulk_create([Model(vendor=f'vendor{i % 500}', model_number=f'model{i}', description='description')
+                                   for i in range(MODELS)])
+
+    def test_lookup(self):
+        index = PickerIndex(Model.objects.order_by().values_list('vendor', 'model_number').distinct())
+
+        start = time.perf_counter()
+        for query in QUERIES:
+            expected = set(Model.objects.model_numbers(vendor=query))
+        database_time = (time.perf_counter() - start) / len(QUERIES)
+
+        start = time.perf_counter()
+        for query in QUERIES:
+            content = index.model_numbers(query, limit=20)
+        index_time = (time.perf_counter() - start) / len(QUERIES)
+
+        for query in QUERIES:
+            self.assertEqual(set(index.model_numbers(query)), set(Model.objects.model_numbers(vendor=query)))
+        self.assertLess(index_time, database_time, f'{MODELS} models: database {database_time * 1000:.2f}ms, '
+                        f'index {index_time * 1000:.3f}ms per lookup')
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import localtime, now
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import ApprovalData, CalibrationEvent, Instrument
+from database.models.model import Model
+from database.models.model_category import ModelCategory
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.views import CalibrationEventViewSet
+
+
+class BulkCalibrationTestCase(EndpointTestCase):
+
+    def setUp(self):
+        # 86V and 87M meters are calibrated with 901C scopes, and scopes with meters
+        self.meter_model = Model.objects.get(model_number='87M')
+        self.meter_model.calibrator_categories.set([ModelCategory.objects.get(name='oscilloscope')])
+        Model.objects.filter(model_number='901C').update(approval_required=True)
+        self.scope_model = Model.objects.get(model_number='901C')
+        self.scope_model.calibrator_categories.set([ModelCategory.objects.get(name='voltmeter')])
+        self.meters = [Instrument.objects.create(model=self.meter_model, serial_number=f'm{i}') for i in range(8)]
+        self.scope = Instrument.objects.create(model=self.scope_model, serial_number='s')
+        self.event_date = localtime(now()) - timedelta(days=5)
+        scope_event = CalibrationEvent.objects.create(instrument=self.scope, user=self.admin, date=self.event_date)
+        ApprovalData.objects.create(calibration_event=scope_event, approved=True, approver=self.admin,
+                                    date=localtime(now()))
+
+    def post(self, **data):
+        data.setdefault('date', localtime(now()).strftime('%Y-%m-%d'))
+        request = self.factory.post(self.Endpoints.CALIBRATION_EVENTS.value + 'bulk/', data, format='json')
+        force_authenticate(request, self.admin)
+        return CalibrationEventViewSet.as_view({'post': 'bulk'})(request)
+
+    def asset_tags(self, instruments):
+        return [instrument.asset_tag_number for instrument in instruments]
+
+    def test_calibrates_every_instrument(self):
+        response = self.post(instruments=self.asset_tags(self.meters), calibrated_with=self.asset_tags([self.scope]),
+                             comment='rack 4')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['asset_tag_number'] for result in response.data['results']],
+                         self.asset_tags(self.meters))
+        events = CalibrationEvent.objects.filter(pk__in=[result['pk'] for result in response.data['results']])
+        self.assertEqual(sorted(event.instrument_id for event in events), [meter.pk for meter in self.meters])
+        for event in events:
+            self.assertEqual(event.comment, 'rack 4')
+            self.assertEqual(list(event.calibrated_with.all()), [self.scope])
+            self.assertTrue(event.approval_data.approved)
+        self.assertEqual(Instrument.objects.calibrators(self.meters[0]).get(), self.scope)
+
+    def test_query_count_does_not_grow(self):
+        counts = []
+        for meters in [self.meters[:2], self.meters[2:]]:
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.post(instruments=self.asset_tags(meters),
+                                           calibrated_with=self.asset_tags([self.scope])).status_code, 200)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_cycles_are_rejected(self):
+        self.post(instruments=self.asset_tags(self.meters[:1]), calibrated_with=self.asset_tags([self.scope]))
+        # the scope's calibration would now use a meter calibrated with the scope
+        response = self.post(instruments=self.asset_tags([self.scope]),
+                             calibrated_with=self.asset_tags(self.meters[:1]))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('calibrated_with', response.data['results'][0]['errors'])
+        self.assertEqual(self.scope.calibration_history.count(), 1)
+
+    def test_invalid_instruments_write_nothing(self):
+        volt = Instrument.objects.create(model=Model.objects.get(model_number='86V'), serial_number='v')
+        response = self.post(instruments=self.asset_tags([self.meters[0], volt]) + [99],
+                             calibrated_with=self.asset_tags([self.scope]))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result['status'] for result in response.data['results']], [424, 400, 404])
+        self.assertFalse(CalibrationEvent.objects.filter(instrument__in=[self.meters[0], volt]).exists())
+
+    def test_calibrators_must_be_calibrated(self):
+        response = self.post(instruments=self.asset_tags(self.meters), calibrated_with=self.asset_tags(self.meters[:1]))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('calibrated_with', response.data)
+
+    def test_pending_approval(self):
+        response = self.post(instruments=self.asset_tags([self.scope]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(CalibrationEvent.objects.pending_approval().values_list('pk', flat=True)),
+                         [response.data['results'][0]['pk']])
@@ -0,0 +1,91 @@
+from django.utils.timezone import localtime, now
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import ApprovalData, CalibrationEvent, Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.models.model_category import ModelCategory
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import InstrumentViewSet, ModelViewSet
+
+
+class ConditionalRequestsTestCase(EndpointTestCase):
+
+    def setUp(self):
+        self.user = create_non_admin_user()
+        self.model = Model.objects.get(model_number='86V')
+        self.instrument = Instrument.objects.create(model=self.model, serial_number='sn')
+
+    def get(self, viewset, action='list', pk=None, **headers):
+        request = self.factory.get(self.Endpoints.INSTRUMENTS.value, **headers)
+        force_authenticate(request, self.admin)
+        kwargs = {} if pk is None else {'pk': pk}
+        return viewset.as_view({'get': action})(request, **kwargs)
+
+    def assertChanged(self, viewset, etag, action='list', pk=None):
+        response = self.get(viewset, action, pk, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_not_modified(self):
+        response = self.get(InstrumentViewSet)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self.get(InstrumentViewSet, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.get(InstrumentViewSet, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code,
+                         304)
+        retrieved = self.get(InstrumentViewSet, 'retrieve', self.instrument.pk)
+        self.assertEqual(self.get(InstrumentViewSet, 'retrieve', self.instrument.pk,
+                                  HTTP_IF_NONE_MATCH=retrieved['ETag']).status_code, 304)
+
+    def test_save_bumps_version(self):
+        version = self.instrument.version
+        self.instrument.comment = 'changed'
+        self.instrument.save()
+        self.instrument.refresh_from_db()
+        self.assertEqual(self.instrument.version, version + 1)
+
+    def test_writes_change_etag(self):
+        etag = self.get(InstrumentViewSet, 'retrieve', self.instrument.pk)['ETag']
+
+        event = CalibrationEvent.objects.create(instrument=self.instrument, user=self.user, date=localtime(now()))
+        etag = self.assertChanged(InstrumentViewSet, etag, 'retrieve', self.instrument.pk)
+
+        approval = ApprovalData.objects.get(calibration_event=event)
+        approval.comment = 'looked fine'
+        approval.save()
+        etag = self.assertChanged(InstrumentViewSet, etag, 'retrieve', self.instrument.pk)
+
+        category = InstrumentCategory.objects.create(name='bench')
+        self.instrument.instrument_categories.add(category)
+        etag = self.assertChanged(InstrumentViewSet, etag, 'retrieve', self.instrument.pk)
+
+        category.name = 'workbench'
+        category.save()
+        etag = self.assertChanged(InstrumentViewSet, etag, 'retrieve', self.instrument.pk)
+
+        self.instrument.instrument_categories.clear()
+        etag = self.assertChanged(InstrumentViewSet, etag, 'retrieve', self.instrument.pk)
+
+        self.model.model_categories.add(ModelCategory.objects.get(name='oscilloscope'))
+        etag = self.assertChanged(InstrumentViewSet, etag, 'retrieve', self.instrument.pk)
+
+        self.model.description = 'Voltmeter'
+        self.model.save()
+        self.assertChanged(InstrumentViewSet, etag, 'retrieve', self.instrument.pk)
+
+    def test_list_etag_covers_deletes(self):
+        etag = self.get(ModelViewSet)['ETag']
+        Model.objects.get(model_number='901C').delete()
+        self.assertChanged(ModelViewSet, etag)
+
+    def test_missing_row(self):
+        response = self.get(InstrumentViewSet, 'retrieve', 0)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+
+    def test_list_validation_reads_only_data_version(self):
+        etag = self.get(InstrumentViewSet)['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get(InstrumentViewSet, HTTP_IF_NONE_MATCH=etag).status_code, 304)
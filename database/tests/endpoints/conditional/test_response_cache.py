@@ -0,0 +1,60 @@
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+
+from database.models.model import Model
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import InstrumentViewSet, ModelViewSet
+
+
+class ResponseCacheTestCase(EndpointTestCase):
+
+    def get(self, viewset, user=None, action='list', endpoint=None, **headers):
+        request = self.factory.get(endpoint or self.Endpoints.MODELS.value, **headers)
+        force_authenticate(request, user or self.admin)
+        return viewset.as_view({'get': action})(request)
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.get(ModelViewSet)
+        with CaptureQueriesContext(connection) as queries:
+            second = self.get(ModelViewSet)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        # only the data version lookup for the key
+        self.assertEqual(len(queries), 1)
+
+    def test_write_invalidates(self):
+        self.assertEqual(self.get(ModelViewSet).data['count'], 3)
+        Model.objects.create(vendor='Keysight', model_number='34465A', description='Digital multimeter')
+        self.assertEqual(self.get(ModelViewSet).data['count'], 4)
+
+        vendors = self.get(ModelViewSet, action='vendors', endpoint=self.Endpoints.VENDORS.value).data
+        Model.objects.create(vendor='Tektronix', model_number='TBS1052B', description='Oscilloscope')
+        self.assertNotEqual(self.get(ModelViewSet, action='vendors', endpoint=self.Endpoints.VENDORS.value).data,
+                            vendors)
+
+    def test_query_params_are_normalized(self):
+        self.get(ModelViewSet, endpoint=self.Endpoints.MODELS.value + '?vendor=Fluke&page_size=5')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(ModelViewSet, endpoint=self.Endpoints.MODELS.value + '?page_size=5&search=&vendor=Fluke')
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(len(queries), 1)
+
+    def test_keyed_by_permissions(self):
+        user = create_non_admin_user()
+        self.get(InstrumentViewSet, endpoint=self.Endpoints.INSTRUMENTS.value)
+        with CaptureQueriesContext(connection) as queries:
+            self.get(InstrumentViewSet, user, endpoint=self.Endpoints.INSTRUMENTS.value)
+        self.assertGreater(len(queries), 1)
+
+        user.user_permissions.add(Permission.objects.get(codename='view_instrument'))
+        user = type(user).objects.get(pk=user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.get(InstrumentViewSet, user, endpoint=self.Endpoints.INSTRUMENTS.value)
+        self.assertGreater(len(queries), 1)
+
+    def test_cached_etag_is_honoured(self):
+        etag = self.get(ModelViewSet)['ETag']
+        self.assertEqual(self.get(ModelViewSet, HTTP_IF_NONE_MATCH=etag).status_code, 304)
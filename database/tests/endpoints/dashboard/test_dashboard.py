@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import localtime, now
+from rest_framework.test import force_authenticate
+
+from database.enums import CalibrationStatusEnum
+from database.models.instrument import CalibrationEvent, Instrument
+from database.models.model import Model
+from database.tests.endpoints.endpoint_test_case import TEST_ROOT, EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import DashboardView
+
+
+class DashboardTestCase(EndpointTestCase):
+
+    def setUp(self):
+        self.user = create_non_admin_user()
+        Model.objects.filter(model_number='901C').update(approval_required=True)
+        Model.objects.create(vendor='Tek', model_number='Uncalibratable', description='No frequency')
+        for model in Model.objects.all():
+            for i in range(3):
+                instrument = Instrument.objects.create(model=model, serial_number=f'sn{i}')
+                if i and model.calibration_mode != 'NOT_CALIBRATABLE':
+                    # 86V (90 days) is valid, 87M (60 days) expiring, 901C is pending approval
+                    CalibrationEvent.objects.create(instrument=instrument, user=self.user,
+                                                    date=localtime(now()) - timedelta(days=45))
+
+    def get(self):
+        request = self.factory.get(TEST_ROOT + 'dashboard/')
+        force_authenticate(request, self.admin)
+        return DashboardView.as_view()(request)
+
+    def test_counts(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get().data
+        self.assertEqual(len([query for query in queries if 'UNION' in query['sql']]), 1)
+        self.assertEqual(data['instruments'], 12)
+        self.assertEqual(data['calibration_status'], [
+            {'value': CalibrationStatusEnum.EXPIRED.value, 'count': 0},
+            {'value': CalibrationStatusEnum.EXPIRING.value, 'count': 2},
+            {'value': CalibrationStatusEnum.NOT_CALIBRATABLE.value, 'count': 3},
+            {'value': CalibrationStatusEnum.UNCALIBRATED.value, 'count': 5},
+            {'value': CalibrationStatusEnum.VALID.value, 'count': 2},
+        ])
+        self.assertEqual(data['model_categories'], [
+            {'value': 'multimeter', 'count': 3},
+            {'value': 'oscilloscope', 'count': 3},
+            {'value': 'voltmeter', 'count': 6},
+        ])
+        self.assertEqual(data['pending_approval'], 2)
+
+    def test_cached_until_write(self):
+        self.get()
+        with CaptureQueriesContext(connection) as queries:
+            self.get()
+        self.assertFalse([query for query in queries if 'UNION' in query['sql']])
+
+        event = CalibrationEvent.objects.pending_approval().first()
+        event.delete()
+        self.assertEqual(self.get().data['pending_approval'], 1)
@@ -3,11 +3,13 @@ import tempfile
 from datetime import timedelta
 from enum import Enum
 
+from django.core.cache import cache
 from django.test import TestCase
 from rest_framework.test import APIRequestFactory, force_authenticate
 
 from database.models.model import Model
 from database.models.model_category import ModelCategory
+from database.picker_index import invalidate_picker_index
 from database.views import ModelViewSet
 from user_portal.models import User
 
@@ -22,6 +24,7 @@ class EndpointTestCase(TestCase):
         VENDORS = MODELS + "vendors/"
         MODEL_NUMBERS = MODELS + "model_numbers/?vendor={}"
         INSTRUMENTS = TEST_ROOT + "instruments/"
+        CALIBRATION_EVENTS = TEST_ROOT + "calibration-events/"
         EXPORT_MODELS = TEST_ROOT + "export-models/"
         EXPORT_INSTRUMENTS = TEST_ROOT + "export-instruments/"
         EXPORT_ALL = TEST_ROOT + "export/"
@@ -57,6 +60,12 @@ class EndpointTestCase(TestCase):
         m2.save()
         m3.save()
 
+    def _pre_setup(self):
+        # cached counts, responses and picker indexes are keyed by data versions, which roll back with each test
+        super()._pre_setup()
+        cache.clear()
+        invalidate_picker_index()
+
     def make_request(self, endpoint, data, action):
         request = self.factory.post(endpoint, data)
         force_authenticate(request, self.admin)
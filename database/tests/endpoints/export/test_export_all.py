@@ -0,0 +1,32 @@
+import csv
+import io
+from zipfile import ZipFile
+
+from rest_framework.test import force_authenticate
+
+from database.services.export_services.export_all import zip_filename
+from database.services.table_enums import MaxInstrumentTableColumnNames, ModelTableColumnNames
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_calibration_events
+from database.views import ExportAllView
+
+
+class ExportAllTestCase(EndpointTestCase):
+
+    def test_export_all_streams_zip(self):
+        create_calibration_events()
+        request = self.factory.get(self.Endpoints.EXPORT_ALL.value)
+        force_authenticate(request, self.admin)
+        response = ExportAllView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response.get('Content-Disposition'), 'attachment; filename=%s' % zip_filename)
+        with ZipFile(io.BytesIO(b''.join(response.streaming_content))) as zf:
+            self.assertEqual(zf.namelist(), ['inventory/models.csv', 'inventory/instruments.csv'])
+            models = list(csv.DictReader(io.TextIOWrapper(zf.open('inventory/models.csv'), encoding='utf-8')))
+            instruments = list(csv.DictReader(io.TextIOWrapper(zf.open('inventory/instruments.csv'),
+                                                               encoding='utf-8')))
+        self.assertEqual(len(models), 4)
+        self.assertEqual(set(models[0].keys()), {e.value for e in ModelTableColumnNames})
+        self.assertEqual(len(instruments), 1)
+        self.assertEqual(instruments[0][MaxInstrumentTableColumnNames.SERIAL_NUMBER.value], 'serial_number')
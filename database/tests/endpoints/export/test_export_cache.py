@@ -0,0 +1,53 @@
+import gzip
+import json
+import tempfile
+
+from django.test import override_settings
+from rest_framework.test import force_authenticate
+
+from database.models.model import Model
+from database.services.table_enums import ModelTableColumnNames
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.views import ModelViewSet
+
+
+@override_settings(EXPORT_CACHE_DIR=tempfile.mkdtemp())
+class ExportCacheTestCase(EndpointTestCase):
+
+    def export(self, query='', **headers):
+        request = self.factory.get(self.Endpoints.MODELS.value + 'export/' + query, **headers)
+        force_authenticate(request, self.admin)
+        return ModelViewSet.as_view({'get': 'export'}, **ModelViewSet.export.kwargs)(request)
+
+    def test_unchanged_export_not_modified(self):
+        response = self.export()
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.get('Last-Modified'))
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.export(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_filters_and_writes_change_etag(self):
+        etag = self.export()['ETag']
+        self.assertEqual(self.export('?vendor=&ordering=vendor')['ETag'], self.export('?ordering=vendor')['ETag'])
+        self.assertNotEqual(self.export('?vendor=Fluke')['ETag'], etag)
+        Model.objects.create(vendor='Agilent', model_number='E3631A', description='Power supply')
+        response = self.export(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Agilent', b''.join(response.streaming_content))
+
+    def test_jsonl_format(self):
+        response = self.export('?format=jsonl&vendor=Volt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response.get('Content-Disposition'), 'attachment; filename=models.jsonl')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)[ModelTableColumnNames.MODEL_NUMBER.value] for line in lines], ['901C'])
+
+    def test_gzip_encoding(self):
+        plain = b''.join(self.export().streaming_content)
+        response = self.export(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+        self.assertEqual(gzip.decompress(b''.join(self.export(HTTP_ACCEPT_ENCODING='gzip').streaming_content)), plain)
@@ -0,0 +1,58 @@
+import csv
+import io
+import tempfile
+
+from django.test import override_settings
+from django.urls import resolve
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import Instrument
+from database.models.model import Model
+from database.services.table_enums import CalibrationEventTableColumnNames
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_calibration_events
+
+
+@override_settings(EXPORT_CACHE_DIR=tempfile.mkdtemp())
+class ExportCalibrationEventsTestCase(EndpointTestCase):
+
+    def setUp(self):
+        calibration_event, calibration_event2, self.latest, self.user, model, self.instrument = \
+            create_calibration_events()
+        self.calibrators = [Instrument.objects.create(model=Model.objects.get(model_number='86V'),
+                                                      serial_number=f'calibrator{i}') for i in range(3)]
+        self.latest.calibrated_with.set(self.calibrators)
+
+    def get(self, query=''):
+        request = self.factory.get(self.Endpoints.CALIBRATION_EVENTS.value + 'export/' + query)
+        force_authenticate(request, self.admin)
+        return resolve('/api/calibration-events/export/').func(request)
+
+    def export(self, query=''):
+        response = self.get(query)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        return response, list(csv.DictReader(io.StringIO(content)))
+
+    def test_export_full_history(self):
+        with self.assertNumQueries(3):
+            response, rows = self.export()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(rows), 3)
+        row = rows[0]
+        self.assertEqual(row[CalibrationEventTableColumnNames.CALIBRATION_DATE.value],
+                         self.latest.date.strftime('%Y-%m-%d'))
+        self.assertEqual(row[CalibrationEventTableColumnNames.CALIBRATOR_ASSET_TAG_NUMBERS.value],
+                         ' '.join(sorted(str(c.asset_tag_number) for c in self.calibrators)))
+        self.assertEqual(row[CalibrationEventTableColumnNames.APPROVER.value], self.user.username)
+        self.assertEqual(row[CalibrationEventTableColumnNames.APPROVAL_STATE.value], 'approved')
+
+    def test_export_filters(self):
+        self.assertEqual(len(self.export('?model__vendor=Fluke')[1]), 0)
+        self.assertEqual(len(self.export(f'?asset_tag_number={self.instrument.asset_tag_number}')[1]), 3)
+        self.assertEqual(len(self.export('?approval_state=pending')[1]), 0)
+        start = self.latest.date.strftime('%Y-%m-%d')
+        self.assertEqual(len(self.export(f'?start_date={start}')[1]), 1)
+
+    def test_export_invalid_filter(self):
+        response = self.get('?approval_state=bogus')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,49 @@
+import csv
+import io
+import tempfile
+from zipfile import ZIP_STORED, ZipFile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import CalibrationEvent
+from database.services.table_enums import EvidenceManifestColumnNames
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_calibration_events
+from database.views import InstrumentViewSet
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExportEvidenceTestCase(EndpointTestCase):
+
+    def setUp(self):
+        calibration_event, calibration_event2, calibration_event3, user, model, self.instrument = \
+            create_calibration_events()
+        self.event = CalibrationEvent.objects.create(instrument=self.instrument, user=user,
+                                                     date=calibration_event3.date,
+                                                     additional_evidence=SimpleUploadedFile('cert.pdf', b'%PDF-1.4'))
+
+    def evidence(self, query=''):
+        request = self.factory.get(self.Endpoints.INSTRUMENTS.value + 'evidence/' + query)
+        force_authenticate(request, self.admin)
+        response = InstrumentViewSet.as_view({'get': 'evidence'})(request)
+        return response, ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_evidence_bundle_with_manifest(self):
+        response, zf = self.evidence(f'?asset_tag_number={self.instrument.asset_tag_number}')
+        self.assertEqual(response.status_code, 200)
+        arcname = f'evidence/{self.instrument.asset_tag_number}/{self.event.pk}_cert.pdf'
+        self.assertEqual(zf.read(arcname), b'%PDF-1.4')
+        self.assertEqual(zf.getinfo(arcname).compress_type, ZIP_STORED)
+        manifest = list(csv.DictReader(io.TextIOWrapper(zf.open('manifest.csv'), encoding='utf-8')))
+        self.assertEqual(len(manifest), 1)
+        self.assertEqual(manifest[0][EvidenceManifestColumnNames.FILE.value], arcname)
+        self.assertEqual(manifest[0][EvidenceManifestColumnNames.STATUS.value], 'included')
+
+    def test_evidence_date_range(self):
+        day = self.event.date.strftime('%Y-%m-%d')
+        response, zf = self.evidence(f'?start_date={day}&end_date={day}')
+        self.assertEqual(len(zf.namelist()), 2)
+        response, zf = self.evidence('?end_date=2000-01-01')
+        self.assertEqual(zf.namelist(), ['manifest.csv'])
@@ -0,0 +1,104 @@
+import os
+import tempfile
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import force_authenticate
+
+from database.models.export_job import ExportJob
+from database.models.model import Model
+from database.services.export_services.export_jobs import ExportJobService
+from database.services.export_services.export_models import ExportModelsService
+from database.tests.endpoints.endpoint_test_case import TEST_ROOT, EndpointTestCase
+from database.views import ExportJobViewSet
+
+
+@override_settings(EXPORT_JOB_DIR=tempfile.mkdtemp())
+class ExportJobTestCase(EndpointTestCase):
+
+    def setUp(self):
+        self.job = ExportJob.objects.create(user=self.admin, export_type='MODELS')
+        ExportJobService(ExportModelsService()).run(self.job, Model.objects.all())
+        self.job.refresh_from_db()
+        with open(self.job.path, 'rb') as file:
+            self.content = file.read()
+
+    def retrieve(self, job):
+        request = self.factory.get(TEST_ROOT + f'export-jobs/{job.pk}/')
+        force_authenticate(request, self.admin)
+        return ExportJobViewSet.as_view({'get': 'retrieve'})(request, pk=job.pk)
+
+    def download(self, **headers):
+        request = self.factory.get(TEST_ROOT + f'export-jobs/{self.job.pk}/download/', **headers)
+        force_authenticate(request, self.admin)
+        response = ExportJobViewSet.as_view({'get': 'download'})(request, pk=self.job.pk)
+        if hasattr(response, 'render'):
+            response.render()
+        return response, b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_job_writes_export(self):
+        self.assertEqual(self.job.status, 'DONE')
+        self.assertEqual(len(self.content.decode('utf-8').splitlines()), 4)
+
+    def test_download_full_file(self):
+        response, content = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(content, self.content)
+
+    def test_resume_download_with_range(self):
+        response, content = self.download(HTTP_RANGE='bytes=10-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-{len(self.content) - 1}/{len(self.content)}')
+        self.assertEqual(content, self.content[10:])
+        response, content = self.download(HTTP_RANGE='bytes=-5')
+        self.assertEqual(content, self.content[-5:])
+
+    def test_unsatisfiable_range(self):
+        response, content = self.download(HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+
+    @override_settings(EXPORT_JOB_TTL=-1)
+    def test_expired_jobs_purged(self):
+        ExportJob.objects.purge_expired()
+        self.assertFalse(ExportJob.objects.exists())
+
+    @override_settings(EXPORT_JOB_TTL=-1)
+    def test_polling_does_not_purge(self):
+        self.assertEqual(self.retrieve(self.job).status_code, 200)
+        self.assertTrue(os.path.exists(self.job.path))
+
+    def test_orphaned_job_marked_failed(self):
+        running = ExportJob.objects.create(user=self.admin, export_type='MODELS', status='RUNNING')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.retrieve(running).data['status'], 'RUNNING')
+        ExportJob.objects.filter(pk=running.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.retrieve(running).data['status'], 'FAILED')
+
+    def test_orphaned_job_stays_failed(self):
+        job = ExportJob.objects.create(user=self.admin, export_type='MODELS', status='FAILED')
+        ExportJobService(ExportModelsService()).run(job, Model.objects.all())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertFalse(os.path.exists(job.path))
+
+    def test_missing_file_is_gone(self):
+        os.remove(self.job.path)
+        response, content = self.download()
+        self.assertEqual(response.status_code, 410)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'FAILED')
+
+    def test_failed_job_leaves_no_temporary_file(self):
+        class FailingExport:
+            def chunks(self, queryset, export_format):
+                yield b'vendor\n'
+                raise ValueError('broken row')
+
+        job = ExportJob.objects.create(user=self.admin, export_type='MODELS')
+        ExportJobService(FailingExport()).run(job, Model.objects.all())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertEqual(job.error, 'broken row')
+        self.assertFalse([name for name in os.listdir(os.path.dirname(job.path)) if name.endswith('.tmp')])
@@ -0,0 +1,60 @@
+import csv
+import io
+import tempfile
+from unittest import mock
+
+from django.test import override_settings
+
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.services.table_enums import MaxInstrumentTableColumnNames
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_calibration_events
+from database.views import InstrumentViewSet, ModelViewSet
+
+
+@override_settings(EXPORT_CACHE_DIR=tempfile.mkdtemp())
+class ExportQueryCountTestCase(EndpointTestCase):
+
+    def export(self, viewset, endpoint):
+        request = self.factory.get(endpoint)
+        force_authenticate(request, self.admin)
+        response = viewset.as_view({'get': 'export'}, **viewset.export.kwargs)(request)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_export_instruments_fixed_query_count(self):
+        calibration_event, calibration_event2, calibration_event3, user, model, instrument = create_calibration_events()
+        category = InstrumentCategory.objects.create(name='bench')
+        for i in range(10):
+            other = Instrument.objects.create(model=Model.objects.get(model_number='86V'), serial_number=f'sn{i}')
+            other.instrument_categories.add(category)
+        with self.assertNumQueries(3):
+            response, content = self.export(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value + 'export/')
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 11)
+        row = next(r for r in rows if r[MaxInstrumentTableColumnNames.SERIAL_NUMBER.value] == 'serial_number')
+        self.assertEqual(row[MaxInstrumentTableColumnNames.CALIBRATION_DATE.value], "{}/{}/{}".format(
+            calibration_event3.date.month, calibration_event3.date.day, calibration_event3.date.year))
+
+    def test_export_models_fixed_query_count(self):
+        with self.assertNumQueries(4):
+            response, content = self.export(ModelViewSet, self.Endpoints.MODELS.value + 'export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(content.splitlines()), 4)
+
+    def test_export_prefetches_per_chunk(self):
+        category = InstrumentCategory.objects.create(name='bench')
+        for i in range(10):
+            instrument = Instrument.objects.create(model=Model.objects.get(model_number='86V'), serial_number=f'sn{i}')
+            instrument.instrument_categories.add(category)
+        with mock.patch('database.services.export_services.export_utils.CHUNK_SIZE', 4):
+            # one more categories query for each of the two further chunks of instruments
+            with self.assertNumQueries(5):
+                response, content = self.export(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value + 'export/')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual({row[MaxInstrumentTableColumnNames.INSTRUMENT_CATEGORIES.value] for row in rows}, {'bench'})
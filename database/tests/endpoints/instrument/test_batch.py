@@ -0,0 +1,74 @@
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import localtime, now
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import ApprovalData, CalibrationEvent, Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import InstrumentViewSet
+
+
+class BatchTestCase(EndpointTestCase):
+
+    def setUp(self):
+        user = create_non_admin_user()
+        bench = InstrumentCategory.objects.create(name='bench')
+        Model.objects.filter(model_number='87M').update(approval_required=True)
+        for model in Model.objects.all():
+            for i in range(4):
+                instrument = Instrument.objects.create(model=model, serial_number=f'sn{i}')
+                instrument.instrument_categories.set([bench][:i % 2])
+                for days in range(i):
+                    event = CalibrationEvent.objects.create(instrument=instrument, user=user,
+                                                            date=localtime(now()) - timedelta(days=days))
+                    if model.approval_required:
+                        ApprovalData.objects.create(calibration_event=event, approved=True, approver=user,
+                                                    date=localtime(now()))
+        self.instruments = list(Instrument.objects.order_by('-pk'))
+
+    def get(self, action='batch', pk=None, **params):
+        request = self.factory.get(self.Endpoints.INSTRUMENTS.value + '?' + urlencode(params))
+        force_authenticate(request, self.admin)
+        kwargs = {} if pk is None else {'pk': pk}
+        return InstrumentViewSet.as_view({'get': action})(request, **kwargs)
+
+    def test_matches_retrieve(self):
+        response = self.get(ids=','.join(str(instrument.pk) for instrument in self.instruments))
+        self.assertEqual(list(response.data['results']), [instrument.pk for instrument in self.instruments])
+        self.assertEqual(response.data['missing'], [])
+        for instrument in self.instruments:
+            self.assertEqual(JSONRenderer().render(response.data['results'][instrument.pk]),
+                             JSONRenderer().render(self.get('retrieve', instrument.pk).data))
+
+    def test_asset_tags(self):
+        tags = [self.instruments[0].asset_tag_number, 99, self.instruments[1].asset_tag_number]
+        response = self.get(asset_tags=','.join(map(str, tags)))
+        self.assertEqual(list(response.data['results']), [self.instruments[0].pk, self.instruments[1].pk])
+        self.assertEqual(response.data['missing'], [99])
+
+    def test_fixed_query_count(self):
+        counts = []
+        for size in [1, len(self.instruments)]:
+            with CaptureQueriesContext(connection) as queries:
+                self.get(ids=','.join(str(instrument.pk) for instrument in self.instruments[:size]))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_sparse_fields(self):
+        response = self.get(ids=self.instruments[0].pk, fields='pk,serial_number')
+        self.assertEqual(response.data['results'][self.instruments[0].pk],
+                         {'pk': self.instruments[0].pk, 'serial_number': self.instruments[0].serial_number})
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.get().status_code, 400)
+        self.assertEqual(self.get(ids='1', asset_tags='2').status_code, 400)
+        self.assertEqual(self.get(ids='1,x').status_code, 400)
+        self.assertEqual(self.get(ids=','.join(map(str, range(InstrumentViewSet.batch_max_size + 1)))).status_code,
+                         400)
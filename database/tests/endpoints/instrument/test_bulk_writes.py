@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import localtime, now
+from rest_framework.test import force_authenticate
+
+from database.enums import DataScopeEnum
+from database.models.data_version import DataVersion
+from database.models.instrument import CalibrationEvent, Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.models.search_document import SearchDocument
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import InstrumentViewSet
+
+
+class BulkWritesTestCase(EndpointTestCase):
+
+    def setUp(self):
+        self.user = create_non_admin_user()
+        self.bench = InstrumentCategory.objects.create(name='bench')
+        self.field = InstrumentCategory.objects.create(name='field')
+        self.model = Model.objects.get(model_number='87M')
+        self.instruments = [Instrument.objects.create(model=self.model, serial_number=f'sn{i}') for i in range(10)]
+        for instrument in self.instruments[:5]:
+            instrument.instrument_categories.set([self.bench])
+
+    def send(self, method, data):
+        request = getattr(self.factory, method)(self.Endpoints.INSTRUMENTS.value + 'bulk/', data, format='json')
+        force_authenticate(request, self.admin)
+        return InstrumentViewSet.as_view({method: 'bulk'})(request)
+
+    def test_create(self):
+        response = self.send('post', [
+            {'model': self.model.pk, 'serial_number': 'new', 'instrument_categories': ['bench', 'field']},
+            {'model': self.model.pk, 'asset_tag_number': 123456, 'comment': 'spare'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], [201, 201])
+        self.assertEqual(results[1]['asset_tag_number'], 123456)
+        created = Instrument.objects.get(pk=results[0]['pk'])
+        self.assertEqual(created.asset_tag_number, results[0]['asset_tag_number'])
+        self.assertEqual(set(created.instrument_categories.values_list('name', flat=True)), {'bench', 'field'})
+        self.assertEqual(Instrument.objects.get(pk=results[1]['pk']).comment, 'spare')
+        self.assertTrue(SearchDocument.objects.filter(object_id=created.pk, document__contains='new').exists())
+
+    def test_update(self):
+        before = DataVersion.objects.current(DataScopeEnum.INSTRUMENTS.value)
+        model_version = Model.objects.get(pk=self.model.pk).version
+        versions = dict(Instrument.objects.values_list('pk', 'version'))
+        response = self.send('patch', [{'pk': instrument.pk, 'comment': 'moved', 'instrument_categories': ['field']}
+                                       for instrument in self.instruments[3:8]])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({result['status'] for result in response.data['results']}, {200})
+        for instrument in Instrument.objects.filter(pk__in=[i.pk for i in self.instruments[3:8]]):
+            self.assertEqual(instrument.comment, 'moved')
+            self.assertEqual(instrument.version, versions[instrument.pk] + 1)
+            self.assertEqual(list(instrument.instrument_categories.values_list('name', flat=True)), ['field'])
+        self.assertEqual(self.bench.instrument_list.count(), 3)
+        self.assertNotEqual(DataVersion.objects.current(DataScopeEnum.INSTRUMENTS.value), before)
+        self.assertGreater(Model.objects.get(pk=self.model.pk).version, model_version)
+        self.assertGreater(InstrumentCategory.objects.get(pk=self.bench.pk).version, self.bench.version)
+
+    def test_update_query_count_does_not_grow(self):
+        counts = []
+        for instruments in [self.instruments[:2], self.instruments]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.send('patch', [{'pk': instrument.pk, 'serial_number': f'{instrument.pk}-x',
+                                                'instrument_categories': ['field']} for instrument in instruments])
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_invalid_items_write_nothing(self):
+        response = self.send('patch', [
+            {'pk': self.instruments[0].pk, 'comment': 'fine'},
+            {'pk': self.instruments[1].pk, 'serial_number': 'sn2'},
+            {'pk': self.instruments[2].pk, 'instrument_categories': ['missing']},
+            {'pk': self.instruments[3].pk, 'asset_tag_number': 123456},
+            {'pk': 0},
+        ])
+        self.assertEqual(response.status_code, 400)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, [424, 400, 400, 400, 404])
+        self.assertIn('non_field_errors', response.data['results'][1]['errors'])
+        self.assertIn('instrument_categories', response.data['results'][2]['errors'])
+        self.assertEqual(Instrument.objects.get(pk=self.instruments[0].pk).comment, '')
+
+    def test_duplicates_within_request(self):
+        response = self.send('post', [{'model': self.model.pk, 'serial_number': 'twin'}] * 2)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Instrument.objects.filter(serial_number='twin').count(), 0)
+
+    def test_delete(self):
+        deleted = self.instruments[:4]
+        CalibrationEvent.objects.create(instrument=deleted[0], user=self.user, date=localtime(now()))
+        event = CalibrationEvent.objects.create(instrument=self.instruments[5], user=self.user,
+                                                date=localtime(now()) - timedelta(days=1))
+        event.calibrated_with.add(deleted[1])
+        before = DataVersion.objects.current(DataScopeEnum.CALIBRATION_EVENTS.value)
+
+        response = self.send('delete', [instrument.pk for instrument in deleted])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({result['status'] for result in response.data['results']}, {204})
+        self.assertFalse(Instrument.objects.filter(pk__in=[i.pk for i in deleted]).exists())
+        self.assertFalse(SearchDocument.objects.filter(object_id__in=[i.pk for i in deleted],
+                                                       scope=DataScopeEnum.INSTRUMENTS.value).exists())
+        self.assertEqual(CalibrationEvent.objects.filter(instrument=deleted[0]).count(), 0)
+        self.assertGreater(CalibrationEvent.objects.get(pk=event.pk).version, event.version)
+        self.assertNotEqual(DataVersion.objects.current(DataScopeEnum.CALIBRATION_EVENTS.value), before)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.send('delete', {'pk': 1}).status_code, 400)
+        self.assertEqual(self.send('delete', []).status_code, 400)
+        self.assertEqual(self.send('delete', list(range(1, InstrumentViewSet.bulk_max_size + 2))).status_code, 400)
+        response = self.send('delete', [self.instruments[0].pk, self.instruments[0].pk, 'x'])
+        self.assertEqual([result['status'] for result in response.data['results']], [400, 400, 400])
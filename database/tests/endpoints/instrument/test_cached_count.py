@@ -0,0 +1,44 @@
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import Instrument
+from database.models.model import Model
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.views import InstrumentViewSet
+
+
+class CachedCountTestCase(EndpointTestCase):
+
+    def setUp(self):
+        cache.clear()
+        for model in Model.objects.all():
+            for i in range(3):
+                Instrument.objects.create(model=model, serial_number=f'sn{i}')
+
+    def list(self, params):
+        request = self.factory.get(self.Endpoints.INSTRUMENTS.value + '?' + urlencode(params))
+        force_authenticate(request, self.admin)
+        response = InstrumentViewSet.as_view({'get': 'list'})(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_count_matches_and_is_exact(self):
+        data = self.list({'page': 1, 'ordering': '-calibration_expiration_date'})
+        self.assertEqual(data['count'], Instrument.objects.count())
+        self.assertFalse(data['count_is_estimate'])
+
+    def test_count_is_cached_across_pages(self):
+        self.list({'page': 1, 'serial_number': 'sn1'})
+        with CaptureQueriesContext(connection) as queries:
+            data = self.list({'page': 2, 'page_size': 2, 'serial_number': 'sn1'})
+        self.assertFalse([q for q in queries.captured_queries if 'COUNT(' in q['sql']])
+        self.assertEqual(data['count'], Instrument.objects.filter(serial_number='sn1').count())
+
+    def test_writes_invalidate_count(self):
+        count = self.list({'page': 1})['count']
+        Instrument.objects.create(model=Model.objects.first(), serial_number='new')
+        self.assertEqual(self.list({'page': 1})['count'], count + 1)
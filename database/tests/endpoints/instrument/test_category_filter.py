@@ -0,0 +1,53 @@
+from urllib.parse import urlencode
+
+from rest_framework.test import force_authenticate
+
+from database.filters import InstrumentFilter
+from database.models.instrument import Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.views import InstrumentViewSet
+
+
+class CategoryFilterTestCase(EndpointTestCase):
+
+    def setUp(self):
+        bench = InstrumentCategory.objects.create(name='bench')
+        field = InstrumentCategory.objects.create(name='field')
+        InstrumentCategory.objects.create(name='spare')
+        for serial_number, model_number, categories in [('a', '86V', [bench, field]), ('b', '87M', [bench]),
+                                                        ('c', '901C', [field]), ('d', '87M', [])]:
+            instrument = Instrument.objects.create(model=Model.objects.get(model_number=model_number),
+                                                   serial_number=serial_number)
+            instrument.instrument_categories.set(categories)
+
+    def listed(self, **params):
+        request = self.factory.get(self.Endpoints.INSTRUMENTS.value + '?' + urlencode({'page_size': 100, **params}))
+        force_authenticate(request, self.admin)
+        response = InstrumentViewSet.as_view({'get': 'list'})(request)
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['serial_number'] for item in response.data['results'])
+
+    def test_instruments_must_have_every_category(self):
+        self.assertEqual(self.listed(instrument_categories__name='bench'), ['a', 'b'])
+        self.assertEqual(self.listed(instrument_categories__name='bench,field'), ['a'])
+        self.assertEqual(self.listed(instrument_categories__name='field,bench,bench'), ['a'])
+        self.assertEqual(self.listed(instrument_categories__name='bench,field,spare'), [])
+        self.assertEqual(self.listed(instrument_categories__name='bench,missing'), [])
+
+    def test_models_must_have_every_category(self):
+        self.assertEqual(self.listed(model__model_categories__name='voltmeter'), ['a', 'b', 'd'])
+        self.assertEqual(self.listed(model__model_categories__name='voltmeter,multimeter'), ['b', 'd'])
+        self.assertEqual(self.listed(model__model_categories__name='voltmeter,oscilloscope'), [])
+        self.assertEqual(self.listed(model__model_categories__name='voltmeter,missing'), [])
+        self.assertEqual(self.listed(model__model_categories__name='voltmeter,multimeter',
+                                     instrument_categories__name='bench'), ['b'])
+
+    def test_one_subquery_per_relation(self):
+        filters = InstrumentFilter.base_filters
+        for names in ['bench', 'bench,field', 'bench,field,spare,missing']:
+            sql = str(filters['instrument_categories__name'].filter(filters['model__model_categories__name'].filter(
+                Instrument.objects.all(), 'voltmeter,multimeter'), names).query)
+            self.assertEqual(sql.count('JOIN'), 0)
+            self.assertEqual(sql.count('SELECT'), 5)
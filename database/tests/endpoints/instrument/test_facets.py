@@ -0,0 +1,86 @@
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.utils.timezone import localtime, now
+from rest_framework.test import force_authenticate
+
+from database.enums import CalibrationStatusEnum
+from database.models.instrument import CalibrationEvent, Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import InstrumentViewSet, ModelViewSet
+
+
+class FacetsTestCase(EndpointTestCase):
+
+    def setUp(self):
+        user = create_non_admin_user()
+        bench = InstrumentCategory.objects.create(name='bench')
+        Model.objects.create(vendor='Tek', model_number='Uncalibratable', description='No frequency')
+        for index, model in enumerate(Model.objects.all()):
+            for i in range(3):
+                instrument = Instrument.objects.create(model=model, serial_number=f'sn{i}')
+                instrument.instrument_categories.set([bench][:i % 2])
+                if i:
+                    # 86V (90 days) is valid, 87M (60 days) expiring, 901C (30 days) expired
+                    CalibrationEvent.objects.create(instrument=instrument, user=user,
+                                                    date=localtime(now()) - timedelta(days=45))
+
+    def get(self, viewset, action, endpoint, **params):
+        request = self.factory.get(endpoint + '?' + urlencode({'page_size': 100, **params}))
+        force_authenticate(request, self.admin)
+        return viewset.as_view({'get': action})(request).data
+
+    def assertMatchesLists(self, viewset, endpoint, facets, params, lookups):
+        for facet, lookup in lookups.items():
+            for item in facets[facet]:
+                if item['count']:
+                    listed = self.get(viewset, 'list', endpoint, **{**params, lookup: item['value']})
+                    self.assertEqual(listed['count'], item['count'], (facet, item))
+
+    def test_instrument_facets(self):
+        facets = self.get(InstrumentViewSet, 'facets', self.Endpoints.INSTRUMENTS.value)
+        self.assertEqual(facets['calibration_status'], [
+            {'value': CalibrationStatusEnum.EXPIRED.value, 'count': 2},
+            {'value': CalibrationStatusEnum.EXPIRING.value, 'count': 2},
+            {'value': CalibrationStatusEnum.NOT_CALIBRATABLE.value, 'count': 3},
+            {'value': CalibrationStatusEnum.UNCALIBRATED.value, 'count': 3},
+            {'value': CalibrationStatusEnum.VALID.value, 'count': 2},
+        ])
+        self.assertEqual(facets['instrument_categories'], [{'value': 'bench', 'count': 4}])
+        self.assertEqual(facets['vendors'], [{'value': 'Fluke', 'count': 6}, {'value': 'Tek', 'count': 3},
+                                             {'value': 'Volt', 'count': 3}])
+        self.assertMatchesLists(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, facets, {}, {
+            'model_categories': 'model__model_categories__name',
+            'instrument_categories': 'instrument_categories__name',
+            'vendors': 'model__vendor',
+        })
+
+    def test_facets_follow_filters(self):
+        params = {'model__model_categories__name': 'voltmeter', 'search': 'sn1'}
+        facets = self.get(InstrumentViewSet, 'facets', self.Endpoints.INSTRUMENTS.value, **params)
+        self.assertEqual(sum(item['count'] for item in facets['calibration_status']),
+                         self.get(InstrumentViewSet, 'list', self.Endpoints.INSTRUMENTS.value, **params)['count'])
+        self.assertEqual(facets['model_categories'], [{'value': 'multimeter', 'count': 1},
+                                                      {'value': 'voltmeter', 'count': 2}])
+        self.assertMatchesLists(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, facets, params, {
+            'instrument_categories': 'instrument_categories__name',
+        })
+
+    def test_model_facets(self):
+        facets = self.get(ModelViewSet, 'facets', self.Endpoints.MODELS.value)
+        self.assertEqual(facets['model_categories'], [{'value': 'multimeter', 'count': 1},
+                                                      {'value': 'oscilloscope', 'count': 1},
+                                                      {'value': 'voltmeter', 'count': 2}])
+        facets = self.get(ModelViewSet, 'facets', self.Endpoints.MODELS.value, vendor='Fluke')
+        self.assertMatchesLists(ModelViewSet, self.Endpoints.MODELS.value, facets, {'vendor': 'Fluke'}, {
+            'model_categories': 'model_categories__name',
+        })
+
+    def test_single_query(self):
+        self.get(InstrumentViewSet, 'facets', self.Endpoints.INSTRUMENTS.value)
+        with self.assertNumQueries(2):
+            # the data version behind the cache key, then the counts
+            self.get(InstrumentViewSet, 'facets', self.Endpoints.INSTRUMENTS.value, vendor='Fluke')
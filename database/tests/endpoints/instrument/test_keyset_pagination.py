@@ -0,0 +1,74 @@
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.utils.timezone import localtime, now
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import CalibrationEvent, Instrument
+from database.models.model import Model
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import InstrumentViewSet, ModelViewSet
+
+
+class KeysetPaginationTestCase(EndpointTestCase):
+
+    def setUp(self):
+        user = create_non_admin_user()
+        today = localtime(now())
+        for index, model in enumerate(Model.objects.all()):
+            for i in range(5):
+                serial_number = None if i == 0 else f'sn{i % 3}'
+                instrument = Instrument.objects.create(model=model, serial_number=serial_number) \
+                    if serial_number is None or not Instrument.objects.filter(
+                        model=model, serial_number=serial_number).exists() \
+                    else Instrument.objects.create(model=model, serial_number=f'{serial_number}-{i}')
+                if i % 2:
+                    CalibrationEvent.objects.create(instrument=instrument, user=user,
+                                                    date=today - timedelta(days=index + i % 3))
+
+    def list(self, viewset, endpoint, params):
+        request = self.factory.get(endpoint + '?' + urlencode(params))
+        force_authenticate(request, self.admin)
+        response = viewset.as_view({'get': 'list'})(request)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def walk(self, viewset, endpoint, ordering):
+        params = {'cursor': '', 'page_size': 3}
+        if ordering:
+            params['ordering'] = ordering
+        pks = []
+        data = self.list(viewset, endpoint, params)
+        while True:
+            pks += [item['pk'] for item in data['results']]
+            if data['next'] is None:
+                return pks
+            request_params = dict(params, cursor=data['next'].split('cursor=')[1].split('&')[0])
+            data = self.list(viewset, endpoint, request_params)
+
+    def test_instrument_orderings(self):
+        endpoint = self.Endpoints.INSTRUMENTS.value
+        for ordering in [None, 'serial_number', '-serial_number', 'model__vendor', '-model__model_number',
+                         'most_recent_calibration_date', '-calibration_expiration_date', 'asset_tag_number']:
+            params = {'cursor': '', 'page_size': 1000}
+            if ordering:
+                params['ordering'] = ordering
+            expected = [item['pk'] for item in self.list(InstrumentViewSet, endpoint, params)['results']]
+            self.assertEqual(len(expected), Instrument.objects.count())
+            self.assertEqual(self.walk(InstrumentViewSet, endpoint, ordering), expected, ordering)
+
+    def test_model_orderings(self):
+        endpoint = self.Endpoints.MODELS.value
+        for ordering in [None, '-vendor', 'calibration_frequency']:
+            self.assertEqual(sorted(self.walk(ModelViewSet, endpoint, ordering)),
+                             sorted(Model.objects.values_list('pk', flat=True)))
+
+    def test_invalid_cursor(self):
+        request = self.factory.get(self.Endpoints.INSTRUMENTS.value + '?cursor=garbage')
+        force_authenticate(request, self.admin)
+        self.assertEqual(InstrumentViewSet.as_view({'get': 'list'})(request).status_code, 404)
+
+    def test_page_number_pagination_unchanged(self):
+        data = self.list(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, {'page': 2})
+        self.assertEqual(data['count'], Instrument.objects.count())
@@ -0,0 +1,78 @@
+from urllib.parse import urlencode
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import CalibrationEvent, Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import CalibrationEventViewSet, InstrumentViewSet, ModelViewSet
+
+
+class SparseFieldsTestCase(EndpointTestCase):
+
+    def setUp(self):
+        user = create_non_admin_user()
+        category = InstrumentCategory.objects.create(name='bench')
+        for model in Model.objects.all():
+            for i in range(3):
+                instrument = Instrument.objects.create(model=model, serial_number=f'sn{i}')
+                instrument.instrument_categories.set([category])
+                CalibrationEvent.objects.create(instrument=instrument, user=user, date='2021-03-01T00:00Z')
+
+    def get(self, viewset, endpoint, params, action='list', pk=None):
+        request = self.factory.get(endpoint + '?' + urlencode(params))
+        force_authenticate(request, self.admin)
+        kwargs = {} if pk is None else {'pk': pk}
+        return viewset.as_view({'get': action})(request, **kwargs)
+
+    def test_fields_limit_columns_and_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value,
+                                {'fields': 'pk,asset_tag_number,model', 'page': 1})
+        self.assertEqual(response.status_code, 200)
+        for item in response.data['results']:
+            self.assertEqual(set(item), {'pk', 'asset_tag_number', 'model'})
+            self.assertIsInstance(item['model'], int)
+        sql = ' '.join(q['sql'] for q in queries.captured_queries)
+        self.assertNotIn('"database_instrument"."comment"', sql)
+        self.assertNotIn('instrumentcategory', sql)
+        self.assertNotIn('custom_form', sql)
+
+    def test_expand_embeds_nested(self):
+        response = self.get(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value,
+                            {'fields': 'pk,model,instrument_categories', 'expand': 'model', 'page': 1})
+        item = response.data['results'][0]
+        self.assertEqual(item['model']['vendor'], Instrument.objects.get(pk=item['pk']).model.vendor)
+        self.assertIsInstance(item['instrument_categories'][0], int)
+        with self.assertNumQueries(6):
+            # data version, count, page, model categories and calibrator categories of the expanded models,
+            # and primary keys of the instrument categories
+            self.get(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value,
+                     {'fields': 'pk,model,instrument_categories', 'expand': 'model', 'page': 1, 'serial_number': 'sn1'})
+
+    def test_retrieve_and_other_endpoints(self):
+        instrument = Instrument.objects.first()
+        response = self.get(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value,
+                            {'fields': 'pk,calibration_history', 'expand': 'calibration_history'}, 'retrieve',
+                            instrument.pk)
+        self.assertEqual(len(response.data['calibration_history']), 1)
+        self.assertEqual(response.data['calibration_history'][0]['instrument']['pk'], instrument.pk)
+
+        response = self.get(ModelViewSet, self.Endpoints.MODELS.value, {'fields': 'vendor'})
+        self.assertEqual(response.data['results'][0], {'vendor': 'Fluke'})
+
+        response = self.get(CalibrationEventViewSet, self.Endpoints.CALIBRATION_EVENTS.value,
+                            {'fields': 'pk,instrument'})
+        self.assertEqual(set(response.data[0]), {'pk', 'instrument'})
+
+    def test_unchanged_without_params(self):
+        response = self.get(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, {'page': 1})
+        self.assertIsInstance(response.data['results'][0]['model'], dict)
+
+    def test_unknown_field(self):
+        response = self.get(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, {'fields': 'pk,nope'})
+        self.assertEqual(response.status_code, 400)
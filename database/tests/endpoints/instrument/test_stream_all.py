@@ -0,0 +1,51 @@
+from django.utils.timezone import localtime, now
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import CalibrationEvent, Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.serializers.instrument import InstrumentSerializer
+from database.serializers.model import ModelSerializer
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import InstrumentViewSet, ModelViewSet
+
+
+class StreamAllTestCase(EndpointTestCase):
+
+    def setUp(self):
+        user = create_non_admin_user()
+        category = InstrumentCategory.objects.create(name='bench')
+        for model in Model.objects.all():
+            for i in range(4):
+                instrument = Instrument.objects.create(model=model, serial_number=f'sn{i}')
+                instrument.instrument_categories.set([category])
+                CalibrationEvent.objects.create(instrument=instrument, user=user, date=localtime(now()))
+
+    def stream(self, viewset, endpoint):
+        request = self.factory.get(endpoint + 'all/')
+        force_authenticate(request, self.admin)
+        response = viewset.as_view({'get': 'all'})(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return b''.join(response.streaming_content)
+
+    def test_instruments_match_serializer(self):
+        queryset = InstrumentViewSet(request=None, format_kwarg=None).get_queryset().order_by(
+            'model__vendor', 'model__model_number', 'serial_number')
+        expected = JSONRenderer().render(InstrumentSerializer(queryset, many=True).data)
+        self.assertEqual(self.stream(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value), expected)
+
+    def test_models_match_serializer(self):
+        expected = JSONRenderer().render(ModelSerializer(Model.objects.all(), many=True).data)
+        self.assertEqual(self.stream(ModelViewSet, self.Endpoints.MODELS.value), expected)
+
+    def test_instrument_queries_do_not_grow_with_rows(self):
+        with self.assertNumQueries(4):
+            self.stream(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value)
+        model = Model.objects.first()
+        for i in range(10):
+            Instrument.objects.create(model=model, serial_number=f'extra{i}')
+        with self.assertNumQueries(4):
+            self.stream(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value)
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.utils.timezone import localtime, now
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import ApprovalData, CalibrationEvent, Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.models.model_category import ModelCategory
+from database.serializers.instrument import InstrumentSerializer
+from database.serializers.model import ModelSerializer
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import InstrumentViewSet, ModelViewSet
+
+
+class ValuesListTestCase(EndpointTestCase):
+
+    def setUp(self):
+        user = create_non_admin_user()
+        bench, field = InstrumentCategory.objects.create(name='bench'), InstrumentCategory.objects.create(name='field')
+        calibrator = Model.objects.create(vendor='Keysight', model_number='E3631A', description='Power supply',
+                                          calibration_frequency=timedelta(days=365), approval_required=True,
+                                          calibration_mode='CUSTOM')
+        Model.objects.filter(pk=calibrator.pk).update(custom_form='{"fields": []}')
+        calibrator.calibrator_categories.set(ModelCategory.objects.all())
+        Model.objects.create(vendor='Tek', model_number='Uncalibratable', description='No frequency')
+        for index, model in enumerate(Model.objects.all()):
+            for i in range(3):
+                instrument = Instrument.objects.create(model=model, serial_number=None if i == 0 else f'sn{i}',
+                                                       comment='ünïcode')
+                instrument.instrument_categories.set([field, bench][:i])
+                event = CalibrationEvent.objects.create(instrument=instrument, user=user,
+                                                        date=localtime(now()) - timedelta(days=index * 7 + i))
+                if i and model.approval_required:
+                    ApprovalData.objects.create(calibration_event=event, approved=i == 1, approver=user,
+                                                date=localtime(now()))
+
+    def list(self, viewset, endpoint, params, action='list'):
+        request = self.factory.get(endpoint + '?' + urlencode(params))
+        force_authenticate(request, self.admin)
+        return viewset.as_view({'get': action})(request)
+
+    def test_instrument_list_matches_serializer(self):
+        for ordering in ['', '-calibration_expiration_date', 'asset_tag_number']:
+            response = self.list(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value,
+                                 {'page': 1, 'page_size': 100, 'ordering': ordering})
+            queryset = InstrumentViewSet(request=None, format_kwarg=None).get_queryset()
+            pks = [item['pk'] for item in response.data['results']]
+            instruments = sorted(queryset.filter(pk__in=pks), key=lambda instrument: pks.index(instrument.pk))
+            self.assertEqual(len(pks), Instrument.objects.count())
+            self.assertEqual(JSONRenderer().render(response.data['results']),
+                             JSONRenderer().render(InstrumentSerializer(instruments, many=True).data))
+
+    def test_model_list_matches_serializer(self):
+        response = self.list(ModelViewSet, self.Endpoints.MODELS.value, {'page': 1, 'page_size': 100})
+        self.assertEqual(JSONRenderer().render(response.data['results']),
+                         JSONRenderer().render(ModelSerializer(Model.objects.all(), many=True).data))
+
+    def test_all_matches_serializer(self):
+        response = self.list(ModelViewSet, self.Endpoints.MODELS.value, {}, 'all')
+        self.assertEqual(b''.join(response.streaming_content),
+                         JSONRenderer().render(ModelSerializer(Model.objects.all(), many=True).data))
+
+    def test_instrument_list_queries(self):
+        with self.assertNumQueries(6):
+            # data version, count, page, then one query per category relation
+            self.list(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, {'page': 1})
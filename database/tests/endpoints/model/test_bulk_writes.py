@@ -0,0 +1,62 @@
+from django.utils.timezone import localtime, now
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import CalibrationEvent, Instrument
+from database.models.model import Model
+from database.picker_index import picker_index
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import ModelViewSet
+
+
+class ModelBulkWritesTestCase(EndpointTestCase):
+
+    def send(self, method, data):
+        request = getattr(self.factory, method)(self.Endpoints.MODELS.value + 'bulk/', data, format='json')
+        force_authenticate(request, self.admin)
+        return ModelViewSet.as_view({method: 'bulk'})(request)
+
+    def test_create(self):
+        self.assertEqual(picker_index().vendors(), ['Fluke', 'Volt'])
+        response = self.send('post', [
+            {'vendor': 'Keysight', 'model_number': 'E36', 'description': 'Supply', 'model_categories': ['voltmeter']},
+            {'vendor': 'Keysight', 'model_number': 'E37', 'description': 'Supply', 'calibration_frequency': 30},
+        ])
+        self.assertEqual(response.status_code, 200)
+        first, second = (Model.objects.get(pk=result['pk']) for result in response.data['results'])
+        self.assertEqual(first.calibration_mode, 'NOT_CALIBRATABLE')
+        self.assertEqual(list(first.model_categories.values_list('name', flat=True)), ['voltmeter'])
+        self.assertEqual(second.calibration_mode, 'DEFAULT')
+        self.assertEqual(picker_index().vendors(), ['Fluke', 'Keysight', 'Volt'])
+
+        response = self.send('post', [{'vendor': 'Keysight', 'model_number': 'E36', 'description': 'Again'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.data['results'][0]['errors'])
+
+    def test_update_approves_pending_events(self):
+        user = create_non_admin_user()
+        model = Model.objects.get(model_number='87M')
+        Model.objects.filter(pk=model.pk).update(approval_required=True)
+        instrument = Instrument.objects.create(model=model, serial_number='sn')
+        event = CalibrationEvent.objects.create(instrument=instrument, user=user, date=localtime(now()))
+
+        response = self.send('patch', [{'pk': model.pk, 'approval_required': False,
+                                        'calibrator_categories': ['voltmeter']}])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(CalibrationEvent.objects.get(pk=event.pk).approval_data.approved)
+        self.assertEqual(list(Model.objects.get(pk=model.pk).calibrator_categories.values_list('name', flat=True)),
+                         ['voltmeter'])
+        self.assertGreater(Instrument.objects.get(pk=instrument.pk).version, instrument.version)
+
+    def test_delete_models_in_use(self):
+        used = Model.objects.get(model_number='87M')
+        Instrument.objects.create(model=used, serial_number='sn')
+        unused = Model.objects.get(model_number='901C')
+        response = self.send('delete', [unused.pk, used.pk])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result['status'] for result in response.data['results']], [424, 400])
+        self.assertEqual(Model.objects.count(), 3)
+
+        response = self.send('delete', [unused.pk])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Model.objects.filter(pk=unused.pk).exists())
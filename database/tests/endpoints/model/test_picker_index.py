@@ -0,0 +1,56 @@
+from urllib.parse import urlencode
+
+from django.test import override_settings
+from rest_framework.test import force_authenticate
+
+from database.enums import DataScopeEnum
+from database.models.data_version import DataVersion
+from database.models.model import Model
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.views import ModelViewSet
+
+
+class PickerIndexTestCase(EndpointTestCase):
+
+    def setUp(self):
+        for vendor, model_number in [('Flu', 'F1'), ('Influx', 'I9'), ('fluke', '87M'), ('Agilent', '87MX')]:
+            Model.objects.create(vendor=vendor, model_number=model_number, description='description')
+
+    def get(self, action, **params):
+        request = self.factory.get(self.Endpoints.MODELS.value + action + '/?' + urlencode(params))
+        force_authenticate(request, self.admin)
+        return ModelViewSet.as_view({'get': action})(request)
+
+    def test_ranking(self):
+        # vendors exactly 'flu' ignoring case, then starting with it, then containing it
+        self.assertEqual(self.get('model_numbers', vendor='flu').data, ['F1', '86V', '87M', 'I9'])
+        self.assertEqual(self.get('model_numbers', vendor='fluke').data, ['86V', '87M'])
+        self.assertEqual(self.get('vendors', model_number='87m').data, ['Fluke', 'fluke', 'Agilent'])
+        self.assertEqual(self.get('vendors', model_number='87MX').data, ['Agilent'])
+        self.assertEqual(self.get('vendors', model_number='zzzz').data, [])
+        self.assertEqual(self.get('vendors').data, sorted(set(Model.objects.values_list('vendor', flat=True))))
+
+    def test_limit(self):
+        self.assertEqual(self.get('model_numbers', vendor='flu', limit=2).data, ['F1', '86V'])
+        self.assertEqual(self.get('vendors', limit='x').status_code, 400)
+        self.assertEqual(self.get('vendors', limit=0).status_code, 400)
+
+    def test_served_from_memory(self):
+        self.get('vendors')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get('model_numbers', vendor='Volt').data, ['901C'])
+
+    def test_writes_rebuild_index(self):
+        self.assertEqual(self.get('model_numbers', vendor='Keysight').data, [])
+        model = Model.objects.create(vendor='Keysight', model_number='34465A', description='Digital multimeter')
+        self.assertEqual(self.get('model_numbers', vendor='Keysight').data, ['34465A'])
+        model.delete()
+        self.assertEqual(self.get('model_numbers', vendor='Keysight').data, [])
+
+    def test_writes_by_other_workers(self):
+        self.get('vendors')
+        # a bulk write elsewhere sends no signal to this worker, but bumps the data version
+        Model.objects.bulk_create([Model(vendor='Rigol', model_number='DS1054Z', description='Oscilloscope')])
+        DataVersion.objects.bump(DataScopeEnum.MODELS.value)
+        with override_settings(PICKER_INDEX_RECHECK_INTERVAL=0):
+            self.assertEqual(self.get('model_numbers', vendor='rigol').data, ['DS1054Z'])
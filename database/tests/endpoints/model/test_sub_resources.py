@@ -0,0 +1,68 @@
+from urllib.parse import urlencode
+
+from django.utils.timezone import localtime, now
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import CalibrationEvent, Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.models.model_category import ModelCategory
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.tests.test_utils import create_non_admin_user
+from database.views import InstrumentCategoryViewSet, InstrumentViewSet, ModelCategoryViewSet, ModelViewSet
+
+
+class SubResourcesTestCase(EndpointTestCase):
+
+    def setUp(self):
+        user = create_non_admin_user()
+        self.model = Model.objects.get(model_number='86V')
+        self.category = InstrumentCategory.objects.create(name='bench')
+        for i in range(15):
+            instrument = Instrument.objects.create(model=self.model, serial_number=f'sn{i}')
+            instrument.instrument_categories.set([self.category])
+        self.instrument = Instrument.objects.filter(model=self.model).first()
+        for i in range(12):
+            CalibrationEvent.objects.create(instrument=self.instrument, user=user, date=localtime(now()))
+
+    def get(self, viewset, action, pk, params=None):
+        request = self.factory.get(f'{self.Endpoints.MODELS.value}{pk}/?{urlencode(params or {})}')
+        force_authenticate(request, self.admin)
+        response = viewset.as_view({'get': action})(request, pk=pk)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_model_instruments(self):
+        data = self.get(ModelViewSet, 'instruments', self.model.pk)
+        self.assertEqual(data['count'], 15)
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(set(data['results'][0]), {'pk', 'serial_number', 'asset_tag_number'})
+        self.assertEqual(len(self.get(ModelViewSet, 'instruments', self.model.pk, {'page': 2})['results']), 5)
+
+    def test_category_members(self):
+        data = self.get(ModelCategoryViewSet, 'models', ModelCategory.objects.get(name='voltmeter').pk)
+        self.assertEqual([item['model_number'] for item in data['results']], ['86V', '87M'])
+        data = self.get(InstrumentCategoryViewSet, 'instruments', self.category.pk, {'page_size': 20})
+        self.assertEqual(data['count'], 15)
+
+    def test_calibration_history(self):
+        with self.assertNumQueries(4):
+            # instrument, count, page with user and approval joined, calibrated_with
+            data = self.get(InstrumentViewSet, 'calibration_history', self.instrument.pk)
+        self.assertEqual(data['count'], 12)
+        self.assertEqual(data['results'][0]['approval_data']['approved'], True)
+
+    def test_retrieve_without_nested_lists(self):
+        data = self.get(ModelViewSet, 'retrieve', self.model.pk, {'nested': 'false'})
+        self.assertNotIn('instruments', data)
+        self.assertEqual(data['model_categories'][0]['name'], 'voltmeter')
+        self.assertIn('instruments', self.get(ModelViewSet, 'retrieve', self.model.pk))
+
+        data = self.get(InstrumentViewSet, 'retrieve', self.instrument.pk, {'nested': 'false'})
+        self.assertNotIn('calibration_history', data)
+        self.assertEqual(data['model']['pk'], self.model.pk)
+
+        data = self.get(InstrumentCategoryViewSet, 'retrieve', self.category.pk)
+        self.assertEqual(len(data['instrument_list']), 15)
+        self.assertNotIn('instrument_list', self.get(InstrumentCategoryViewSet, 'retrieve', self.category.pk,
+                                                     {'nested': 'false'}))
@@ -0,0 +1,101 @@
+import io
+from functools import reduce
+from operator import or_
+from urllib.parse import urlencode
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+
+from database.models.instrument import Instrument
+from database.models.instrument_category import InstrumentCategory
+from database.models.model import Model
+from database.models.model_category import ModelCategory
+from database.models.search_document import INDEXED_FIELDS, SearchDocument, deferred_indexing, sqlite_has_trigram
+from database.tests.endpoints.endpoint_test_case import EndpointTestCase
+from database.views import InstrumentViewSet, ModelViewSet
+
+TERMS = ['fluke', 'VOLT', '86', 'v', 'multi', 'bench', 'sn-1', 'Probes', 'fluke 87', 'oscilloscope portable', 'zzz',
+         'a"b']
+
+
+class IndexedSearchTestCase(EndpointTestCase):
+
+    def setUp(self):
+        self.bench = InstrumentCategory.objects.create(name='bench')
+        for model in Model.objects.all():
+            for i in range(2):
+                instrument = Instrument.objects.create(model=model, serial_number=f'sn-{i}')
+                instrument.instrument_categories.set([self.bench][:i])
+
+    def search(self, viewset, endpoint, **params):
+        request = self.factory.get(endpoint + '?' + urlencode({'page_size': 100, **params}))
+        force_authenticate(request, self.admin)
+        return sorted(item['pk'] for item in viewset.as_view({'get': 'list'})(request).data['results'])
+
+    def expected(self, model, search, fields=None):
+        """ Primary keys matched by the joins of the plain SearchFilter """
+        queryset = model.objects.all()
+        for term in search.split():
+            queryset = queryset.filter(reduce(or_, [Q(**{f'{field}__icontains': term})
+                                                    for field in fields or INDEXED_FIELDS[model]]))
+        return sorted(set(queryset.values_list('pk', flat=True)))
+
+    def assertSearchMatchesJoins(self):
+        for term in TERMS + [str(Instrument.objects.first().asset_tag_number)[:4]]:
+            self.assertEqual(self.search(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, search=term),
+                             self.expected(Instrument, term), term)
+            self.assertEqual(self.search(ModelViewSet, self.Endpoints.MODELS.value, search=term),
+                             self.expected(Model, term), term)
+
+    def test_matches_joined_search(self):
+        self.assertSearchMatchesJoins()
+
+    def test_uses_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, search='fluke')
+        searches = [query['sql'] for query in queries if SearchDocument._meta.db_table in query['sql']]
+        self.assertTrue(searches)
+        for sql in searches:
+            self.assertNotIn('database_instrument_instrument_categories', sql)
+            if connection.vendor == 'sqlite' and sqlite_has_trigram():
+                self.assertIn('MATCH', sql)
+
+    def test_single_search_field(self):
+        self.assertEqual(self.search(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, search='volt',
+                                     search_field='model__description'),
+                         self.expected(Instrument, 'volt', ['model__description']))
+
+    def test_writes_keep_documents_in_sync(self):
+        Model.objects.filter(model_number='86V').get().save()
+        model = Model.objects.get(model_number='86V')
+        model.vendor = 'Keithley'
+        model.save()
+        self.bench.name = 'rack'
+        self.bench.save()
+        model.model_categories.add(ModelCategory.objects.create(name='thermometer'))
+        ModelCategory.objects.get(name='multimeter').model_list.clear()
+        ModelCategory.objects.get(name='oscilloscope').delete()
+        instrument = Instrument.objects.filter(model=model).first()
+        instrument.instrument_categories.remove(self.bench)
+        Instrument.objects.filter(model__model_number='901C').first().delete()
+        self.assertSearchMatchesJoins()
+        for term in ['keithley', 'rack', 'thermo']:
+            self.assertTrue(self.search(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, search=term), term)
+
+    def test_deferred_indexing(self):
+        with deferred_indexing():
+            instrument = Instrument.objects.create(model=Model.objects.first(), serial_number='deferred')
+            instrument.instrument_categories.add(self.bench)
+            self.assertFalse(SearchDocument.objects.filter(scope='instruments', object_id=instrument.pk).exists())
+        self.assertEqual(self.search(InstrumentViewSet, self.Endpoints.INSTRUMENTS.value, search='deferred'),
+                         [instrument.pk])
+        self.assertSearchMatchesJoins()
+
+    def test_rebuild_command(self):
+        SearchDocument.objects.all().delete()
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertEqual(SearchDocument.objects.count(), Model.objects.count() + Instrument.objects.count())
+        self.assertSearchMatchesJoins()
@@ -0,0 +1,12 @@
+from django.test.runner import DiscoverRunner
+
+BENCHMARK_TAG = 'benchmark'
+
+
+class TestRunner(DiscoverRunner):
+    """ Leaves the timed benchmarks out of a run unless they are asked for with --tag benchmark """
+
+    def __init__(self, tags=None, exclude_tags=None, **kwargs):
+        if BENCHMARK_TAG not in (tags or []):
+            exclude_tags = list(exclude_tags or []) + [BENCHMARK_TAG]
+        super().__init__(tags=tags, exclude_tags=exclude_tags, **kwargs)
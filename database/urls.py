@@ -10,9 +10,12 @@ router.register(r'calibration-events', CalibrationEventViewSet)
 router.register(r'approval-data', ApprovalDataViewSet)
 router.register(r'model-categories', ModelCategoryViewSet)
 router.register(r'instrument-categories', InstrumentCategoryViewSet)
+router.register(r'export-jobs', ExportJobViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('export/', ExportAllView.as_view()),
+    path('dashboard/', DashboardView.as_view()),
     path('import-models/', ModelUploadView.as_view()),
     path('import-instruments/', InstrumentUploadView.as_view())
 ]
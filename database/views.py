@@ -1,24 +1,48 @@
+import hashlib
 import importlib
+import json
 
-from django.db.models import DateField, ExpressionWrapper, F, OuterRef, Subquery
-from rest_framework import viewsets
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status, viewsets
 from rest_framework.decorators import action, permission_classes
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
 from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from database.filters import InstrumentFilter, ModelFilter
-from database.models.instrument import CalibrationEvent
+from database.dashboard import DASHBOARD_CACHE_TIMEOUT, dashboard_counts
+from database.enums import CalibrationStatusEnum, DataScopeEnum
+from database.facets import FACETS_CACHE_TIMEOUT, facet_counts
+from database.fieldsets import EXPAND_QUERY_PARAM, FIELDS_QUERY_PARAM, NESTED_QUERY_PARAM, restrict_queryset, \
+    serializer_without, sparse_serializer, split_param
+from database.filters import CalibrationEventFilter, InstrumentFilter, ModelFilter
+from database.models.export_job import ExportJob
+from database.models.instrument import CalibrationEvent, Instrument, calibration_status, with_calibration_dates
 from database.models.instrument_category import InstrumentCategory
+from database.pagination import CachedCountPagination, KeysetPagination, SmallResultsSetPagination
+from database.picker_index import picker_index
+from database.renderers import EXPORT_RENDERER_CLASSES, json_array_chunks
+from database.response_cache import cache_response, data_version, normalized_params
 from database.serializers.calibration_event import ApprovalDataSerializer, \
     CalibrationEventSerializer, \
     CalibrationRetrieveSerializer, InstrumentForCalibrationEventSerializer, InstrumentsPendingApprovalSerializer
+from database.serializers.export_job import ExportJobSerializer
 from database.serializers.instrument import InstrumentBulkImportSerializer, InstrumentCalibratorSerializer, \
-    InstrumentRetrieveSerializer, InstrumentSerializer
+    InstrumentRetrieveSerializer, InstrumentSerializer, InstrumentUniqueFieldsSerializer
 from database.serializers.model import *
+from database.serializers.values import INSTRUMENT_LIST_VALUES, MODEL_LIST_VALUES, instrument_list_data, \
+    iterate_data_in_chunks, model_list_data
+from database.services.bulk_calibration import BulkCalibration
+from database.services.bulk_write import BulkInstruments, BulkModels
+from database.services.export_services.export_all import ExportAll
+from database.services.export_services.export_calibration_events import ExportCalibrationEventsService
+from database.services.export_services.export_cache import ExportCache
+from database.services.export_services.export_evidence import ExportEvidenceService
 from database.services.export_services.export_instruments import ExportInstrumentsService
+from database.services.export_services.export_jobs import ExportJobService, SUPPORTED_FORMATS, ranged_file_response
 from database.services.export_services.export_models import ExportModelsService
 from database.services.import_instruments import ImportInstruments
 from database.services.import_models import ImportModels
@@ -27,16 +51,171 @@ from database.services.table_enums import MaxInstrumentTableColumnNames, MaxMode
     ModelTableColumnNames
 
 
-class SmallResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 1000
+class ConditionalMixin:
+    """
+    Sends an ETag and Last-Modified with list and retrieve responses and answers If-None-Match and If-Modified-Since
+    with 304 when nothing they cover changed. Lists are versioned by the data version of the view's data_scopes, so
+    validating them costs no query over the rows; a single row by its own version and updated_at columns.
+    """
+
+    def list(self, request, *args, **kwargs):
+        token, updated_at = data_version(self)
+        return self.conditional_response(list_etag(request, token), updated_at, super().list, request, *args,
+                                         **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        etag, updated_at = row_validators(request, queryset)
+        return self.conditional_response(etag, updated_at, super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, etag, updated_at, view, request, *args, **kwargs):
+        last_modified = None if updated_at is None else int(updated_at.timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+def list_etag(request, token):
+    """ Returns an ETag for the response to request listing rows of the scopes whose data version is token """
+    data = json.dumps([request.path, normalized_params(request), request.accepted_media_type, token])
+    return '"%s"' % hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def row_validators(request, queryset):
+    """ Returns an ETag for the response to request retrieving the row of queryset, and when it last changed """
+    row = queryset.model._default_manager.filter(pk__in=queryset.order_by().values('pk')).values(
+        'version', 'updated_at').first()
+    if row is None:
+        return None, None
+    data = json.dumps([request.path, normalized_params(request), request.accepted_media_type, row['version'],
+                       row['updated_at'].isoformat()])
+    return '"%s"' % hashlib.sha256(data.encode('utf-8')).hexdigest(), row['updated_at']
+
+
+class KeysetPaginationMixin:
+    """
+    Pages list results with KeysetPagination instead of the view's pagination_class when a cursor parameter is given.
+    """
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and KeysetPagination.cursor_query_param in self.request.query_params:
+            self._paginator = KeysetPagination()
+        return super().paginator
+
+
+class SparseFieldsMixin:
+    """
+    ?fields= limits list and retrieve responses to the given fields and ?expand= names the nested relations to embed,
+    rendering the others as primary keys. ?nested=false leaves the unbounded nested_lists out of retrieve responses;
+    they are available as paginated sub-resources instead. The queryset then loads only what is rendered.
+    """
+    sparse_actions = ['list', 'retrieve']
+    nested_lists = []
+
+    def get_sparse_serializer_class(self):
+        if not hasattr(self, '_sparse_serializer_class'):
+            self._sparse_serializer_class = None
+            params = self.request.query_params if getattr(self, 'action', None) in self.sparse_actions else {}
+            if FIELDS_QUERY_PARAM in params or EXPAND_QUERY_PARAM in params:
+                self._sparse_serializer_class = sparse_serializer(self.get_serializer_class(),
+                                                                  split_param(params.get(FIELDS_QUERY_PARAM)),
+                                                                  split_param(params.get(EXPAND_QUERY_PARAM)))
+            elif params.get(NESTED_QUERY_PARAM) == 'false' and self.action == 'retrieve':
+                self._sparse_serializer_class = serializer_without(self.get_serializer_class(), self.nested_lists)
+        return self._sparse_serializer_class
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.get_sparse_serializer_class()
+        if serializer_class is None:
+            return super().get_serializer(*args, **kwargs)
+        kwargs.setdefault('context', self.get_serializer_context())
+        return serializer_class(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_sparse_serializer_class()
+        return queryset if serializer_class is None else restrict_queryset(queryset, serializer_class())
+
+
+class ValuesListMixin:
+    """
+    Lists rows through list_representation, built from values(*list_values), instead of the serializer. Sparse
+    fieldsets and cursor pages still go through the serializer.
+    """
+    list_values = []
+    list_representation = None
+
+    def list(self, request, *args, **kwargs):
+        if self.get_sparse_serializer_class() is not None or isinstance(self.paginator, KeysetPagination):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).values(*self.list_values)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(self.list_representation(list(queryset)))
+        return self.get_paginated_response(self.list_representation(page))
+
 
+def paginated_sub_resource(view, queryset, serializer_class):
+    paginator = SmallResultsSetPagination()
+    page = paginator.paginate_queryset(queryset, view.request, view=view)
+    serializer = serializer_class(page, many=True, context=view.get_serializer_context())
+    return paginator.get_paginated_response(serializer.data)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+
+def batch_values(request, lookups, max_size):
+    """
+    Returns the lookup and the distinct integer values given in the one query parameter of lookups ({param: lookup})
+    that request has, in the order given.
+    """
+    params = [param for param in lookups if request.query_params.get(param)]
+    if len(params) != 1:
+        raise ValidationError({'detail': f'Give exactly one of {", ".join(lookups)}'})
+    values = split_param(request.query_params[params[0]])
+    if not all(value.isdigit() for value in values):
+        raise ValidationError({params[0]: 'Must be comma separated integers'})
+    values = list(dict.fromkeys(int(value) for value in values))
+    if len(values) > max_size:
+        raise ValidationError({params[0]: f'At most {max_size} values can be requested at once'})
+    return lookups[params[0]], values
+
+
+def picker_limit(request):
+    limit = request.query_params.get('limit')
+    if not limit:
+        return None
+    if not limit.isdigit() or int(limit) == 0:
+        raise ValidationError({'limit': 'Must be a positive integer'})
+    return int(limit)
+
+
+def submit_export_job(request, export_type, export_service, queryset):
+    export_format = request.data.get('format', SUPPORTED_FORMATS[0])
+    if export_format not in SUPPORTED_FORMATS:
+        return Response({'detail': f'Export format must be one of {SUPPORTED_FORMATS}'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    job = ExportJob.objects.create(user=request.user, export_type=export_type, export_format=export_format)
+    ExportJobService(export_service).execute(job, queryset)
+    return Response(ExportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class CategoryViewSet(ConditionalMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     filterset_fields = [CategoryEnum.NAME.value]
     search_fields = [CategoryEnum.NAME.value]
     ordering_fields = [CategoryEnum.NAME.value]
+    data_scopes = [DataScopeEnum.CATEGORIES.value]
+
+    @cache_response()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
     def get_serializer_class(self):
         name = self.__class__.__name__.replace('ViewSet', '')
@@ -49,19 +228,40 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
 class ModelCategoryViewSet(CategoryViewSet):
     queryset = ModelCategory.objects.all()
+    nested_lists = ['model_list']
+
+    @action(['get'], detail=True)
+    def models(self, request, pk=None, *args, **kwargs):
+        """ Paginated models in the category """
+        category = self.get_object()
+        return paginated_sub_resource(self, category.model_list.order_by('vendor', 'model_number', 'pk'),
+                                      ModelUniqueFieldsSerializer)
 
 
 class InstrumentCategoryViewSet(CategoryViewSet):
     queryset = InstrumentCategory.objects.all()
+    nested_lists = ['instrument_list']
+
+    @action(['get'], detail=True)
+    def instruments(self, request, pk=None, *args, **kwargs):
+        """ Paginated instruments in the category """
+        category = self.get_object()
+        return paginated_sub_resource(self, category.instrument_list.order_by('asset_tag_number', 'pk'),
+                                      InstrumentUniqueFieldsSerializer)
 
 
-class ModelViewSet(viewsets.ModelViewSet):
+class ModelViewSet(ConditionalMixin, SparseFieldsMixin, ValuesListMixin, KeysetPaginationMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows groups to be viewed or edited.
     """
     queryset = Model.objects.all()
     filterset_class = ModelFilter
-    pagination_class = SmallResultsSetPagination
+    pagination_class = CachedCountPagination
+    data_scopes = [DataScopeEnum.MODELS.value, DataScopeEnum.CATEGORIES.value]
+    list_values = MODEL_LIST_VALUES
+    list_representation = staticmethod(model_list_data)
+    nested_lists = ['instruments']
+    bulk_max_size = 1000
     search_fields = [
         ModelEnum.VENDOR.value,
         ModelEnum.MODEL_NUMBER.value,
@@ -83,34 +283,78 @@ class ModelViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(['get'], detail=True)
+    def instruments(self, request, pk=None, *args, **kwargs):
+        """ Paginated instruments of the model """
+        model = self.get_object()
+        return paginated_sub_resource(self, model.instruments.order_by('asset_tag_number', 'pk'),
+                                      InstrumentForModelRetrieveSerializer)
+
+    @cache_response()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @action(['get'], detail=False)
+    @cache_response(timeout=FACETS_CACHE_TIMEOUT)
+    def facets(self, request, *args, **kwargs):
+        """ Counts of the models matching the current filters and search by category and vendor """
+        queryset = self.get_queryset()
+        return Response(facet_counts(queryset, self.filter_queryset(queryset), {
+            'model_categories': 'model_categories__name',
+            'vendors': ModelEnum.VENDOR.value,
+        }))
+
+    @action(['post', 'patch', 'delete'], detail=False)
+    def bulk(self, request, *args, **kwargs):
+        """
+        Creates (POST a list of models), updates (PATCH a list of models with their pk) or deletes (DELETE a list of
+        pks) up to bulk_max_size models in one transaction, all or none, with a result for each item.
+        """
+        return BulkModels(request.user, self.bulk_max_size).execute(request.method, request.data)
+
     @action(['get'], detail=False)
     def vendors(self, request):
+        """ Vendors with a model number containing ?model_number=, best match first, at most ?limit= of them """
         model_number = request.query_params.get('model_number')
-        return Response(Model.objects.vendors(model_number))
+        return Response(picker_index().vendors(model_number, picker_limit(request)))
 
     @action(['get'], detail=False)
     def model_numbers(self, request):
+        """ Model numbers of the vendors containing ?vendor=, best match first, at most ?limit= of them """
         vendor = request.query_params.get('vendor')
-        return Response(Model.objects.model_numbers(vendor=vendor))
+        return Response(picker_index().model_numbers(vendor, picker_limit(request)))
 
-    @action(['get'], detail=False)
+    @action(['get'], detail=False, renderer_classes=EXPORT_RENDERER_CLASSES)
     def export(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        return ExportModelsService().execute(queryset)
+        return ExportCache(ExportModelsService()).execute(request, queryset)
+
+    @action(['post'], detail=False, permission_classes=[IsAuthenticated])
+    def export_job(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return submit_export_job(request, 'MODELS', ExportModelsService(), queryset)
 
     @action(['get'], detail=False)
     def all(self, request, *args, **kwargs):
-        serializer = self.get_serializer_class()
-        return Response(serializer(self.get_queryset(), many=True).data)
+        models = iterate_data_in_chunks(self.get_queryset().values(*self.list_values), self.list_representation)
+        return StreamingHttpResponse(json_array_chunks(models), content_type='application/json')
 
 
-class InstrumentViewSet(viewsets.ModelViewSet):
+class InstrumentViewSet(ConditionalMixin, SparseFieldsMixin, ValuesListMixin, KeysetPaginationMixin,
+                        viewsets.ModelViewSet):
     """
     API endpoint that allows instruments to be viewed or edited.
     """
     queryset = Instrument.objects.all()
     filterset_class = InstrumentFilter
-    pagination_class = SmallResultsSetPagination
+    pagination_class = CachedCountPagination
+    data_scopes = [e.value for e in DataScopeEnum]
+    list_values = INSTRUMENT_LIST_VALUES
+    list_representation = staticmethod(instrument_list_data)
+    nested_lists = ['calibration_history']
+    sparse_actions = ['list', 'retrieve', 'batch']
+    batch_max_size = 5000
+    bulk_max_size = 1000
     search_fields = [
         'model__' + ModelEnum.VENDOR.value,
         'model__' + ModelEnum.MODEL_NUMBER.value,
@@ -132,7 +376,7 @@ class InstrumentViewSet(viewsets.ModelViewSet):
     ordering = ['model__vendor', 'model__model_number', 'serial_number']
 
     def get_serializer_class(self):
-        if self.action == 'retrieve':
+        if self.action in ['retrieve', 'batch']:
             return InstrumentRetrieveSerializer
         elif self.action == 'calibrators':
             return InstrumentCalibratorSerializer
@@ -141,11 +385,52 @@ class InstrumentViewSet(viewsets.ModelViewSet):
         return InstrumentSerializer
 
     def get_queryset(self):
-        sq = CalibrationEvent.objects.filter(instrument=OuterRef('pk')).filter(approval_data__approved=True).order_by('-date')
-        expression = F('most_recent_calibration_date') + F('model__calibration_frequency')
-        expiration = ExpressionWrapper(expression, output_field=DateField())
-        qs = super().get_queryset().annotate(most_recent_calibration_date=Subquery(sq.values('date')[:1]))
-        return qs.annotate(calibration_expiration_date=expiration)
+        return with_calibration_dates(super().get_queryset())
+
+    @cache_response()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @action(['get'], detail=False)
+    def batch(self, request, *args, **kwargs):
+        """
+        Instruments with the given ?ids= or ?asset_tags= (comma separated, at most batch_max_size), rendered as by
+        retrieve and keyed by id in the order requested, with the ids or asset tags not found listed as missing.
+        Supports ?fields=, ?expand= and ?nested=false like retrieve. The number of queries does not depend on how many
+        instruments are requested.
+        """
+        lookup, values = batch_values(request, {'ids': 'pk', 'asset_tags': InstrumentEnum.ASSET_TAG_NUMBER.value},
+                                      self.batch_max_size)
+        queryset = self.get_queryset().filter(**{lookup + '__in': values})
+        if self.get_sparse_serializer_class() is None:
+            queryset = restrict_queryset(queryset, self.get_serializer())
+        instruments = {getattr(instrument, lookup): instrument for instrument in queryset}
+        found = [instruments[value] for value in values if value in instruments]
+        data = self.get_serializer(found, many=True).data
+        return Response({
+            'results': {instrument.pk: item for instrument, item in zip(found, data)},
+            'missing': [value for value in values if value not in instruments],
+        })
+
+    @action(['post', 'patch', 'delete'], detail=False)
+    def bulk(self, request, *args, **kwargs):
+        """
+        Creates (POST a list of instruments), updates (PATCH a list of instruments with their pk) or deletes (DELETE a
+        list of pks) up to bulk_max_size instruments in one transaction, all or none, with a result for each item.
+        """
+        return BulkInstruments(request.user, self.bulk_max_size).execute(request.method, request.data)
+
+    @action(['get'], detail=False)
+    @cache_response(timeout=FACETS_CACHE_TIMEOUT)  # statuses change with the date as well as with writes
+    def facets(self, request, *args, **kwargs):
+        """ Counts of the instruments matching the current filters and search by category, vendor and status """
+        queryset = self.get_queryset()
+        return Response(facet_counts(queryset, self.filter_queryset(queryset), {
+            'model_categories': 'model__model_categories__name',
+            'instrument_categories': 'instrument_categories__name',
+            'vendors': 'model__' + ModelEnum.VENDOR.value,
+            'calibration_status': calibration_status,
+        }, choices={'calibration_status': [e.value for e in CalibrationStatusEnum]}))
 
     def recurse_calibration_event(self, calibration_event, calibration_serializer, instrument_serializer):
         if not calibration_event:
@@ -184,16 +469,31 @@ class InstrumentViewSet(viewsets.ModelViewSet):
     def calibratable_asset_tag_numbers(self, request, *args, **kwargs):
         return Response(Instrument.objects.calibratable_asset_tag_numbers())
 
-    @action(['get'], detail=False)
+    @action(['get'], detail=False, renderer_classes=EXPORT_RENDERER_CLASSES)
     def export(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        return ExportInstrumentsService().execute(queryset)
+        return ExportCache(ExportInstrumentsService()).execute(request, queryset)
+
+    @action(['post'], detail=False, permission_classes=[IsAuthenticated])
+    def export_job(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return submit_export_job(request, 'INSTRUMENTS', ExportInstrumentsService(), queryset)
+
+    @action(['get'], detail=False)
+    def evidence(self, request, *args, **kwargs):
+        """ Stream a ZIP of the calibration evidence files of the filtered instruments, within start_date/end_date """
+        instruments = self.filter_queryset(self.get_queryset()).order_by().values('pk')
+        events = CalibrationEventFilter(request.query_params,
+                                        queryset=CalibrationEvent.objects.filter(instrument__in=instruments))
+        if not events.is_valid():
+            raise ValidationError(events.errors)
+        return ExportEvidenceService().execute(events.qs)
 
     @action(['get'], detail=False)
     def all(self, request, *args, **kwargs):
-        serializer = self.get_serializer_class()
-        queryset = self.filter_queryset(self.get_queryset())
-        return Response(serializer(queryset, many=True).data)
+        queryset = self.filter_queryset(self.get_queryset()).values(*self.list_values)
+        instruments = iterate_data_in_chunks(queryset, self.list_representation)
+        return StreamingHttpResponse(json_array_chunks(instruments), content_type='application/json')
 
     @action(['get'], detail=False)
     @permission_classes([IsAuthenticated])
@@ -207,6 +507,14 @@ class InstrumentViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer_class()
         return Response(serializer(Instrument.objects.calibrators(Instrument.objects.get(pk=pk)), many=True).data)
 
+    @action(['get'], detail=True, url_path='calibration-history')
+    def calibration_history(self, request, pk=None, *args, **kwargs):
+        """ Paginated calibration history of the instrument, newest first """
+        instrument = self.get_object()
+        events = instrument.calibration_history.order_by('-date', '-pk') \
+            .select_related('instrument__model', 'user', 'approval_data__approver').prefetch_related('calibrated_with')
+        return paginated_sub_resource(self, events, CalibrationRetrieveSerializer)
+
     @action(['get'], detail=True)
     def calibration_certificate(self, request, pk=None, *args, **kwargs):
         """ Return calibration certificate for given instrument """
@@ -215,7 +523,7 @@ class InstrumentViewSet(viewsets.ModelViewSet):
         return Response(self.recurse_calibration_event(calibration_event, c_e_s, i_s))
 
 
-class ApprovalDataViewSet(viewsets.ModelViewSet):
+class ApprovalDataViewSet(ConditionalMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows approval data to be viewed or edited.
     """
@@ -223,13 +531,14 @@ class ApprovalDataViewSet(viewsets.ModelViewSet):
     serializer_class = ApprovalDataSerializer
 
 
-class CalibrationEventViewSet(viewsets.ModelViewSet):
+class CalibrationEventViewSet(ConditionalMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows calibration events to be viewed or edited.
     """
     queryset = CalibrationEvent.objects.all()
     serializer_class = CalibrationEventSerializer
     filter_backends = []
+    bulk_max_size = 1000
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -238,11 +547,94 @@ class CalibrationEventViewSet(viewsets.ModelViewSet):
             return InstrumentsPendingApprovalSerializer
         return CalibrationEventSerializer
 
+    @action(['post'], detail=False)
+    def bulk(self, request, *args, **kwargs):
+        """
+        Calibrates the instruments with the asset tags listed in instruments (at most bulk_max_size) with the same date,
+        comment, data and calibrated_with, all or none, with a result for each instrument.
+        """
+        return BulkCalibration(request.user, self.bulk_max_size).execute(request.data)
+
     @action(['get'], detail=False)
     def pending_approval(self, request, *args, **kwargs):
         serializer = self.get_serializer_class()
         return Response(serializer(CalibrationEvent.objects.pending_approval(), many=True).data)
 
+    @action(['get'], detail=False, renderer_classes=EXPORT_RENDERER_CLASSES)
+    def export(self, request, *args, **kwargs):
+        """ Export every calibration event matching the date range, approval state and instrument filters """
+        instruments = InstrumentFilter(request.query_params, queryset=Instrument.objects.all())
+        if not instruments.is_valid():
+            raise ValidationError(instruments.errors)
+        events = CalibrationEventFilter(request.query_params, queryset=CalibrationEvent.objects.filter(
+            instrument__in=instruments.qs.order_by().values('pk')))
+        if not events.is_valid():
+            raise ValidationError(events.errors)
+        return ExportCache(ExportCalibrationEventsService()).execute(request, events.qs)
+
+
+class ExportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint to poll export jobs submitted through the export_job actions and download their files.
+    """
+    queryset = ExportJob.objects.all()
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = []
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(user=self.request.user)
+
+    def get_object(self):
+        job = super().get_object()
+        job.fail_if_orphaned()
+        return job
+
+    def list(self, request, *args, **kwargs):
+        jobs = list(self.filter_queryset(self.get_queryset()))
+        for job in jobs:
+            job.fail_if_orphaned()
+        return Response(self.get_serializer(jobs, many=True).data)
+
+    @action(['get'], detail=True)
+    def download(self, request, pk=None, *args, **kwargs):
+        job = self.get_object()
+        if job.status != 'DONE':
+            return Response({'detail': f'Export job is {job.status.lower()}'}, status=status.HTTP_409_CONFLICT)
+        file_name = f'{job.export_type.lower()}.{job.export_format}'
+        try:
+            return ranged_file_response(request, job.path, file_name, 'application/force-download', '"%s"' % job.pk)
+        except FileNotFoundError:
+            # removed from disk since the job finished, as by a cleanup or a redeploy; the export must be run again
+            ExportJob.objects.filter(pk=job.pk, status='DONE').update(status='FAILED', error='Export file is missing')
+            return Response({'detail': 'Export file is no longer available'}, status=status.HTTP_410_GONE)
+
+
+class ExportAllView(APIView):
+    """
+    Streams a ZIP of the full model and instrument inventory as it is generated.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return ExportAll().execute()
+
+
+class DashboardView(APIView):
+    """
+    Totals for the landing page: instruments by calibration status and model category, and calibration events pending
+    approval.
+    """
+    permission_classes = [IsAuthenticated]
+    data_scopes = [e.value for e in DataScopeEnum]
+
+    @cache_response(timeout=DASHBOARD_CACHE_TIMEOUT)
+    def get(self, request):
+        return Response(dashboard_counts())
+
 
 class ModelUploadView(APIView):
     parser_classes = [MultiPartParser, ]
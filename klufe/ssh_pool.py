@@ -0,0 +1,153 @@
+"""
+Long-lived SSH sessions to the Klufe K5700 calibrator. Connecting, exchanging keys, authenticating and opening a shell
+take several round trips, so each worker keeps up to KLUFE_SSH_POOL_SIZE shells open and sends every command over one
+of them. A session is checked to still be alive before it is reused and is replaced when it is not or a command on it
+fails.
+"""
+import atexit
+import os
+import re
+import socket
+import threading
+import time
+
+import paramiko
+from django.conf import settings
+
+from klufe.constants import hostname, port
+
+RECEIVE_SIZE = 10000
+# the calibrator's output is coloured; the reply to a command is the text between its second and third escape sequences
+ESCAPE = re.compile(rb'\x1B[\[0-9;]*m')
+REPLY_FIELD = 2
+
+
+def connect_ssh():
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy)
+    client.connect(hostname, port=port, username=os.getenv('KLUFE_USERNAME'), password=os.getenv('KLUFE_PASSWORD'))
+    client.get_transport().set_keepalive(settings.KLUFE_SSH_KEEPALIVE_INTERVAL)
+    conn = client.invoke_shell()
+    conn.recv(RECEIVE_SIZE)
+    return client, conn
+
+
+class Session:
+    """ An open shell on the calibrator """
+
+    def __init__(self, client, channel):
+        self.client = client
+        self.channel = channel
+        self.used = False
+
+    def alive(self):
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active() and not self.channel.closed
+
+    def command(self, text):
+        """
+        Sends text and returns the reply, reading until the escape sequence that ends it arrives. Raises socket.timeout
+        if it has not arrived KLUFE_REPLY_TIMEOUT seconds after sending.
+        """
+        # output left over from an earlier command would otherwise be taken for this one's reply
+        while self.channel.recv_ready():
+            self.channel.recv(RECEIVE_SIZE)
+        self.channel.sendall(text)
+        deadline = time.monotonic() + settings.KLUFE_REPLY_TIMEOUT
+        reply = b''
+        while len(ESCAPE.split(reply)) <= REPLY_FIELD + 1:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout('The calibrator did not reply in time')
+            self.channel.settimeout(remaining)
+            received = self.channel.recv(RECEIVE_SIZE)
+            if not received:
+                raise EOFError('The calibrator closed the session')
+            reply += received
+        self.used = True
+        return ESCAPE.split(reply)[REPLY_FIELD].decode('ascii')
+
+    def close(self):
+        self.client.close()
+
+
+class SSHPool:
+
+    def __init__(self, connect=connect_ssh, size=None):
+        self.connect = connect
+        self.size = size or settings.KLUFE_SSH_POOL_SIZE
+        self.idle = []
+        self.open = 0
+        self.condition = threading.Condition()
+
+    def command(self, text):
+        """
+        Sends text over a pooled session and returns the calibrator's reply. A reused session that fails is assumed
+        to have gone stale while idle, and the command is sent once more over a new one.
+        """
+        while True:
+            session = self.acquire()
+            try:
+                reply = session.command(text)
+            except socket.timeout:
+                # the late reply would be read as the next command's, so the session is not reused
+                self.discard(session)
+                raise
+            except (paramiko.SSHException, OSError, EOFError):
+                self.discard(session)
+                if session.used:
+                    continue
+                raise
+            self.release(session)
+            return reply
+
+    def acquire(self):
+        with self.condition:
+            while True:
+                while self.idle:
+                    session = self.idle.pop()
+                    if session.alive():
+                        return session
+                    session.close()
+                    self.open -= 1
+                if self.open < self.size:
+                    self.open += 1
+                    break
+                self.condition.wait()
+        try:
+            return Session(*self.connect())
+        except BaseException:
+            self.discard(None)
+            raise
+
+    def release(self, session):
+        with self.condition:
+            self.idle.append(session)
+            self.condition.notify()
+
+    def discard(self, session):
+        if session is not None:
+            session.close()
+        with self.condition:
+            self.open -= 1
+            self.condition.notify()
+
+    def close(self):
+        with self.condition:
+            sessions, self.idle = self.idle, []
+            self.open -= len(sessions)
+        for session in sessions:
+            session.close()
+
+
+_lock = threading.Lock()
+_state = {'pool': None}
+
+
+def ssh_pool():
+    """ Returns this worker's pool of sessions to the calibrator """
+    with _lock:
+        if _state['pool'] is None:
+            _state['pool'] = SSHPool()
+            atexit.register(_state['pool'].close)
+        return _state['pool']
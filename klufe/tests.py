@@ -1,3 +1,143 @@
-from django.test import TestCase
+import socket
+import time
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from klufe.ssh_pool import SSHPool
+from user_portal.models import User
+
+
+class KlufeViewsTestCase(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_superuser('admin', 'admin', 'email', 'DukeECE458', is_active=True)
+        self.token = Token.objects.create(user=user)
+
+    def post(self, path, data, **headers):
+        return self.client.post('/api/klufe/' + path, data, content_type='application/json', **headers)
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.post('on/', {}).status_code, 403)
+        response = self.post('on/', {}, HTTP_AUTHORIZATION='Token invalid')
+        self.assertEqual(response.status_code, 403)
+
+    def test_missing_values(self):
+        response = self.post('set/AC/', {'volts': 1}, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': "Must include value for key 'frequency' in request body"})
+
+    def test_method_not_allowed(self):
+        response = self.client.get('/api/klufe/on/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 405)
+
+
+class FakeTransport:
+
+    def __init__(self):
+        self.active = True
+
+    def is_active(self):
+        return self.active
+
+
+class FakeChannel:
+    """ Echoes each command at once, then replies to it after delay seconds """
+
+    def __init__(self, fail=False, delay=0):
+        self.fail = fail
+        self.delay = delay
+        self.closed = False
+        self.sent = []
+        self.pending = []
+        self.timeout = None
+
+    def recv_ready(self):
+        return bool(self.pending) and self.pending[0][0] == 0
+
+    def recv(self, size):
+        delay, received = self.pending[0] if self.pending else (float('inf'), b'')
+        if delay > self.timeout:
+            time.sleep(self.timeout)
+            if self.pending:
+                self.pending[0] = (delay - self.timeout, received)
+            raise socket.timeout()
+        time.sleep(delay)
+        self.pending.pop(0)
+        return received
+
+    def sendall(self, text):
+        if self.fail:
+            raise OSError('Socket is closed')
+        self.sent.append(text)
+        self.pending = [(0, b'\x1b[0m' + text.encode() + b'\x1b[1m'), (self.delay, b'ok\x1b[0m> ')]
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+
+class FakeClient:
+
+    def __init__(self, channel):
+        self.transport = FakeTransport()
+        self.channel = channel
+
+    def get_transport(self):
+        return self.transport
+
+    def close(self):
+        self.transport.active = False
+        self.channel.closed = True
+
+
+class SSHPoolTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.clients = []
+        self.failing = False
+        self.delay = 0
+        self.pool = SSHPool(connect=self.connect, size=2)
+
+    def connect(self):
+        client = FakeClient(FakeChannel(fail=self.failing, delay=self.delay))
+        self.clients.append(client)
+        return client, client.channel
+
+    def test_reuses_session(self):
+        self.assertEqual(self.pool.command('on\n'), 'ok')
+        self.pool.command('off\n')
+        self.assertEqual(len(self.clients), 1)
+        self.assertEqual(self.clients[0].channel.sent, ['on\n', 'off\n'])
+
+    def test_reconnects_dead_session(self):
+        self.pool.command('on\n')
+        self.clients[0].transport.active = False
+        self.pool.command('off\n')
+        self.assertEqual(len(self.clients), 2)
+        self.assertEqual(self.clients[1].channel.sent, ['off\n'])
+        self.assertEqual(self.pool.open, 1)
+
+    def test_retries_stale_session(self):
+        self.pool.command('on\n')
+        self.clients[0].channel.fail = True
+        self.pool.command('off\n')
+        self.assertTrue(self.clients[0].channel.closed)
+        self.assertEqual(self.clients[1].channel.sent, ['off\n'])
+
+    def test_new_session_failure_raises(self):
+        self.failing = True
+        with self.assertRaises(OSError):
+            self.pool.command('on\n')
+        self.assertEqual(self.pool.open, 0)
+
+    def test_waits_for_slow_reply(self):
+        self.delay = 0.2
+        self.assertEqual(self.pool.command('on\n'), 'ok')
+
+    @override_settings(KLUFE_REPLY_TIMEOUT=0.1)
+    def test_reply_timeout_discards_session(self):
+        self.delay = 1
+        with self.assertRaises(socket.timeout):
+            self.pool.command('on\n')
+        self.assertTrue(self.clients[0].channel.closed)
+        self.assertEqual(self.pool.open, 0)
@@ -1,79 +1,56 @@
-import os
-import re
-import time
+import socket
 
-import paramiko
-from rest_framework.decorators import api_view, permission_classes
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
 
-from klufe.constants import hostname, port
+from klufe.ssh_pool import ssh_pool
+from user_portal.async_views import async_api_view
 
 
-def receive_handler(client, conn):
-    n = 0
-    while n < 3:
-        time.sleep(0.5)
-        if conn.recv_ready():
-            break
-    prompt = conn.recv(10000).decode('ascii')
-    client.close()
-    return Response({re.split(r'\x1B[\[0-9;]*m', prompt)[2]})
-
+async def send_command(command):
+    """ Sends command to the Klufe over a pooled session and responds with its reply, off the event loop """
+    try:
+        reply = await sync_to_async(ssh_pool().command, thread_sensitive=False)(command)
+    except socket.timeout:
+        return JsonResponse({"detail": "The Klufe did not reply in time"}, status=504)
+    return JsonResponse([reply], safe=False)
 
-def connect_ssh():
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy)
-    client.connect(hostname, port=port, username=os.getenv('KLUFE_USERNAME'), password=os.getenv('KLUFE_PASSWORD'))
-    conn = client.invoke_shell()
-    conn.recv(10000)
-    return client, conn
 
+def missing(key):
+    return JsonResponse({"detail": f"Must include value for key '{key}' in request body"}, status=400)
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def voltage_on(request):
-    client, conn = connect_ssh()
-    conn.send('on\n')
-    return receive_handler(client, conn)
 
+@async_api_view(['POST'], permission_classes=[IsAuthenticated])
+async def voltage_on(request):
+    return await send_command('on\n')
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def voltage_off(request):
-    client, conn = connect_ssh()
-    conn.send('off\n')
-    return receive_handler(client, conn)
 
+@async_api_view(['POST'], permission_classes=[IsAuthenticated])
+async def voltage_off(request):
+    return await send_command('off\n')
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def set_DCVoltage(request):
-    client, conn = connect_ssh()
 
+@async_api_view(['POST'], permission_classes=[IsAuthenticated])
+async def set_DCVoltage(request):
     try:
         volts = request.data['volts']
     except KeyError:
-        return Response(status=400, data={"detail": "Must include value for key 'volts' in request body"})
-
-    conn.send(f'set dc {volts}\n')
-    return receive_handler(client, conn)
+        return missing('volts')
 
+    return await send_command(f'set dc {volts}\n')
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def set_ACVoltage(request):
-    client, conn = connect_ssh()
 
+@async_api_view(['POST'], permission_classes=[IsAuthenticated])
+async def set_ACVoltage(request):
     try:
         volts = request.data['volts']
     except KeyError:
-        return Response(status=400, data={"detail": "Must include value for key 'volts' in request body"})
+        return missing('volts')
 
     try:
         frequency = request.data['frequency']
     except KeyError:
-        return Response(status=400, data={"detail": "Must include value for key 'frequency' in request body"})
+        return missing('frequency')
 
-    conn.send(f'set ac {volts} {frequency}\n')
-    return receive_handler(client, conn)
+    return await send_command(f'set ac {volts} {frequency}\n')
@@ -0,0 +1,63 @@
+"""
+Async function views behind DRF's authentication, parsing and permissions. DRF's own views cannot be coroutines, so
+the parts of a request that touch the database run in a thread with sync_to_async, and under ASGI the view yields
+while it waits on the network.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def api_request(request):
+    """ Wraps request as APIView would, authenticating the user and parsing the body up front """
+    api = Request(request,
+                  parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+                  authenticators=[authenticator() for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    # both are lazy; reading them here keeps their queries out of the event loop
+    api.user
+    api.data
+    return api
+
+
+def error_response(request, exception):
+    response = JsonResponse({'detail': str(exception.detail)}, status=exception.status_code)
+    if isinstance(exception, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        # as in APIView, 403 unless the first authenticator sends a challenge
+        header = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]().authenticate_header(request)
+        if header:
+            response['WWW-Authenticate'] = header
+        else:
+            response.status_code = status.HTTP_403_FORBIDDEN
+    return response
+
+
+def async_api_view(methods, permission_classes=()):
+    """
+    Decorates an async view taking a DRF request. Returns the errors DRF would for a disallowed method, failed
+    authentication, a malformed body or a denied permission.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return JsonResponse({'detail': f'Method "{request.method}" not allowed.'},
+                                    status=status.HTTP_405_METHOD_NOT_ALLOWED)
+            try:
+                api = await sync_to_async(api_request)(request)
+                for permission in permission_classes:
+                    if not permission().has_permission(api, None):
+                        raise exceptions.NotAuthenticated() if api.user.is_anonymous else exceptions.PermissionDenied()
+            except exceptions.APIException as e:
+                return error_response(request, e)
+            return await view(api, *args, **kwargs)
+
+        # the session authenticator enforces CSRF itself, as it does for APIView
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
@@ -1,7 +1,7 @@
 from django.urls import include, re_path
 from rest_framework import routers
 
-from user_portal.views import ExtendedUserViewSet, OAuthView
+from user_portal.views import ExtendedUserViewSet, oauth_login
 
 router = routers.DefaultRouter()
 router.register(r'users', ExtendedUserViewSet)
@@ -9,5 +9,5 @@ router.register(r'users', ExtendedUserViewSet)
 urlpatterns = (
     re_path('', include(router.urls)),
     re_path('', include("djoser.urls.authtoken")),
-    re_path('oauth/login/', OAuthView.as_view())
+    re_path('oauth/login/', oauth_login)
 )
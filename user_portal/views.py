@@ -2,17 +2,18 @@ import base64
 import os
 
 import requests
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
 from djoser import serializers
 from djoser.conf import settings
 from djoser.serializers import TokenSerializer
 from djoser.views import UserViewSet
-from rest_framework import permissions
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
 from database.enums import UserEnum
+from user_portal.async_views import async_api_view
 from user_portal.models import User
 from user_portal.serializers import CustomUserSerializer, IsStaffSerializer
 
@@ -72,63 +73,63 @@ class ExtendedUserViewSet(UserViewSet):
         return Response(CustomUserSerializer(User.objects.oauth_users(), many=True).data)
 
 
-class OAuthView(APIView):
-    """
-    View to login using OAuth
-    """
-    permission_classes = [permissions.AllowAny]
+def format_auth_string():
+    string = f"{os.getenv('REACT_APP_CLIENT_ID')}:{os.getenv('REACT_APP_CLIENT_SECRET')}"
+    data = base64.b64encode(string.encode())
+    return data.decode("utf-8")
 
-    @staticmethod
-    def format_auth_string():
-        string = f"{os.getenv('REACT_APP_CLIENT_ID')}:{os.getenv('REACT_APP_CLIENT_SECRET')}"
-        data = base64.b64encode(string.encode())
-        return data.decode("utf-8")
 
-    def post(self, request, *args, **kwargs):
-        oauth_code = request.data.get('oauth_code')
+def login_token(username, name, email):
+    if not User.objects.filter(username=username).exists():
+        User.objects.create_oauth_user(username=username, name=name, email=email)
+    token, created = Token.objects.get_or_create(user=User.objects.get(username=username))
+    return TokenSerializer(token).data
 
-        auth = self.format_auth_string()
 
-        url = "https://oauth.oit.duke.edu/oidc/token"
-
-        redirect_uri = os.getenv('REACT_APP_REDIRECT_URI', 'http://localhost:3000/oauth/consume')
+@async_api_view(['POST'])
+async def oauth_login(request):
+    """
+    Login using OAuth. The calls to the OAuth provider run in a worker thread, so under ASGI the view yields while it
+    waits on them.
+    """
+    oauth_code = request.data.get('oauth_code')
 
-        payload_for_token = {
-            "grant_type": "authorization_code",
-            "redirect_uri": redirect_uri,
-            "code": oauth_code
-        }
-        headers_for_token = {
-            "content-type": "application/x-www-form-urlencoded",
-            "authorization": f"Basic {auth}"
-        }
+    auth = format_auth_string()
 
-        response = requests.post(url, data=payload_for_token, headers=headers_for_token)
+    url = "https://oauth.oit.duke.edu/oidc/token"
 
-        try:
-            oauth_token = response.json()['access_token']
-        except KeyError:
-            return Response({'redirect_uri_used': redirect_uri,
-                             'code_given': oauth_code}, status=401)
+    redirect_uri = os.getenv('REACT_APP_REDIRECT_URI', 'http://localhost:3000/oauth/consume')
 
-        headers_for_user = {
-            "content-type": "application/x-www-form-urlencoded",
-            "Authorization": f"Bearer {oauth_token}"
-        }
+    payload_for_token = {
+        "grant_type": "authorization_code",
+        "redirect_uri": redirect_uri,
+        "code": oauth_code
+    }
+    headers_for_token = {
+        "content-type": "application/x-www-form-urlencoded",
+        "authorization": f"Basic {auth}"
+    }
 
-        response = requests.get('https://oauth.oit.duke.edu/oidc/userinfo', headers=headers_for_user)
+    response = await sync_to_async(requests.post, thread_sensitive=False)(url, data=payload_for_token,
+                                                                          headers=headers_for_token)
 
-        user_info = response.json()
+    try:
+        oauth_token = response.json()['access_token']
+    except KeyError:
+        return JsonResponse({'redirect_uri_used': redirect_uri,
+                             'code_given': oauth_code}, status=401)
 
-        name = user_info['name']
-        username = email = user_info['sub']
+    headers_for_user = {
+        "content-type": "application/x-www-form-urlencoded",
+        "Authorization": f"Bearer {oauth_token}"
+    }
 
-        user = User.objects.filter(username=username)
+    response = await sync_to_async(requests.get, thread_sensitive=False)('https://oauth.oit.duke.edu/oidc/userinfo',
+                                                                         headers=headers_for_user)
 
-        if not user.exists():
-            User.objects.create_oauth_user(username=username, name=name, email=email)
+    user_info = response.json()
 
-        token, created = Token.objects.get_or_create(user=User.objects.get(username=username))
-        token_serializer = TokenSerializer(token)
+    name = user_info['name']
+    username = email = user_info['sub']
 
-        return Response(token_serializer.data)
+    return JsonResponse(await sync_to_async(login_token)(username, name, email))